@@ -753,10 +753,10 @@ class Update_lin_PreCond(InversionDirective):
                 for reg in self.reg.objfcts:
                     reg_diag.append(self.invProb.beta*(reg.W.T*reg.W).diagonal())
 
-                diagA = np.sum(self.prob.G**2., axis=0) + np.hstack(reg_diag)
+                diagA = self.prob.getGtGdiag() + np.hstack(reg_diag)
 
             else:
-                diagA = (np.sum(self.prob.G**2., axis=0) +
+                diagA = (self.prob.getGtGdiag() +
                          self.invProb.beta*(self.reg.W.T*self.reg.W).diagonal())
 
             PC = Utils.sdiag((self.mapping.deriv(None).T * diagA)**-1.)
@@ -776,10 +776,10 @@ class Update_lin_PreCond(InversionDirective):
                 for reg in self.reg.objfcts:
                     reg_diag.append(self.invProb.beta*(reg.W.T*reg.W).diagonal())
 
-                diagA = np.sum(self.prob.G**2., axis=0) + np.hstack(reg_diag)
+                diagA = self.prob.getGtGdiag() + np.hstack(reg_diag)
 
             else:
-                diagA = (np.sum(self.prob.G**2., axis=0) +
+                diagA = (self.prob.getGtGdiag() +
                          self.invProb.beta*(self.reg.W.T*self.reg.W).diagonal())
 
             PC = Utils.sdiag((self.mapping.deriv(None).T * diagA)**-1.)
@@ -798,16 +798,23 @@ class Update_Wj(InversionDirective):
         if self.itr is None or self.itr == self.opt.iter:
 
             m = self.invProb.model
-            if self.k is None:
-                self.k = int(self.survey.nD/10)
 
-            def JtJv(v):
+            # exact diagonal when the problem stores J
+            if getattr(self.prob, 'storeJ', False):
+                JtJdiag = self.prob.getJtJdiag(m)
 
-                Jv = self.prob.Jvec(m, v)
+            else:
+                if self.k is None:
+                    self.k = int(self.survey.nD/10)
+
+                def JtJv(v):
+
+                    Jv = self.prob.Jvec(m, v)
+
+                    return self.prob.Jtvec(m, Jv)
 
-                return self.prob.Jtvec(m, Jv)
+                JtJdiag = Utils.diagEst(JtJv, len(m), k=self.k)
 
-            JtJdiag = Utils.diagEst(JtJv, len(m), k=self.k)
             JtJdiag = JtJdiag / max(JtJdiag)
 
             self.reg.wght = JtJdiag
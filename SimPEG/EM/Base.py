@@ -12,6 +12,7 @@ from SimPEG import Utils
 from SimPEG import Maps
 from SimPEG import Props
 from SimPEG import Solver as SimpegSolver
+from .Utils.PrimaryFieldUtils import PrimaryFieldCache
 
 
 __all__ = ['BaseEMProblem', 'BaseEMSurvey', 'BaseEMSrc']
@@ -53,8 +54,23 @@ class BaseEMProblem(Problem.BaseProblem):
     Solver = SimpegSolver  #: Type of solver to pair with
     solverOpts = {}  #: Solver options
 
+    #: Memory (GB) kept for the primary fields of the sources
+    maxPrimaryFieldMemory = 1.
+
     verbose = False
 
+    @property
+    def primaryFieldCache(self):
+        """
+        Cache of the primary fields of the sources of this problem, see
+        :class:`SimPEG.EM.Utils.PrimaryFieldCache`
+        """
+        if getattr(self, '_primaryFieldCache', None) is None:
+            self._primaryFieldCache = PrimaryFieldCache(
+                self.maxPrimaryFieldMemory
+            )
+        return self._primaryFieldCache
+
     ####################################################
     # Make A Symmetric
     ####################################################
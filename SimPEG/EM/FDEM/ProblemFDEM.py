@@ -60,6 +60,90 @@ class BaseFDEMProblem(BaseEMProblem):
 
     Props.Reciprocal(mu, mui)
 
+    #: Memory (GB) kept for the factorizations of A, None for no limit.
+    #: With an executor, leave room for one factorization per worker.
+    maxFactorMemory = 4.
+
+    #: Object with a map method, e.g. multiprocessing.pool.ThreadPool, that
+    #: spreads the frequencies over workers. None solves them in turn.
+    #: Threads share the cached factorizations of the problem. For
+    #: processes, use a :class:`SimPEG.Utils.ExecutorUtils.ProblemPool`,
+    #: whose workers keep their own copy of the problem and factorizations.
+    #: Any other process pool gets a copy of the problem for every task,
+    #: without its factorizations.
+    executor = None
+
+    #: True if A is symmetric, A^T is then solved with the factors of A
+    _AisSymmetric = False
+
+    @property
+    def deleteTheseOnModelUpdate(self):
+        return super(BaseFDEMProblem, self).deleteTheseOnModelUpdate + [
+            '_Ainv', '_workerFields'
+        ]
+
+    def getAinv(self, freq, adjoint=False):
+        """
+        Factorization of the system matrix (or of its transpose) for a
+        frequency. The factorizations are cached until the model changes,
+        so that fields, Jvec and Jtvec share them, within the memory set by
+        :attr:`maxFactorMemory`. A^T is solved with the factors of A if A is
+        symmetric, or if the solver has a transpose (Ainv.T, e.g. SolverLU),
+        and factored on its own otherwise.
+
+        :param float freq: Frequency
+        :param bool adjoint: factorization of A^T
+        :rtype: Solver
+        :return: Ainv
+        """
+        adjoint = adjoint and not self._AisSymmetric
+
+        if adjoint:
+            Ainv = self.getAinv(freq)
+            try:
+                return Ainv.T
+            except AttributeError:
+                pass
+
+        Ainv = self._AinvCache.get((freq, adjoint))
+
+        if Ainv is None:
+            A = self.getA(freq)
+            if adjoint:
+                A = A.T
+            Ainv = self._AinvCache.add(
+                (freq, adjoint), self.Solver(A, **self.solverOpts), A
+            )
+
+        return Ainv
+
+    @property
+    def _AinvCache(self):
+        if getattr(self, '_Ainv', None) is None:
+            self._Ainv = Utils.SolverUtils.SolverCache(self.maxFactorMemory)
+        return self._Ainv
+
+    def mapFreqs(self, method, *args, **kwargs):
+        """
+        Evaluate a method of the problem for every frequency of the survey,
+        as method(freq, \*args, \*\*kwargs), spread over :attr:`executor`
+        if set. Each frequency is factored and solved by the worker it is
+        sent to.
+
+        :param str method: name of the method
+        :rtype: list
+        :return: outputs of the method, in the order of survey.freqs
+        """
+        # Created before the workers start, so that they share it
+        self._AinvCache
+
+        task = Utils.ExecutorUtils.ProblemTask(self, method, args, kwargs)
+
+        if self.executor is None:
+            return [task(freq) for freq in self.survey.freqs]
+
+        return list(self.executor.map(task, self.survey.freqs))
+
     def fields(self, m=None):
         """
         Solve the forward problem for the fields.
@@ -74,14 +158,36 @@ class BaseFDEMProblem(BaseEMProblem):
 
         f = self.fieldsPair(self.mesh, self.survey)
 
-        for freq in self.survey.freqs:
-            A = self.getA(freq)
-            rhs = self.getRHS(freq)
-            Ainv = self.Solver(A, **self.solverOpts)
-            u = Ainv * rhs
-            Srcs = self.survey.getSrcByFreq(freq)
-            f[Srcs, self._solutionType] = u
-            Ainv.clean()
+        # Gather the solutions of all the frequencies in one fields object
+        for freq, u in zip(self.survey.freqs, self.mapFreqs('_fieldsFreq')):
+            self._storeFreq(f, freq, u)
+        return f
+
+    def _fieldsFreq(self, freq):
+        rhs = self.getRHS(freq)
+        Ainv = self.getAinv(freq)
+        return Ainv * rhs
+
+    def _storeFreq(self, f, freq, u):
+        """Store the solution u of the sources of a frequency in f"""
+        f[self.survey.getSrcByFreq(freq), self._solutionType] = u
+
+    def _freqFields(self, freq, f=None):
+        """
+        The fields f, or, in a worker of a ProblemPool that is not sent the
+        fields, those of the sources of freq solved by the worker, once per
+        model.
+        """
+        if f is not None:
+            return f
+
+        if getattr(self, '_workerFields', None) is None:
+            self._workerFields = (self.fieldsPair(self.mesh, self.survey), [])
+        f, solved = self._workerFields
+
+        if freq not in solved:
+            self._storeFreq(f, freq, self._fieldsFreq(freq))
+            solved.append(freq)
         return f
 
     def Jvec(self, m, v, f=None):
@@ -101,26 +207,47 @@ class BaseFDEMProblem(BaseEMProblem):
 
         self.model = m
 
-        # Jv = self.dataPair(self.survey)
+        # The frequencies are solved in turn, the data keep the order of the
+        # sources of the survey
+        Jv = self.dataPair(self.survey)
+
+        for freq, Jv_freq in zip(
+            self.survey.freqs, self.mapFreqs('_JvecFreq', v, f=f)
+        ):
+            Jv_freq = iter(Jv_freq)
+            for src in self.survey.getSrcByFreq(freq):
+                for rx in src.rxList:
+                    Jv[src, rx] = next(Jv_freq)
+
+        return Jv.tovec()
+
+    def _JvecFreq(self, freq, v, f=None):
+        f = self._freqFields(freq, f)
         Jv = []
 
-        for freq in self.survey.freqs:
-            A = self.getA(freq)
-            # create the concept of Ainv (actually a solve)
-            Ainv = self.Solver(A, **self.solverOpts)
+        # Factorization shared with fields
+        Ainv = self.getAinv(freq)
+        Srcs = self.survey.getSrcByFreq(freq)
 
-            for src in self.survey.getSrcByFreq(freq):
-                u_src = f[src, self._solutionType]
-                dA_dm_v = self.getADeriv(freq, u_src, v)
-                dRHS_dm_v = self.getRHSDeriv(freq, src, v)
-                du_dm_v = Ainv * (- dA_dm_v + dRHS_dm_v)
+        # One right hand side per source, solved together
+        rhs = []
+        for src in Srcs:
+            u_src = f[src, self._solutionType]
+            dA_dm_v = self.getADeriv(freq, u_src, v)
+            dRHS_dm_v = self.getRHSDeriv(freq, src, v)
+            rhs.append(Utils.mkvc(- dA_dm_v + dRHS_dm_v))
 
-                for rx in src.rxList:
-                    Jv.append(
-                        rx.evalDeriv(src, self.mesh, f, du_dm_v=du_dm_v, v=v)
+        du_dm_v = Ainv * np.column_stack(rhs)
+        du_dm_v = du_dm_v.reshape((-1, len(Srcs)), order='F')
+
+        for i, src in enumerate(Srcs):
+            for rx in src.rxList:
+                Jv.append(
+                    rx.evalDeriv(
+                        src, self.mesh, f, du_dm_v=du_dm_v[:, i], v=v
                     )
-            Ainv.clean()
-        return np.hstack(Jv)
+                )
+        return Jv
 
     def Jtvec(self, m, v, f=None):
         """
@@ -144,41 +271,65 @@ class BaseFDEMProblem(BaseEMProblem):
 
         Jtv = np.zeros(m.size)
 
-        for freq in self.survey.freqs:
-            AT = self.getA(freq).T
-            ATinv = self.Solver(AT, **self.solverOpts)
+        for Jtv_freq in self.mapFreqs('_JtvecFreq', v, f=f):
+            Jtv += Jtv_freq
 
-            for src in self.survey.getSrcByFreq(freq):
-                u_src = f[src, self._solutionType]
+        return Utils.mkvc(Jtv)
 
-                for rx in src.rxList:
-                    df_duT, df_dmT = rx.evalDeriv(
-                        src, self.mesh, f, v=v[src, rx], adjoint=True
-                    )
+    def _JtvecFreq(self, freq, v, f=None):
+        f = self._freqFields(freq, f)
+        Jtv = 0.
 
-                    ATinvdf_duT = ATinv * df_duT
+        ATinv = self.getAinv(freq, adjoint=True)
+        Srcs = self.survey.getSrcByFreq(freq)
 
-                    dA_dmT = self.getADeriv(
-                        freq, u_src, ATinvdf_duT, adjoint=True
-                    )
-                    dRHS_dmT = self.getRHSDeriv(
-                        freq, src, ATinvdf_duT, adjoint=True
-                    )
-                    du_dmT = -dA_dmT + dRHS_dmT
+        # The adjoint of the receivers of a source are summed before the
+        # solve, as -real(x) = real(-x) for the imaginary components.
+        # One right hand side per source, solved together.
+        df_duT_src = []
+        df_dmT_src = []
+
+        for src in Srcs:
+            df_duT_sum = Utils.Zero()
+            df_dmT_sum = Utils.Zero()
+
+            for rx in src.rxList:
+                df_duT, df_dmT = rx.evalDeriv(
+                    src, self.mesh, f, v=v[src, rx], adjoint=True
+                )
+
+                # TODO: this should be taken care of by the reciever?
+                if rx.component is 'real':
+                    df_duT_sum = df_duT_sum + df_duT
+                    df_dmT_sum = df_dmT_sum + df_dmT
+                elif rx.component is 'imag':
+                    df_duT_sum = df_duT_sum - df_duT
+                    df_dmT_sum = df_dmT_sum - df_dmT
+                else:
+                    raise Exception('Must be real or imag')
+
+            df_duT_src.append(Utils.mkvc(df_duT_sum))
+            df_dmT_src.append(df_dmT_sum)
+
+        ATinvdf_duT = ATinv * np.column_stack(df_duT_src)
+        ATinvdf_duT = ATinvdf_duT.reshape((-1, len(Srcs)), order='F')
 
-                    df_dmT = df_dmT + du_dmT
+        for i, src in enumerate(Srcs):
+            u_src = f[src, self._solutionType]
 
-                    # TODO: this should be taken care of by the reciever?
-                    if rx.component is 'real':
-                        Jtv +=   np.array(df_dmT, dtype=complex).real
-                    elif rx.component is 'imag':
-                        Jtv += - np.array(df_dmT, dtype=complex).real
-                    else:
-                        raise Exception('Must be real or imag')
+            dA_dmT = self.getADeriv(
+                freq, u_src, ATinvdf_duT[:, i], adjoint=True
+            )
+            dRHS_dmT = self.getRHSDeriv(
+                freq, src, ATinvdf_duT[:, i], adjoint=True
+            )
+            du_dmT = -dA_dmT + dRHS_dmT
 
-            ATinv.clean()
+            df_dmT = df_dmT_src[i] + du_dmT
 
-        return Utils.mkvc(Jtv)
+            Jtv += np.array(df_dmT, dtype=complex).real
+
+        return Jtv
 
     def getSourceTerm(self, freq):
         """
@@ -238,6 +389,7 @@ class Problem3D_e(BaseFDEMProblem):
     _solutionType = 'eSolution'
     _formulation  = 'EB'
     fieldsPair    = Fields3D_e
+    _AisSymmetric = True
 
     def __init__(self, mesh, **kwargs):
         BaseFDEMProblem.__init__(self, mesh, **kwargs)
@@ -389,6 +541,10 @@ class Problem3D_b(BaseFDEMProblem):
     def __init__(self, mesh, **kwargs):
         BaseFDEMProblem.__init__(self, mesh, **kwargs)
 
+    @property
+    def _AisSymmetric(self):
+        return self._makeASymmetric is True
+
     def getA(self, freq):
         """
         System matrix
@@ -567,6 +723,10 @@ class Problem3D_j(BaseFDEMProblem):
     def __init__(self, mesh, **kwargs):
         BaseFDEMProblem.__init__(self, mesh, **kwargs)
 
+    @property
+    def _AisSymmetric(self):
+        return self._makeASymmetric is True
+
     def getA(self, freq):
         """
         System matrix
@@ -749,6 +909,7 @@ class Problem3D_h(BaseFDEMProblem):
     _solutionType = 'hSolution'
     _formulation  = 'HJ'
     fieldsPair    = Fields3D_h
+    _AisSymmetric = True
 
     def __init__(self, mesh, **kwargs):
         BaseFDEMProblem.__init__(self, mesh, **kwargs)
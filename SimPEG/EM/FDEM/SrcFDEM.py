@@ -328,14 +328,35 @@ class MagDipole(BaseFDEMSrc):
             orientation=self.orientation
         )
 
+    def _primaryKey(self, prob):
+        """
+        The primary fields only depend on these, sources that share them
+        (e.g. the frequencies of a sounding) share their primary fields
+        """
+        return (
+            self.__class__, tuple(Utils.mkvc(self.loc)), self.moment,
+            self.mu, tuple(self.orientation), getattr(self, 'radius', None),
+            prob._formulation
+        )
+
     def bPrimary(self, prob):
         """
-        The primary magnetic flux density from a magnetic vector potential
+        The primary magnetic flux density from a magnetic vector potential.
+        It is computed once and shared through
+        :code:`prob.primaryFieldCache`.
 
         :param BaseFDEMProblem prob: FDEM problem
         :rtype: numpy.ndarray
         :return: primary magnetic field
         """
+        return prob.primaryFieldCache.get(
+            self._primaryKey(prob), lambda: self._calcBPrimary(prob)
+        )
+
+    def _calcBPrimary(self, prob):
+        """
+        Curl of the magnetic vector potential of the source
+        """
         formulation = prob._formulation
 
         if formulation == 'EB':
@@ -475,7 +496,7 @@ class MagDipole_Bfield(MagDipole):
             orientation=self.orientation
         )
 
-    def bPrimary(self, prob):
+    def _calcBPrimary(self, prob):
         """
         The primary magnetic flux density from the analytic solution for
         magnetic fields from a dipole
@@ -35,6 +35,19 @@ class BaseNSEMProblem(BaseFDEMProblem):
     # Notes:
     # Use the fields and devs methods from BaseFDEMProblem
 
+    def _fieldsFreq(self, freq):
+        if self.verbose:
+            startTime = time.time()
+            print('Starting work for {:.3e}'.format(freq))
+            sys.stdout.flush()
+        # Solve the system, the factorization is kept for Jvec
+        e_s = BaseFDEMProblem._fieldsFreq(self, freq)
+
+        if self.verbose:
+            print('Ran for {:f} seconds'.format(time.time()-startTime))
+            sys.stdout.flush()
+        return e_s
+
     # NEED to clean up the Jvec and Jtvec to use Zero and Identities for None components.
     def Jvec(self, m, v, f=None):
         """
@@ -56,32 +69,36 @@ class BaseNSEMProblem(BaseFDEMProblem):
         # Initiate the Jv object
         Jv = self.dataPair(self.survey)
 
-        # Loop all the frequenies
-        for freq in self.survey.freqs:
-            # Get the system
-            A = self.getA(freq)
-            # Factor
-            Ainv = self.Solver(A, **self.solverOpts)
-
-            for src in self.survey.getSrcByFreq(freq):
-                # We need fDeriv_m = df/du*du/dm + df/dm
-                # Construct du/dm, it requires a solve
-                # NOTE: need to account for the 2 polarizations in the derivatives.
-                u_src = f[src,:] # u should be a vector by definition. Need to fix this...
-                # dA_dm and dRHS_dm should be of size nE,2, so that we can multiply by Ainv.
-                # The 2 columns are each of the polarizations.
-                dA_dm_v = self.getADeriv(freq, u_src, v) # Size: nE,2 (u_px,u_py) in the columns.
-                dRHS_dm_v = self.getRHSDeriv(freq, v) # Size: nE,2 (u_px,u_py) in the columns.
-                # Calculate du/dm*v
-                du_dm_v = Ainv * ( - dA_dm_v + dRHS_dm_v)
-                # Calculate the projection derivatives
-                for rx in src.rxList:
-                    # Calculate dP/du*du/dm*v
-                    Jv[src, rx] = rx.evalDeriv(src, self.mesh, f, mkvc(du_dm_v)) # wrt uPDeriv_u(mkvc(du_dm))
-            Ainv.clean()
+        # Loop all the frequenies, spread over the executor if set
+        for Jv_freq in self.mapFreqs('_JvecFreq', v, f=f):
+            for src, rx, Jv_rx in Jv_freq:
+                Jv[src, rx] = Jv_rx
         # Return the vectorized sensitivities
         return mkvc(Jv)
 
+    def _JvecFreq(self, freq, v, f=None):
+        f = self._freqFields(freq, f)
+        Jv = []
+        # Get the factored system, shared with fields
+        Ainv = self.getAinv(freq)
+
+        for src in self.survey.getSrcByFreq(freq):
+            # We need fDeriv_m = df/du*du/dm + df/dm
+            # Construct du/dm, it requires a solve
+            # NOTE: need to account for the 2 polarizations in the derivatives.
+            u_src = f[src,:] # u should be a vector by definition. Need to fix this...
+            # dA_dm and dRHS_dm should be of size nE,2, so that we can multiply by Ainv.
+            # The 2 columns are each of the polarizations.
+            dA_dm_v = self.getADeriv(freq, u_src, v) # Size: nE,2 (u_px,u_py) in the columns.
+            dRHS_dm_v = self.getRHSDeriv(freq, v) # Size: nE,2 (u_px,u_py) in the columns.
+            # Calculate du/dm*v
+            du_dm_v = Ainv * ( - dA_dm_v + dRHS_dm_v)
+            # Calculate the projection derivatives
+            for rx in src.rxList:
+                # Calculate dP/du*du/dm*v
+                Jv.append((src, rx, rx.evalDeriv(src, self.mesh, f, mkvc(du_dm_v)))) # wrt uPDeriv_u(mkvc(du_dm))
+        return Jv
+
     def Jtvec(self, m, v, f=None):
         """
         Function to calculate the transpose of the data sensitivities (dD/dm)^T times a vector.
@@ -104,36 +121,40 @@ class BaseNSEMProblem(BaseFDEMProblem):
 
         Jtv = np.zeros(m.size)
 
-        for freq in self.survey.freqs:
-            AT = self.getA(freq).T
-
-            ATinv = self.Solver(AT, **self.solverOpts)
-
-            for src in self.survey.getSrcByFreq(freq):
-                # u_src needs to have both polarizations
-                u_src = f[src, :]
-
-                for rx in src.rxList:
-                    # Get the adjoint evalDeriv
-                    # PTv needs to be nE,2
-                    PTv = rx.evalDeriv(src, self.mesh, f, mkvc(v[src, rx]), adjoint=True) # wrt f, need possibility wrt m
-                    # Get the
-                    dA_duIT = mkvc(ATinv * PTv) # Force (nU,) shape
-                    dA_dmT = self.getADeriv(freq, u_src, dA_duIT, adjoint=True)
-                    dRHS_dmT = self.getRHSDeriv(freq, dA_duIT, adjoint=True)
-                    # Make du_dmT
-                    du_dmT = -dA_dmT + dRHS_dmT
-                    # Select the correct component
-                    # du_dmT needs to be of size (nP,) number of model parameters
-                    real_or_imag = rx.component
-                    if real_or_imag == 'real':
-                        Jtv +=  np.array(du_dmT, dtype=complex).real
-                    elif real_or_imag == 'imag':
-                        Jtv +=  -np.array(du_dmT, dtype=complex).real
-                    else:
-                        raise Exception('Must be real or imag')
-            # Clean the factorization, clear memory.
-            ATinv.clean()
+        # Loop all the frequenies, spread over the executor if set
+        for Jtv_freq in self.mapFreqs('_JtvecFreq', v, f=f):
+            Jtv += Jtv_freq
+        return Jtv
+
+    def _JtvecFreq(self, freq, v, f=None):
+        f = self._freqFields(freq, f)
+        Jtv = 0.
+        # Get the factored transposed system
+        ATinv = self.getAinv(freq, adjoint=True)
+
+        for src in self.survey.getSrcByFreq(freq):
+            # u_src needs to have both polarizations
+            u_src = f[src, :]
+
+            for rx in src.rxList:
+                # Get the adjoint evalDeriv
+                # PTv needs to be nE,2
+                PTv = rx.evalDeriv(src, self.mesh, f, mkvc(v[src, rx]), adjoint=True) # wrt f, need possibility wrt m
+                # Get the
+                dA_duIT = mkvc(ATinv * PTv) # Force (nU,) shape
+                dA_dmT = self.getADeriv(freq, u_src, dA_duIT, adjoint=True)
+                dRHS_dmT = self.getRHSDeriv(freq, dA_duIT, adjoint=True)
+                # Make du_dmT
+                du_dmT = -dA_dmT + dRHS_dmT
+                # Select the correct component
+                # du_dmT needs to be of size (nP,) number of model parameters
+                real_or_imag = rx.component
+                if real_or_imag == 'real':
+                    Jtv +=  np.array(du_dmT, dtype=complex).real
+                elif real_or_imag == 'imag':
+                    Jtv +=  -np.array(du_dmT, dtype=complex).real
+                else:
+                    raise Exception('Must be real or imag')
         return Jtv
 
 ###################################
@@ -168,6 +189,9 @@ class Problem1D_ePrimSec(BaseNSEMProblem):
     _solutionType = 'e_1dSolution'
     _formulation  = 'EF'
     fieldsPair = Fields1D_ePrimSec
+    # A = C^T Mmui C + i omega Msigma is complex symmetric: A^T is solved
+    # with the factors of A
+    _AisSymmetric = True
 
     # Initiate properties
     _sigmaPrimary = None
@@ -285,27 +309,17 @@ class Problem1D_ePrimSec(BaseNSEMProblem):
             self.model = m
         # Make the fields object
         F = self.fieldsPair(self.mesh, self.survey)
-        # Loop over the frequencies
-        for freq in self.survey.freqs:
-            if self.verbose:
-                startTime = time.time()
-                print('Starting work for {:.3e}'.format(freq))
-                sys.stdout.flush()
-            A = self.getA(freq)
-            rhs  = self.getRHS(freq)
-            Ainv = self.Solver(A, **self.solverOpts)
-            e_s = Ainv * rhs
-
-            # Store the fields
-            Src = self.survey.getSrcByFreq(freq)[0]
-            # NOTE: only store the e_solution(secondary), all other components calculated in the fields object
-            F[Src, 'e_1dSolution'] = e_s
-
-            if self.verbose:
-                print('Ran for {:f} seconds'.format(time.time()-startTime))
-                sys.stdout.flush()
+        # Loop over the frequencies, spread over the executor if set
+        for freq, e_s in zip(self.survey.freqs, self.mapFreqs('_fieldsFreq')):
+            self._storeFreq(F, freq, e_s)
         return F
 
+    def _storeFreq(self, F, freq, e_s):
+        # Store the fields
+        Src = self.survey.getSrcByFreq(freq)[0]
+        # NOTE: only store the e_solution(secondary), all other components calculated in the fields object
+        F[Src, 'e_1dSolution'] = e_s
+
 
 ###################################
 # 3D problems
@@ -337,6 +351,9 @@ class Problem3D_ePrimSec(BaseNSEMProblem):
     _solutionType = ['e_pxSolution', 'e_pySolution']  # Forces order on the object
     _formulation  = 'EB'
     fieldsPair = Fields3D_ePrimSec
+    # A = C^T Mmui C + i omega Msigma is complex symmetric: A^T is solved
+    # with the factors of A
+    _AisSymmetric = True
 
     # Initiate properties
     _sigmaPrimary = None
@@ -445,27 +462,15 @@ class Problem3D_ePrimSec(BaseNSEMProblem):
             self.model = m
 
         F = self.fieldsPair(self.mesh, self.survey)
-        for freq in self.survey.freqs:
-            if self.verbose:
-                startTime = time.time()
-                print('Starting work for {:.3e}'.format(freq))
-                sys.stdout.flush()
-            A = self.getA(freq)
-            rhs = self.getRHS(freq)
-            # Solve the system
-            Ainv = self.Solver(A, **self.solverOpts)
-            e_s = Ainv * rhs
-
-            # Store the fields
-            Src = self.survey.getSrcByFreq(freq)[0]
-            # Store the fields
-            # Use self._solutionType
-            F[Src, 'e_pxSolution'] = e_s[:, 0]
-            F[Src, 'e_pySolution'] = e_s[:, 1]
-            # Note curl e = -iwb so b = -curl/iw
-
-            if self.verbose:
-                print('Ran for {:f} seconds'.format(time.time()-startTime))
-                sys.stdout.flush()
-            Ainv.clean()
+        # Loop over the frequencies, spread over the executor if set
+        for freq, e_s in zip(self.survey.freqs, self.mapFreqs('_fieldsFreq')):
+            self._storeFreq(F, freq, e_s)
         return F
+
+    def _storeFreq(self, F, freq, e_s):
+        Src = self.survey.getSrcByFreq(freq)[0]
+        # Store the fields
+        # Use self._solutionType
+        F[Src, 'e_pxSolution'] = e_s[:, 0]
+        F[Src, 'e_pySolution'] = e_s[:, 1]
+        # Note curl e = -iwb so b = -curl/iw
@@ -3,9 +3,12 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import tempfile
+
 from SimPEG import Utils
 from SimPEG.EM.Base import BaseEMProblem
 from .SurveyDC import Survey
+from . import SrcDC
 from .FieldsDC import FieldsDC, Fields_CC, Fields_N
 import numpy as np
 import scipy as sp
@@ -21,6 +24,24 @@ class BaseDCProblem(BaseEMProblem):
     fieldsPair = FieldsDC
     Ainv = None
 
+    #: Compute the sensitivity matrix J once per model and serve Jvec and
+    #: Jtvec as products with it, rather than solving for every product
+    storeJ = False
+
+    #: Directory of the memory-mapped J, None keeps it in RAM
+    Jpath = None
+
+    #: Solve once per unique current electrode and form the fields of the
+    #: sources by superposition of poles. Without fields, dpred solves at
+    #: the potential electrodes instead when they are fewer (reciprocity).
+    solveElectrodes = False
+
+    @property
+    def deleteTheseOnModelUpdate(self):
+        return super(BaseDCProblem, self).deleteTheseOnModelUpdate + [
+            '_Jmatrix'
+        ]
+
     def fields(self, m=None):
         if m is not None:
             self.model = m
@@ -31,39 +52,132 @@ class BaseDCProblem(BaseEMProblem):
         f = self.fieldsPair(self.mesh, self.survey)
         A = self.getA()
         self.Ainv = self.Solver(A, **self.solverOpts)
-        RHS = self.getRHS()
-        u = self.Ainv * RHS
         Srcs = self.survey.srcList
+
+        if self.solveElectrodes:
+            locs, C = self.survey.getSrcElectrodes()
+
+        if self.solveElectrodes and locs.shape[0] < len(Srcs):
+            # fields of unit poles at the electrodes, summed for the sources
+            u = self._solveBlock(self._poleRHS(locs))
+            u = (C.T * u.T).T
+        else:
+            RHS = self.getRHS()
+            u = self.Ainv * RHS
+
         f[Srcs, self._solutionType] = u
         return f
 
+    def dpredElectrodes(self, m=None):
+        """
+        Predicted data, solved once per unique electrode. If the potential
+        electrodes are fewer than the current electrodes and the sources,
+        the data are solved at the potential electrodes by reciprocity
+        (with a factorization of A^T) without forming the fields. Otherwise
+        the fields are solved at the current electrodes.
+
+        :param numpy.array m: inversion model (nP,)
+        :rtype: numpy.array
+        :return: data (nD,)
+        """
+        if m is not None:
+            self.model = m
+
+        survey = self.survey
+        nSrc = len(survey.srcList)
+        phiOnly = all(
+            rx.rxType == 'phi' for src in survey.srcList for rx in src.rxList
+        )
+
+        if phiOnly:
+            rxLocs, R = survey.getRxElectrodes()
+            srcLocs, _ = survey.getSrcElectrodes()
+
+        if not phiOnly or rxLocs.shape[0] >= min(srcLocs.shape[0], nSrc):
+            return Utils.mkvc(survey.eval(self.fields(m)))
+
+        # d = R P A^-1 Q = R (A^-T P^T)^T Q
+        locType = 'N' if self._formulation == 'EB' else 'CC'
+        P = self.mesh.getInterpolationMat(rxLocs, locType)
+        ATinv = self.Solver(self.getA().T.tocsr(), **self.solverOpts)
+        W = (ATinv * P.T.toarray()).reshape(
+            (P.shape[1], rxLocs.shape[0]), order='F'
+        )
+        ATinv.clean()
+
+        # potentials (nM, nSrc) of the sources at the electrodes
+        phi = W.T.dot(self.getRHS())
+
+        srcInd = np.hstack([
+            i*np.ones(src.nD, dtype=int)
+            for i, src in enumerate(survey.srcList)
+        ])
+        return Utils.mkvc(np.asarray(R.multiply(phi.T[srcInd]).sum(axis=1)))
+
+    def getJ(self, m, f=None):
+        """
+        Sensitivity matrix, computed with adjoint solves of the factorization
+        of the fields and stored until the model changes.
+
+        :param numpy.array m: inversion model (nP,)
+        :param SimPEG.EM.Static.DC.FieldsDC f: fields object
+        :rtype: numpy.ndarray
+        :return: J (nD, nP)
+        """
+        self.model = m
+
+        if getattr(self, '_Jmatrix', None) is None:
+            if f is None:
+                f = self.fields(m)
+            self._Jmatrix = getSensitivity(self, f)
+
+        return self._Jmatrix
+
+    def getJtJdiag(self, m, f=None):
+        """
+        Diagonal of J^T*J, the squared norm of the columns of J, e.g. for
+        sensitivity weighting
+
+        :param numpy.array m: inversion model (nP,)
+        :param SimPEG.EM.Static.DC.FieldsDC f: fields object
+        :rtype: numpy.array
+        :return: JtJdiag (nP,)
+        """
+        J = self.getJ(m, f=f)
+        return np.einsum('ij,ij->j', J, J)
+
     def Jvec(self, m, v, f=None):
 
+        if self.storeJ:
+            return self.getJ(m, f=f).dot(v)
+
         if f is None:
             f = self.fields(m)
 
         self.model = m
 
-        # Jv = self.dataPair(self.survey)  # same size as the data
-        Jv = []
-
-        A = self.getA()
-
-        for src in self.survey.srcList:
-            u_src = f[src, self._solutionType]  # solution vector
-            dA_dm_v = self.getADeriv(u_src, v)
-            dRHS_dm_v = self.getRHSDeriv(src, v)
-            du_dm_v = self.Ainv * (- dA_dm_v + dRHS_dm_v)
+        # Right hand sides of all the sources, solved at once
+        Srcs = self.survey.srcList
+        du_dm_v = self._solveBlock([
+            - self.getADeriv(f[src, self._solutionType], v) +
+            self.getRHSDeriv(src, v) for src in Srcs
+        ])
 
+        Jv = []
+        for i, src in enumerate(Srcs):
             for rx in src.rxList:
                 df_dmFun = getattr(f, '_{0!s}Deriv'.format(rx.projField), None)
-                df_dm_v = df_dmFun(src, du_dm_v, v, adjoint=False)
+                df_dm_v = df_dmFun(src, du_dm_v[:, i], v, adjoint=False)
                 Jv.append(rx.evalDeriv(src, self.mesh, f, df_dm_v))
-                # Jv[src, rx] = rx.evalDeriv(src, self.mesh, f, df_dm_v)
-        # return Utils.mkvc(Jv)
         return np.hstack(Jv)
 
     def Jtvec(self, m, v, f=None):
+
+        if self.storeJ:
+            if isinstance(v, self.dataPair):
+                v = v.tovec()
+            return self.getJ(m, f=f).T.dot(v)
+
         if f is None:
             f = self.fields(m)
 
@@ -74,26 +188,57 @@ class BaseDCProblem(BaseEMProblem):
             v = self.dataPair(self.survey, v)
 
         Jtv = np.zeros(m.size)
-        AT = self.getA()
 
-        for src in self.survey.srcList:
+        # The adjoint sources of the receivers of a source are summed, so
+        # that all the sources are solved at once
+        Srcs = self.survey.srcList
+        df_duTs, df_dmTs = [], []
+        for src in Srcs:
             u_src = f[src, self._solutionType]
+            df_duT_src, df_dmT_src = np.zeros(u_src.size), Zero()
             for rx in src.rxList:
                 # wrt f, need possibility wrt m
                 PTv = rx.evalDeriv(src, self.mesh, f, v[src, rx], adjoint=True)
                 df_duTFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
                                     None)
                 df_duT, df_dmT = df_duTFun(src, None, PTv, adjoint=True)
+                df_duT_src = df_duT_src + df_duT
+                df_dmT_src = df_dmT_src + df_dmT
+            df_duTs.append(df_duT_src)
+            df_dmTs.append(df_dmT_src)
 
-                ATinvdf_duT = self.Ainv * df_duT
+        ATinvdf_duT = self._solveBlock(df_duTs)
 
-                dA_dmT = self.getADeriv(u_src, ATinvdf_duT, adjoint=True)
-                dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT, adjoint=True)
-                du_dmT = -dA_dmT + dRHS_dmT
-                Jtv += (df_dmT + du_dmT).astype(float)
+        for i, src in enumerate(Srcs):
+            u_src = f[src, self._solutionType]
+            dA_dmT = self.getADeriv(u_src, ATinvdf_duT[:, i], adjoint=True)
+            dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT[:, i], adjoint=True)
+            du_dmT = -dA_dmT + dRHS_dmT
+            Jtv += (df_dmTs[i] + du_dmT).astype(float)
 
         return Utils.mkvc(Jtv)
 
+    def _poleRHS(self, locs):
+        """
+        Right hand sides of unit poles at locs (nA, dim)
+
+        :rtype: list
+        :return: right hand sides (nC or nN,)
+        """
+        return [SrcDC.Pole([], loc).eval(self) for loc in locs]
+
+    def _solveBlock(self, rhs):
+        """
+        Solve the right hand sides, one per column, with a single multi-RHS
+        solve of the factorization of the fields.
+
+        :param list rhs: right hand sides (nC or nN,)
+        :rtype: numpy.ndarray
+        :return: solutions (nC or nN, len(rhs))
+        """
+        rhs = np.column_stack([Utils.mkvc(r) for r in rhs])
+        return (self.Ainv * rhs).reshape(rhs.shape, order='F')
+
     def getSourceTerm(self):
         """
         Evaluates the sources, and puts them in matrix form
@@ -118,6 +263,61 @@ class BaseDCProblem(BaseEMProblem):
         return q
 
 
+def getSensitivity(prob, f):
+    """
+    Sensitivity matrix of a DC or IP problem, one row per datum. The rows of
+    each receiver are the adjoint solves of its data with the factorization
+    :code:`prob.Ainv` of the fields, stored in RAM or, if :code:`prob.Jpath`
+    is set, in a temporary memory-mapped file of that directory.
+
+    :param BaseDCProblem prob: problem, with the model of the fields
+    :param SimPEG.EM.Static.DC.FieldsDC f: fields object
+    :rtype: numpy.ndarray
+    :return: J (nD, nP)
+    """
+    shape = (prob.survey.nD, prob.model.size)
+    if prob.Jpath is None:
+        J = np.zeros(shape)
+    else:
+        # the file is removed when the memory map is released
+        J = np.memmap(
+            tempfile.TemporaryFile(dir=prob.Jpath), dtype=float, mode='w+',
+            shape=shape
+        )
+
+    row = 0
+    for src in prob.survey.srcList:
+        u_src = f[src, prob._solutionType]
+        for rx in src.rxList:
+            # every datum of the receiver as an adjoint source
+            PTv = rx.evalDeriv(src, prob.mesh, f, np.eye(rx.nD), adjoint=True)
+            df_duTFun = getattr(f, '_{0!s}Deriv'.format(rx.projField), None)
+            df_duT, df_dmT = df_duTFun(src, None, PTv, adjoint=True)
+
+            ATinvdf_duT = (prob.Ainv * df_duT).reshape(
+                (u_src.size, rx.nD), order='F'
+            )
+
+            dA_dmT = prob.getADeriv(u_src, ATinvdf_duT, adjoint=True)
+            dRHS_dmT = prob.getRHSDeriv(src, ATinvdf_duT, adjoint=True)
+            du_dmT = -dA_dmT + dRHS_dmT
+            J[row:row + rx.nD, :] = np.asarray(df_dmT + du_dmT).T
+            row += rx.nD
+
+    return J
+
+
+def _pinFirstRow(A, value):
+    """
+    Replace the first row of A by value on the diagonal, applied as a sparse
+    mask rather than element by element
+    """
+    mask = np.ones(A.shape[0])
+    mask[0] = 0.
+    pin = sp.sparse.csr_matrix(([value], ([0], [0])), shape=A.shape)
+    return Utils.sdiag(mask) * A + pin
+
+
 class Problem3D_CC(BaseDCProblem):
     """
     3D cell centered DC problem
@@ -153,11 +353,7 @@ class Problem3D_CC(BaseDCProblem):
                 print('Perturbing first row of A to remove nullspace for Neumann BC.')
 
             # Handling Null space of A
-            I, J, V = sp.sparse.find(A[0, :])
-            for jj in J:
-                A[0,jj] = 0.
-
-            A[0, 0] = 1./Vol[0]
+            A = _pinFirstRow(A, 1./Vol[0])
 
         # I think we should deprecate this for DC problem.
         # if self._makeASymmetric is True:
@@ -322,11 +518,7 @@ class Problem3D_N(BaseDCProblem):
         Vol = self.mesh.vol
 
         # Handling Null space of A
-        I, J, V = sp.sparse.find(A[0,:])
-        for jj in J:
-            A[0,jj] = 0.
-
-        A[0, 0] = 1./Vol[0]
+        A = _pinFirstRow(A, 1./Vol[0])
 
         return A
 
@@ -10,6 +10,7 @@ from .FieldsDC_2D import Fields_ky, Fields_ky_CC, Fields_ky_N
 import numpy as np
 from SimPEG.Utils import Zero
 from .BoundaryUtils import getxBCyBC_CC
+from . import Utils as DCUtils
 
 
 class BaseDCProblem_2D(BaseEMProblem):
@@ -20,27 +21,183 @@ class BaseDCProblem_2D(BaseEMProblem):
     surveyPair = Survey_ky
     fieldsPair = Fields_ky  # SimPEG.EM.Static.Fields_2D
     nky = 15
-    kys = np.logspace(-4, 1, nky)
-    Ainv = [None for i in range(nky)]
-    nT = nky  # Only for using TimeFields
+    _kys = np.logspace(-4, 1, nky)
+
+    #: Quadrature of the wavenumbers: 'trapezoidal' over kys, or 'optimized'
+    #: to fit nky wavenumbers and weights to the electrode spacings of the
+    #: survey (see :func:`SimPEG.EM.Static.DC.Utils.optimizedKys`), for
+    #: which 4 to 8 wavenumbers are typically enough
+    kyQuadrature = 'trapezoidal'
+
+    #: Memory (GB) kept for the factorizations of A, None for no limit.
+    #: With an executor, leave room for one factorization per worker.
+    maxFactorMemory = 4.
+
+    #: Object with a map method, e.g. multiprocessing.pool.ThreadPool, that
+    #: spreads the wavenumbers over workers. None solves them in turn.
+    #: Threads share the cached factorizations of the problem. For
+    #: processes, use a :class:`SimPEG.Utils.ExecutorUtils.ProblemPool`,
+    #: whose workers keep their own copy of the problem and factorizations.
+    executor = None
+
+    @property
+    def deleteTheseOnModelUpdate(self):
+        return super(BaseDCProblem_2D, self).deleteTheseOnModelUpdate + [
+            '_Ainv', '_workerFields'
+        ]
+
+    @property
+    def nT(self):
+        # Only for using TimeFields
+        return self.nky
+
+    @property
+    def kys(self):
+        """Wavenumbers of the 2.5D problem"""
+        if self.kyQuadrature == 'optimized':
+            return self._optimizedKys[0]
+        return self._kys
+
+    @kys.setter
+    def kys(self, value):
+        self._kys = np.asarray(value, dtype=float)
+        self.nky = self._kys.size
+
+    def kyWeights(self, y=0.):
+        """
+        Weights of the integration over the wavenumbers, including the 1/pi
+        of the inverse cosine transform at y
+
+        :param float y: distance from the plane of the survey
+        :rtype: numpy.array
+        :return: weights (nky,)
+        """
+        if self.kyQuadrature == 'optimized':
+            if y != 0.:
+                raise NotImplementedError(
+                    'The optimized wavenumbers are only fitted for y=0'
+                )
+            return self._optimizedKys[1]
+
+        dky = np.diff(self.kys)
+        dky = np.r_[dky[0], dky]
+        cosky = np.cos(self.kys*y)
+
+        w = dky/2.*cosky
+        w[0] += dky[0]/2.*cosky[0]
+        w[:-1] += dky[1:]/2.*cosky[1:]
+        return w/np.pi
+
+    @property
+    def _optimizedKys(self):
+        """(kys, weights) fitted to the electrode spacings of the survey"""
+        optimized = getattr(self, '_optimizedKysCache', None)
+        if optimized is None or optimized[0].size != self.nky:
+            rMin, rMax = self._electrodeSpacings()
+            optimized = DCUtils.optimizedKys(rMin, rMax, self.nky)
+            self._optimizedKysCache = optimized
+        return optimized
+
+    def _electrodeSpacings(self):
+        """Smallest and largest distances between source and receiver
+        electrodes"""
+        r = []
+        for src in self.survey.srcList:
+            srcLocs = np.atleast_2d(src.loc)
+            for rx in src.rxList:
+                rxLocs = np.vstack(rx.locs)
+                r.append(Utils.mkvc(np.sqrt(
+                    ((rxLocs[:, None, :] - srcLocs[None, :, :])**2).sum(2)
+                )))
+        r = np.hstack(r)
+        r = r[r > 0.]
+        return r.min(), r.max()
+
+    def pair(self, survey):
+        super(BaseDCProblem_2D, self).pair(survey)
+        self._optimizedKysCache = None
+
+    def getAinv(self, iky):
+        """
+        Factorization of the system matrix for the wavenumber kys[iky]. The
+        factorizations are cached until the model changes, so that fields,
+        Jvec and Jtvec share them, within the memory set by
+        :attr:`maxFactorMemory`.
+
+        :param int iky: index of the wavenumber
+        :rtype: Solver
+        :return: Ainv
+        """
+        ky = self.kys[iky]
+        Ainv = self._AinvCache.get(ky)
+
+        if Ainv is None:
+            A = self.getA(ky)
+            Ainv = self._AinvCache.add(
+                ky, self.Solver(A, **self.solverOpts), A
+            )
+
+        return Ainv
+
+    @property
+    def _AinvCache(self):
+        if getattr(self, '_Ainv', None) is None:
+            self._Ainv = Utils.SolverUtils.SolverCache(self.maxFactorMemory)
+        return self._Ainv
+
+    def mapKys(self, method, *args, **kwargs):
+        """
+        Evaluate a method of the problem for every wavenumber, as
+        method(iky, \*args, \*\*kwargs), spread over :attr:`executor` if
+        set. Each wavenumber is factored and solved by the worker it is sent
+        to.
+
+        :param str method: name of the method
+        :rtype: list
+        :return: outputs of the method, in the order of kys
+        """
+        # Created before the workers start, so that they share them
+        self._AinvCache
+        self.kys
+
+        task = Utils.ExecutorUtils.ProblemTask(self, method, args, kwargs)
+
+        if self.executor is None:
+            return [task(iky) for iky in range(self.nky)]
+
+        return list(self.executor.map(task, range(self.nky)))
 
     def fields(self, m):
         if m is not None:
             self.model = m
 
-        if self.Ainv[0] is not None:
-            for i in range(self.nky):
-                self.Ainv[i].clean()
-
         f = self.fieldsPair(self.mesh, self.survey)
-        Srcs = self.survey.srcList
-        for iky in range(self.nky):
-            ky = self.kys[iky]
-            A = self.getA(ky)
-            self.Ainv[iky] = self.Solver(A, **self.solverOpts)
-            RHS = self.getRHS(ky)
-            u = self.Ainv[iky] * RHS
-            f[Srcs, self._solutionType, iky] = u
+        for iky, u in enumerate(self.mapKys('_fieldsKy')):
+            self._storeKy(f, iky, u)
+        return f
+
+    def _fieldsKy(self, iky):
+        return self.getAinv(iky) * self.getRHS(self.kys[iky])
+
+    def _storeKy(self, f, iky, u):
+        """Store the solution u of the sources for kys[iky] in f"""
+        f[self.survey.srcList, self._solutionType, iky] = u
+
+    def _kyFields(self, iky, f=None):
+        """
+        The fields f, or, in a worker of a ProblemPool that is not sent the
+        fields, those for kys[iky] solved by the worker, once per model.
+        """
+        if f is not None:
+            return f
+
+        if getattr(self, '_workerFields', None) is None:
+            self._workerFields = (self.fieldsPair(self.mesh, self.survey), [])
+        f, solved = self._workerFields
+
+        if iky not in solved:
+            self._storeKy(f, iky, self._fieldsKy(iky))
+            solved.append(iky)
         return f
 
     def Jvec(self, m, v, f=None):
@@ -50,41 +207,31 @@ class BaseDCProblem_2D(BaseEMProblem):
 
         self.model = m
 
-        # TODO: This is not a good idea !! should change that as a list
-        Jv = self.dataPair(self.survey)  # same size as the data
-        Jv0 = self.dataPair(self.survey)
-
         # Assume y=0.
         # This needs some thoughts to implement in general when src is dipole
-        dky = np.diff(self.kys)
-        dky = np.r_[dky[0], dky]
-        y = 0.
-
-        # TODO: this loop is pretty slow .. (Parellize)
-        for iky in range(self.nky):
-            ky = self.kys[iky]
-            A = self.getA(ky)
-            for src in self.survey.srcList:
-                u_src = f[src, self._solutionType, iky]  # solution vector
-                dA_dm_v = self.getADeriv(ky, u_src, v)
-                dRHS_dm_v = self.getRHSDeriv(ky, src, v)
-                du_dm_v = self.Ainv[iky] * (- dA_dm_v + dRHS_dm_v)
-                for rx in src.rxList:
-                    df_dmFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
-                                       None)
-                    df_dm_v = df_dmFun(iky, src, du_dm_v, v, adjoint=False)
-                    # Trapezoidal intergration
-                    Jv1_temp = 1./np.pi*rx.evalDeriv(ky, src, self.mesh, f,
-                                                     df_dm_v)
-                    if iky == 0:
-                        # First assigment
-                        Jv[src, rx] = Jv1_temp*dky[iky]*np.cos(ky*y)
-                    else:
-                        Jv[src, rx] += Jv1_temp*dky[iky]/2.*np.cos(ky*y)
-                        Jv[src, rx] += Jv0[src, rx]*dky[iky]/2.*np.cos(ky*y)
-                    Jv0[src, rx] = Jv1_temp.copy()
+        Jv = 0.
+        for w, Jv_ky in zip(self.kyWeights(), self.mapKys('_JvecKy', v, f=f)):
+            Jv += w*Jv_ky
         return Utils.mkvc(Jv)
 
+    def _JvecKy(self, iky, v, f=None):
+        f = self._kyFields(iky, f)
+        ky = self.kys[iky]
+        Ainv = self.getAinv(iky)
+
+        Jv = []
+        for src in self.survey.srcList:
+            u_src = f[src, self._solutionType, iky]  # solution vector
+            dA_dm_v = self.getADeriv(ky, u_src, v)
+            dRHS_dm_v = self.getRHSDeriv(ky, src, v)
+            du_dm_v = Ainv * (- dA_dm_v + dRHS_dm_v)
+            for rx in src.rxList:
+                df_dmFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
+                                   None)
+                df_dm_v = df_dmFun(iky, src, du_dm_v, v, adjoint=False)
+                Jv.append(rx.evalDeriv(ky, src, self.mesh, f, df_dm_v))
+        return np.hstack(Jv)
+
     def Jtvec(self, m, v, f=None):
         if f is None:
             f = self.fields(m)
@@ -95,49 +242,42 @@ class BaseDCProblem_2D(BaseEMProblem):
         if not isinstance(v, self.dataPair):
             v = self.dataPair(self.survey, v)
 
-        Jtv = np.zeros(m.size, dtype=float)
-
         # Assume y=0.
         # This needs some thoughts to implement in general when src is dipole
-        dky = np.diff(self.kys)
-        dky = np.r_[dky[0], dky]
-        y = 0.
+        Jtv = np.zeros(m.size, dtype=float)
+        for w, Jtv_ky in zip(
+            self.kyWeights(), self.mapKys('_JtvecKy', v, f=f)
+        ):
+            Jtv += w*Jtv_ky
+        return Utils.mkvc(Jtv)
+
+    def _JtvecKy(self, iky, v, f=None):
+        f = self._kyFields(iky, f)
+        ky = self.kys[iky]
+        # A is symmetric
+        ATinv = self.getAinv(iky)
 
+        Jtv = 0.
         for src in self.survey.srcList:
+            u_src = f[src, self._solutionType, iky]
             for rx in src.rxList:
-                Jtv_temp1 = np.zeros(m.size, dtype=float)
-                Jtv_temp0 = np.zeros(m.size, dtype=float)
-
-                # TODO: this loop is pretty slow .. (Parellize)
-                for iky in range(self.nky):
-                    u_src = f[src, self._solutionType, iky]
-                    ky = self.kys[iky]
-                    AT = self.getA(ky)
-                    # wrt f, need possibility wrt m
-                    PTv = rx.evalDeriv(ky, src, self.mesh, f, v[src, rx],
-                                       adjoint=True)
-                    df_duTFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
-                                        None)
-                    df_duT, df_dmT = df_duTFun(iky, src, None, PTv,
-                                               adjoint=True)
-
-                    ATinvdf_duT = self.Ainv[iky] * df_duT
-
-                    dA_dmT = self.getADeriv(ky, u_src, ATinvdf_duT,
+                # wrt f, need possibility wrt m
+                PTv = rx.evalDeriv(ky, src, self.mesh, f, v[src, rx],
+                                   adjoint=True)
+                df_duTFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
+                                    None)
+                df_duT, df_dmT = df_duTFun(iky, src, None, PTv,
+                                           adjoint=True)
+
+                ATinvdf_duT = ATinv * df_duT
+
+                dA_dmT = self.getADeriv(ky, u_src, ATinvdf_duT,
+                                        adjoint=True)
+                dRHS_dmT = self.getRHSDeriv(ky, src, ATinvdf_duT,
                                             adjoint=True)
-                    dRHS_dmT = self.getRHSDeriv(ky, src, ATinvdf_duT,
-                                                adjoint=True)
-                    du_dmT = -dA_dmT + dRHS_dmT
-                    Jtv_temp1 = 1./np.pi*(df_dmT + du_dmT).astype(float)
-                    # Trapezoidal intergration
-                    if iky == 0:
-                        # First assigment
-                        Jtv += Jtv_temp1*dky[iky]*np.cos(ky*y)
-                    else:
-                        Jtv += Jtv_temp1*dky[iky]/2.*np.cos(ky*y)
-                        Jtv += Jtv_temp0*dky[iky]/2.*np.cos(ky*y)
-                    Jtv_temp0 = Jtv_temp1.copy()
-        return Utils.mkvc(Jtv)
+                du_dmT = -dA_dmT + dRHS_dmT
+                Jtv += (df_dmT + du_dmT).astype(float)
+        return Jtv
 
     def getSourceTerm(self, ky):
         """
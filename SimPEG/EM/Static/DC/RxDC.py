@@ -73,15 +73,15 @@ class Dipole(BaseRx):
         # return int(self.locs[0].size / 2)
 
     def getP(self, mesh, Gloc):
-        if mesh in self._Ps:
-            return self._Ps[mesh]
+        if (mesh, Gloc) in self._Ps:
+            return self._Ps[(mesh, Gloc)]
 
         P0 = mesh.getInterpolationMat(self.locs[0], Gloc)
         P1 = mesh.getInterpolationMat(self.locs[1], Gloc)
         P = P0 - P1
 
         if self.storeProjections:
-            self._Ps[mesh] = P
+            self._Ps[(mesh, Gloc)] = P
 
         return P
 
@@ -107,20 +107,23 @@ class Dipole_ky(BaseRx):
         # return int(self.locs[0].size / 2)
 
     def getP(self, mesh, Gloc):
-        if mesh in self._Ps:
-            return self._Ps[mesh]
+        if (mesh, Gloc) in self._Ps:
+            return self._Ps[(mesh, Gloc)]
 
         P0 = mesh.getInterpolationMat(self.locs[0], Gloc)
         P1 = mesh.getInterpolationMat(self.locs[1], Gloc)
         P = P0 - P1
         if self.storeProjections:
-            self._Ps[mesh] = P
+            self._Ps[(mesh, Gloc)] = P
         return P
 
-    def eval(self, kys, src, mesh, f):
+    def eval(self, kys, src, mesh, f, w=None):
         P = self.getP(mesh, self.projGLoc(f))
         Pf = P*f[src, self.projField, :]
-        return self.IntTrapezoidal(kys, Pf, y=0.)
+        if w is None:
+            return self.IntTrapezoidal(kys, Pf, y=0.)
+        # weights of the problem's quadrature over the wavenumbers
+        return Pf[:, :kys.size].dot(w)
 
     def evalDeriv(self, ky, src, mesh, f, v, adjoint=False):
         P = self.getP(mesh, self.projGLoc(f))
@@ -160,15 +163,15 @@ class Pole(BaseRx):
 
 
     def getP(self, mesh, Gloc):
-        if mesh in self._Ps:
-            return self._Ps[mesh]
+        if (mesh, Gloc) in self._Ps:
+            return self._Ps[(mesh, Gloc)]
 
         P = mesh.getInterpolationMat(self.locs, Gloc)
         # P1 = mesh.getInterpolationMat(self.locs[1], Gloc)
         # P = P0 - P1
 
         if self.storeProjections:
-            self._Ps[mesh] = P
+            self._Ps[(mesh, Gloc)] = P
 
         return P
 
@@ -190,22 +193,25 @@ class Pole_ky(BaseRx):
 
 
     def getP(self, mesh, Gloc):
-        if mesh in self._Ps:
-            return self._Ps[mesh]
+        if (mesh, Gloc) in self._Ps:
+            return self._Ps[(mesh, Gloc)]
 
         P = mesh.getInterpolationMat(self.locs, Gloc)
         # P1 = mesh.getInterpolationMat(self.locs[1], Gloc)
         # P = P0 - P1
 
         if self.storeProjections:
-            self._Ps[mesh] = P
+            self._Ps[(mesh, Gloc)] = P
 
         return P
 
-    def eval(self, kys, src, mesh, f):
+    def eval(self, kys, src, mesh, f, w=None):
         P = self.getP(mesh, self.projGLoc(f))
         Pf = P*f[src, self.projField, :]
-        return self.IntTrapezoidal(kys, Pf, y=0.)
+        if w is None:
+            return self.IntTrapezoidal(kys, Pf, y=0.)
+        # weights of the problem's quadrature over the wavenumbers
+        return Pf[:, :kys.size].dot(w)
 
     def evalDeriv(self, ky, src, mesh, f, v, adjoint=False):
         P = self.getP(mesh, self.projGLoc(f))
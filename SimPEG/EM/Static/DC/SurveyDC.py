@@ -3,8 +3,12 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import numpy as np
+import scipy.sparse as sp
 import SimPEG
 from SimPEG.EM.Base import BaseEMSurvey
+from . import RxDC
+from . import SrcDC
 from .RxDC import BaseRx
 from .SrcDC import BaseSrc
 
@@ -20,6 +24,85 @@ class Survey(BaseEMSurvey):
         self.srcList = srcList
         BaseEMSurvey.__init__(self, srcList, **kwargs)
 
+    def dpred(self, m=None, f=None):
+        """
+        Predicted data. Without fields, a problem with
+        :code:`solveElectrodes` solves at the unique electrodes, see
+        :meth:`SimPEG.EM.Static.DC.BaseDCProblem.dpredElectrodes`.
+        """
+        if f is None and getattr(self.prob, 'solveElectrodes', False):
+            return self.prob.dpredElectrodes(m)
+        return BaseEMSurvey.dpred(self, m=m, f=f)
+
+    def getSrcElectrodes(self):
+        """
+        Unique current electrode positions, and the sources as sums of poles
+        at them.
+
+        :rtype: tuple
+        :return: (locs, C), the positions (nA, dim) and the sparse currents
+            (nA, nSrc) of the sources at the electrodes
+        """
+        locs, cols, vals = [], [], []
+        for i, src in enumerate(self.srcList):
+            if isinstance(src, SrcDC.Dipole):
+                locs += [src.loc[0], src.loc[1]]
+                vals += [src.current, -src.current]
+                cols += [i, i]
+            elif isinstance(src, SrcDC.Pole):
+                locs += [src.loc]
+                vals += [src.current]
+                cols += [i]
+            else:
+                raise NotImplementedError(
+                    'Only Pole and Dipole sources are made of electrodes'
+                )
+
+        locs, rows = _uniqueRows(np.vstack(locs))
+        C = sp.csr_matrix(
+            (vals, (rows, cols)), shape=(locs.shape[0], len(self.srcList))
+        )
+        return locs, C
+
+    def getRxElectrodes(self):
+        """
+        Unique potential electrode positions, and the data as differences of
+        the potentials at them.
+
+        :rtype: tuple
+        :return: (locs, R), the positions (nM, dim) and the sparse
+            coefficients (nD, nM) of the data, in the order of the data
+        """
+        locs, rows, vals = [], [], []
+        nD = 0
+        for src in self.srcList:
+            for rx in src.rxList:
+                if rx.rxType != 'phi':
+                    raise NotImplementedError(
+                        'Only potential receivers are made of electrodes'
+                    )
+                data = nD + np.arange(rx.nD)
+                if isinstance(rx, RxDC.Dipole):
+                    locs += [rx.locs[0], rx.locs[1]]
+                    vals += [np.ones(rx.nD), -np.ones(rx.nD)]
+                    rows += [data, data]
+                elif isinstance(rx, RxDC.Pole):
+                    locs += [rx.locs]
+                    vals += [np.ones(rx.nD)]
+                    rows += [data]
+                else:
+                    raise NotImplementedError(
+                        'Only Pole and Dipole receivers are made of electrodes'
+                    )
+                nD += rx.nD
+
+        locs, cols = _uniqueRows(np.vstack(locs))
+        R = sp.csr_matrix(
+            (np.hstack(vals), (np.hstack(rows), cols)),
+            shape=(nD, locs.shape[0])
+        )
+        return locs, R
+
 
 class Survey_ky(BaseEMSurvey):
     """
@@ -41,7 +124,21 @@ class Survey_ky(BaseEMSurvey):
         """
         data = SimPEG.Survey.Data(self)
         kys = self.prob.kys
+        w = self.prob.kyWeights()
         for src in self.srcList:
             for rx in src.rxList:
-                data[src, rx] = rx.eval(kys, src, self.mesh, f)
+                data[src, rx] = rx.eval(kys, src, self.mesh, f, w=w)
         return data
+
+
+def _uniqueRows(locs):
+    """
+    Unique rows of locs, and the index of every row of locs in them
+    """
+    # + 0. so that -0. and 0. are the same position
+    locs = np.ascontiguousarray(np.atleast_2d(locs), dtype=float) + 0.
+    rows = locs.view(np.dtype((np.void, locs.dtype.itemsize*locs.shape[1])))
+    _, ind, inv = np.unique(
+        rows.ravel(), return_index=True, return_inverse=True
+    )
+    return locs[ind], inv.ravel()
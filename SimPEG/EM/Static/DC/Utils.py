@@ -4,6 +4,8 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import numpy as np
+from scipy.optimize import minimize
+from scipy.special import k0
 
 
 def WennerSrcList(nElecs, aSpacing, in2D=False, plotIt=False):
@@ -47,3 +49,43 @@ def WennerSrcList(nElecs, aSpacing, in2D=False, plotIt=False):
         srcList += [src]
 
     return srcList
+
+
+def optimizedKys(rMin, rMax, nky=6, nR=100):
+    """
+    Wavenumbers and weights of the inverse cosine transform of a 2.5D
+    problem at y = 0, fitted to the electrode spacings between rMin and
+    rMax.
+
+    The 2.5D potential of a point source in a wholespace is proportional to
+    :math:`K_0(k_y r)`, with :math:`\\frac{1}{\\pi}\\int_0^\\infty
+    K_0(k_y r) dk_y = \\frac{1}{2r}`. The wavenumbers are optimized (in
+    log) so that the least-squares weights reproduce 1/(2r) at nR
+    log-spaced spacings with the smallest relative error. The weights
+    include the 1/pi of the transform.
+
+    :param float rMin: smallest electrode spacing
+    :param float rMax: largest electrode spacing
+    :param int nky: number of wavenumbers
+    :param int nR: number of spacings of the fit
+    :rtype: tuple
+    :return: (kys, weights)
+    """
+
+    r = np.logspace(np.log10(rMin), np.log10(rMax), nR)
+
+    def getWeights(logky):
+        # relative kernels, their weighted sum should be one
+        K = 2.*r[:, None]*k0(r[:, None]*np.exp(logky))
+        return K, np.linalg.lstsq(K, np.ones(nR), rcond=-1)[0]
+
+    def misfit(logky):
+        K, w = getWeights(logky)
+        return np.sum((K.dot(w) - 1.)**2)
+
+    # log-spaced starting wavenumbers spanning the spacings
+    logky0 = np.linspace(np.log(0.1/rMax), np.log(2./rMin), nky)
+    opt = minimize(misfit, logky0, method='L-BFGS-B')
+
+    logky = np.sort(opt.x)
+    return np.exp(logky), getWeights(logky)[1]
@@ -9,6 +9,7 @@ from SimPEG.EM.Static.DC.FieldsDC import FieldsDC, Fields_CC, Fields_N
 import numpy as np
 from SimPEG.Utils import Zero
 from SimPEG.EM.Static.DC import getxBCyBC_CC
+from SimPEG.EM.Static.DC.ProblemDC import getSensitivity
 from .SurveyIP import Survey
 from SimPEG import Props
 
@@ -35,6 +36,13 @@ class BaseIPProblem(BaseEMProblem):
     f = None
     Ainv = None
 
+    #: Compute the sensitivity matrix J once and serve Jvec and Jtvec as
+    #: products with it, rather than solving for every product
+    storeJ = False
+
+    #: Directory of the memory-mapped J, None keeps it in RAM
+    Jpath = None
+
     def fields(self, m):
         if m is not None:
             self.model = m
@@ -49,8 +57,48 @@ class BaseIPProblem(BaseEMProblem):
             self.f[Srcs, self._solutionType] = u
         return self.f
 
+    def getJ(self, m, f=None):
+        """
+        Sensitivity matrix, computed with adjoint solves of the factorization
+        of the fields. The problem is linear, so J is computed once and kept
+        for the whole inversion, like the fields.
+
+        :param numpy.array m: inversion model (nP,)
+        :param SimPEG.EM.Static.DC.FieldsDC f: fields object
+        :rtype: numpy.ndarray
+        :return: J (nD, nP)
+        """
+        self.model = m
+
+        if getattr(self, '_Jmatrix', None) is None:
+            if f is None:
+                f = self.fields(m)
+            J = getSensitivity(self, f)
+            # Conductivity (d u / d log sigma)
+            if self._formulation == 'EB':
+                J *= -1.
+            self._Jmatrix = J
+
+        return self._Jmatrix
+
+    def getJtJdiag(self, m, f=None):
+        """
+        Diagonal of J^T*J, the squared norm of the columns of J, e.g. for
+        sensitivity weighting
+
+        :param numpy.array m: inversion model (nP,)
+        :param SimPEG.EM.Static.DC.FieldsDC f: fields object
+        :rtype: numpy.array
+        :return: JtJdiag (nP,)
+        """
+        J = self.getJ(m, f=f)
+        return np.einsum('ij,ij->j', J, J)
+
     def Jvec(self, m, v, f=None):
 
+        if self.storeJ:
+            return self.getJ(m, f=f).dot(v)
+
         if f is None:
             f = self.fields(m)
 
@@ -80,6 +128,12 @@ class BaseIPProblem(BaseEMProblem):
             return np.hstack(Jv)
 
     def Jtvec(self, m, v, f=None):
+
+        if self.storeJ:
+            if isinstance(v, self.dataPair):
+                v = v.tovec()
+            return self.getJ(m, f=f).T.dot(v)
+
         if f is None:
             f = self.fields(m)
 
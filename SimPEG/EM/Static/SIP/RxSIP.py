@@ -87,8 +87,8 @@ class Dipole(BaseRx):
 
     def getP(self, mesh, Gloc):
 
-        if mesh in self._Ps:
-            return self._Ps[mesh]
+        if (mesh, Gloc) in self._Ps:
+            return self._Ps[(mesh, Gloc)]
 
         if self.rxgeom == "dipole":
             P0 = mesh.getInterpolationMat(self.locs[0], Gloc)
@@ -98,6 +98,6 @@ class Dipole(BaseRx):
             P = mesh.getInterpolationMat(self.locs[0], Gloc)
 
         if self.storeProjections:
-            self._Ps[mesh] = P
+            self._Ps[(mesh, Gloc)] = P
 
         return P
@@ -39,6 +39,9 @@ class FieldsTDEM(SimPEG.Problem.TimeFields):
         """Grid location of the fieldType"""
         return self.aliasFields[fieldType][1]
 
+    def _rxTimeP(self, rx):
+        return rx.getTimeP(self.survey.prob.timeMesh, self)
+
     def _eDeriv(self, tInd, src, dun_dm_v, v, adjoint=False):
         if adjoint is True:
             return (
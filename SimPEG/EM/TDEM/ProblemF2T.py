@@ -0,0 +1,204 @@
+from __future__ import division, print_function
+import numpy as np
+import scipy.sparse as sp
+from SimPEG import Problem
+from SimPEG.EM.Utils import stepOffFrequencies, stepOffTransform
+from SimPEG.EM.TDEM.SurveyTDEM import Survey_F2T
+from SimPEG.EM.TDEM import SrcTDEM
+from SimPEG.EM.FDEM import ProblemFDEM, SurveyFDEM, SrcFDEM, RxFDEM
+
+
+class Problem3D_F2T(Problem.BaseProblem):
+    """
+    Time domain electromagnetic problem for step-off sources, solved in the
+    frequency domain and transformed to the receiver times.
+
+    ::
+
+        prob = TDEM.Problem3D_F2T(
+            mesh, fdemProblem=FDEM.Problem3D_e, sigmaMap=mapping
+        )
+        survey = TDEM.Survey_F2T(srcList)
+        prob.pair(survey)
+
+    The keyword arguments are those of the FDEM problem class, built as
+    :attr:`fdemProblem` on the mesh. Each TDEM source is solved at
+    :attr:`nFreq` log-spaced frequencies set by the receiver times (or at
+    :attr:`freqs`) and the imaginary parts of the fields at the receivers
+    are filtered to the step-off responses (e, b, h, j) or their time
+    derivatives (dbdt, dhdt), see
+    :func:`SimPEG.EM.Utils.TransformUtils.stepOffTransform`. The frequencies
+    are independent solves, spread over :code:`fdemProblem.executor` if set.
+
+    The filter is linear, so Jvec and Jtvec are those of the FDEM problem
+    followed by the filter and its transpose.
+    """
+
+    surveyPair = Survey_F2T  #: A SimPEG.EM.TDEM.SurveyTDEM.Survey_F2T Class
+
+    #: Number of frequencies of the transform
+    nFreq = 40
+
+    #: Frequencies (Hz) of the transform, None to set them from the times
+    freqs = None
+
+    #: FDEM receiver and transform ('cos' for the fields, 'sin' for their
+    #: time derivatives) of the TDEM receivers
+    _rxTransforms = {
+        'e': ('Point_e', 'cos'),
+        'b': ('Point_b', 'cos'),
+        'h': ('Point_h', 'cos'),
+        'j': ('Point_j', 'cos'),
+        'dbdt': ('Point_b', 'sin'),
+        'dhdt': ('Point_h', 'sin'),
+    }
+
+    def __init__(self, mesh, fdemProblem=ProblemFDEM.Problem3D_e, **kwargs):
+        self.fdemProblem = fdemProblem(mesh, **kwargs)
+        Problem.BaseProblem.__init__(self, mesh)
+
+    def pair(self, survey):
+        Problem.BaseProblem.pair(self, survey)
+        self._fdemSurvey = None
+        self._transform = None
+
+    @property
+    def fdemSurvey(self):
+        """FDEM survey solved by :attr:`fdemProblem`"""
+        if getattr(self, '_fdemSurvey', None) is None:
+            self._setupTransform()
+        return self._fdemSurvey
+
+    @property
+    def transform(self):
+        """Sparse filter from the FDEM data to the TDEM data"""
+        if getattr(self, '_transform', None) is None:
+            self._setupTransform()
+        return self._transform
+
+    def _setupTransform(self):
+        srcList = self.survey.srcList
+        for src in srcList:
+            if not isinstance(src, SrcTDEM.MagDipole):
+                raise NotImplementedError(
+                    'Only MagDipole and CircularLoop sources are transformed '
+                    'from the frequency domain'
+                )
+            if not isinstance(src.waveform, SrcTDEM.StepOffWaveform):
+                raise NotImplementedError(
+                    'Only step-off waveforms are transformed from the '
+                    'frequency domain'
+                )
+
+        freqs = self.freqs
+        if freqs is None:
+            freqs = stepOffFrequencies(
+                np.hstack([
+                    rx.times - src.waveform.offTime
+                    for src in srcList for rx in src.rxList
+                ]),
+                self.nFreq
+            )
+        freqs = np.sort(freqs)
+
+        fdemSrcList = []
+        rows, cols, vals = [], [], []
+        nD, nDf = 0, 0
+        for src in srcList:
+            fdemRxList = [
+                getattr(RxFDEM, self._rxTransforms[rx.projField][0])(
+                    rx.locs, rx.projComp, 'imag'
+                ) for rx in src.rxList
+            ]
+            nDsrc = sum(fdemRx.nD for fdemRx in fdemRxList)
+
+            rxOffset = 0
+            for rx, fdemRx in zip(src.rxList, fdemRxList):
+                kind = self._rxTransforms[rx.projField][1]
+                T = sp.kron(
+                    stepOffTransform(
+                        freqs, rx.times - src.waveform.offTime, kind
+                    ),
+                    sp.identity(fdemRx.nD)
+                ).tocoo()
+
+                # the FDEM data of the source are stacked by frequency
+                rows.append(nD + T.row)
+                cols.append(
+                    nDf + (T.col // fdemRx.nD) * nDsrc + rxOffset +
+                    T.col % fdemRx.nD
+                )
+                vals.append(T.data)
+
+                nD += rx.nD
+                rxOffset += fdemRx.nD
+
+            fdemSrcList += [
+                self._fdemSrc(src, fdemRxList, freq) for freq in freqs
+            ]
+            nDf += len(freqs) * nDsrc
+
+        self._transform = sp.csr_matrix(
+            (np.hstack(vals), (np.hstack(rows), np.hstack(cols))),
+            shape=(nD, nDf)
+        )
+
+        self._fdemSurvey = SurveyFDEM.Survey(fdemSrcList)
+        if self.fdemProblem.ispaired:
+            self.fdemProblem.unpair()
+        self.fdemProblem.pair(self._fdemSurvey)
+
+    def _fdemSrc(self, src, rxList, freq):
+        kwargs = {
+            'moment': src.moment, 'mu': src.mu, 'orientation': src.orientation
+        }
+        if isinstance(src, SrcTDEM.CircularLoop):
+            return SrcFDEM.CircularLoop(
+                rxList, freq, src.loc, radius=src.radius, **kwargs
+            )
+        return SrcFDEM.MagDipole(rxList, freq, src.loc, **kwargs)
+
+    def fields(self, m=None):
+        """
+        Solve the FDEM problem at the frequencies of the transform.
+
+        :param numpy.array m: inversion model (nP,)
+        :rtype: SimPEG.EM.FDEM.FieldsFDEM
+        :return f: frequency domain fields
+        """
+        if m is not None:
+            self.model = m
+
+        # pairs the FDEM survey with the FDEM problem
+        self.fdemSurvey
+        return self.fdemProblem.fields(m)
+
+    def Jvec(self, m, v, f=None):
+        """
+        Sensitivity times a vector.
+
+        :param numpy.array m: inversion model (nP,)
+        :param numpy.array v: vector which we take sensitivity product with
+            (nP,)
+        :param SimPEG.EM.FDEM.FieldsFDEM f: fields object
+        :rtype: numpy.array
+        :return: Jv (ndata,)
+        """
+        if f is None:
+            f = self.fields(m)
+        return self.transform * self.fdemProblem.Jvec(m, v, f=f)
+
+    def Jtvec(self, m, v, f=None):
+        """
+        Sensitivity transpose times a vector.
+
+        :param numpy.array m: inversion model (nP,)
+        :param numpy.array v: vector which we take adjoint product with
+            (ndata,)
+        :param SimPEG.EM.FDEM.FieldsFDEM f: fields object
+        :rtype: numpy.array
+        :return: Jtv (nP,)
+        """
+        if f is None:
+            f = self.fields(m)
+        return self.fdemProblem.Jtvec(m, self.transform.T * v, f=f)
@@ -1,5 +1,6 @@
 from __future__ import division, print_function
 import scipy.sparse as sp
+import scipy.linalg
 import numpy as np
 from SimPEG import Problem, Utils, Solver as SimpegSolver
 from SimPEG.EM.Base import BaseEMProblem
@@ -7,6 +8,7 @@ from SimPEG.EM.TDEM.SurveyTDEM import Survey as SurveyTDEM
 from SimPEG.EM.TDEM.FieldsTDEM import (
     FieldsTDEM, Fields3D_b, Fields3D_e, Fields3D_h, Fields3D_j, Fields_Derivs
 )
+from SimPEG.EM.TDEM.SrcTDEM import StepOffWaveform
 from scipy.constants import mu_0
 import time
 
@@ -16,13 +18,90 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
     We start with the first order form of Maxwell's equations, eliminate and
     solve the second order form. For the time discretization, we use backward
     Euler.
+
+    For step-off sources, the fields can instead be computed with a rational
+    Krylov approximation of the matrix exponential
+    (:code:`timeStepping = 'RationalKrylov'`). They are then evaluated
+    directly at the nodes of the time mesh, which only sets the times where
+    the fields are needed (e.g. the receiver times), with one factorization
+    per pole. Jvec and Jtvec still use backward Euler.
     """
     surveyPair = SurveyTDEM  #: A SimPEG.EM.TDEM.SurveyTDEM Class
     fieldsPair = FieldsTDEM  #: A SimPEG.EM.TDEM.FieldsTDEM Class
 
+    #: Memory (GB) kept for the factorizations of Adiag, None for no limit
+    maxFactorMemory = 4.
+
+    #: True if Adiag is symmetric, Adiag^T is then solved with its factors
+    _AisSymmetric = False
+
+    #: Storage options of the fields, e.g. {'checkpointInterval': 10}, see
+    #: :class:`SimPEG.Fields.TimeFields`
+    fieldsOpts = {}
+
+    #: Forward engine, 'BackwardEuler' or 'RationalKrylov'
+    timeStepping = 'BackwardEuler'
+    #: Number of poles (factorizations) of the rational Krylov engine
+    nPoles = 4
+    #: Dimension of the rational Krylov subspace
+    krylovSize = 40
+
     def __init__(self, mesh, **kwargs):
         BaseEMProblem.__init__(self, mesh, **kwargs)
 
+    @property
+    def deleteTheseOnModelUpdate(self):
+        return super(BaseTDEMProblem, self).deleteTheseOnModelUpdate + [
+            '_AdiagInv'
+        ]
+
+    def getAdiagInv(self, tInd, adjoint=False):
+        """
+        Factorization of the diagonal block of the system matrix (or of its
+        transpose) at a given time index. Adiag only depends on the time
+        step, so each distinct dt is factored once per model and shared by
+        fields, Jvec and Jtvec, within the memory set by
+        :attr:`maxFactorMemory`. The factorizations are cleaned when the
+        model changes.
+
+        :param int tInd: time index
+        :param bool adjoint: factorization of Adiag^T
+        :rtype: Solver
+        :return: Adiaginv
+        """
+        dt = self.timeSteps[tInd]
+        adjoint = adjoint and not self._AisSymmetric
+
+        Adiaginv = self._AdiagInvCache.get((dt, adjoint))
+
+        if Adiaginv is None:
+            A = self.getAdiag(tInd)
+            if adjoint:
+                A = A.T
+            if self.verbose:
+                print('Factoring...   (dt = {:e})'.format(dt))
+            Adiaginv = self._AdiagInvCache.add(
+                (dt, adjoint), self.Solver(A, **self.solverOpts), A
+            )
+            if self.verbose:
+                print('Done')
+
+        return Adiaginv
+
+    @property
+    def _AdiagInvCache(self):
+        if getattr(self, '_AdiagInv', None) is None:
+            self._AdiagInv = Utils.SolverUtils.SolverCache(
+                self.maxFactorMemory
+            )
+        return self._AdiagInv
+
+    def clean(self):
+        """
+        Clean factors
+        """
+        self._AdiagInvCache.clean()
+
     # def fields_nostore(self, m):
     #     """
     #     Solve the forward problem without storing fields
@@ -45,40 +124,29 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
         tic = time.time()
         self.model = m
 
-        F = self.fieldsPair(self.mesh, self.survey)
+        F = self.fieldsPair(self.mesh, self.survey, **self.fieldsOpts)
 
         # set initial fields
         F[:, self._fieldType+'Solution', 0] = self.getInitialFields()
 
+        if self.timeStepping == 'RationalKrylov':
+            return self._fieldsRationalKrylov(F)
+        elif self.timeStepping != 'BackwardEuler':
+            raise ValueError(
+                "timeStepping must be 'BackwardEuler' or 'RationalKrylov', "
+                "not {}".format(self.timeStepping)
+            )
+
         # timestep to solve forward
         if self.verbose:
             print('{}\nCalculating fields(m)\n{}'.format('*'*50, '*'*50))
-        Ainv = None
         for tInd, dt in enumerate(self.timeSteps):
-            # keep factors if dt is the same as previous step b/c A will be the
-            # same
-            if Ainv is not None and (
-                tInd > 0 and dt != self.timeSteps[tInd - 1]
-            ):
-                Ainv.clean()
-                Ainv = None
-
-            if Ainv is None:
-                A = self.getAdiag(tInd)
-                if self.verbose:
-                    print('Factoring...   (dt = {:e})'.format(dt))
-                Ainv = self.Solver(A, **self.solverOpts)
-                if self.verbose:
-                    print('Done')
-
-            rhs = self.getRHS(tInd+1)  # this is on the nodes of the time mesh
-            Asubdiag = self.getAsubdiag(tInd)
-
             if self.verbose:
                 print('    Solving...   (tInd = {:d})'.format(tInd+1))
             # taking a step
-            sol = Ainv * (rhs - Asubdiag * F[:, (self._fieldType + 'Solution'),
-                                             tInd])
+            sol = self.stepFields(
+                tInd, F[:, (self._fieldType + 'Solution'), tInd]
+            )
 
             if self.verbose:
                 print('    Done...')
@@ -88,9 +156,136 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
             F[:, self._fieldType+'Solution', tInd+1] = sol
         if self.verbose:
             print('{}\nDone calculating fields(m)\n{}'.format('*'*50, '*'*50))
-        Ainv.clean()
         return F
 
+    def _fieldsRationalKrylov(self, F):
+        """
+        Fields at the nodes of the time mesh from the initial fields of
+        step-off sources. The semi-discrete system
+
+        .. math::
+            \mathbf{M} \frac{d\mathbf{u}}{dt} + \mathbf{K} \mathbf{u} = 0
+
+        with :math:`\mathbf{A_{diag}} = \mathbf{K} + \mathbf{M}/dt` and
+        :math:`\mathbf{A_{subdiag}} = - \mathbf{M}/dt`, is projected on the
+        rational Krylov subspace spanned by
+        :math:`(\mathbf{K} + \sigma_j \mathbf{M})^{-1} \mathbf{M}` from the
+        initial fields of each source, where the matrix exponential is
+        evaluated. The poles are log-spaced between the inverse of the first
+        and last times, and :math:`\mathbf{K} + \sigma_j \mathbf{M}` is
+        Adiag for :math:`dt = 1/\sigma_j`.
+        """
+        ftype = self._fieldType + 'Solution'
+
+        if self._fieldType not in ['b', 'h']:
+            raise NotImplementedError(
+                'The rational Krylov engine starts from the initial fields '
+                'of the sources, use Problem3D_b or Problem3D_h'
+            )
+        for src in self.survey.srcList:
+            if not (
+                isinstance(src.waveform, StepOffWaveform) and
+                src.waveform.offTime <= self.t0
+            ):
+                raise NotImplementedError(
+                    'The rational Krylov engine is only implemented for '
+                    'step-off waveforms switched off before t0'
+                )
+
+        dt = self.timeSteps[0]
+        Asubdiag = self.getAsubdiag(0)
+        M = -dt * Asubdiag
+        K = self.getAdiag(0) + Asubdiag
+
+        t = self.times[1:] - self.times[0]
+        poles = np.logspace(
+            np.log10(1./t[-1]), np.log10(1./t[0]), self.nPoles
+        )
+
+        U0 = F[:, ftype, 0].reshape((M.shape[0], -1), order='F')
+        nSrc = U0.shape[1]
+        beta = np.linalg.norm(U0, axis=0)
+
+        # orthonormal bases of the Krylov subspaces of the sources with
+        # initial fields
+        srcInds = [i for i in range(nSrc) if beta[i] > 0.]
+        V = [[U0[:, i] / beta[i]] for i in srcInds]
+        active = list(range(len(V)))
+
+        for j in range(1, self.krylovSize):
+            if len(active) == 0:
+                break
+            sigma = poles[(j-1) % self.nPoles]
+            Ainv = self._getPoleInv(sigma, K, M)
+
+            # the active sources are solved at once
+            W = Ainv * (M * np.column_stack([V[i][-1] for i in active]))
+            W = W.reshape((M.shape[0], len(active)), order='F')
+
+            for w, i in zip(W.T, list(active)):
+                Vi = np.column_stack(V[i])
+                nrm = np.linalg.norm(w)
+                # twice is enough
+                for _ in range(2):
+                    w = w - Vi.dot(Vi.T.dot(w))
+                if np.linalg.norm(w) <= 1e-12 * nrm:
+                    # the subspace is invariant, the fields are exact
+                    active.remove(i)
+                    continue
+                V[i].append(w / np.linalg.norm(w))
+
+        # coefficients of the fields in the bases at each time
+        coefs = []
+        for i, Vi in zip(srcInds, V):
+            Vi = np.column_stack(Vi)
+            lam, X = scipy.linalg.eig(Vi.T.dot(K * Vi), Vi.T.dot(M * Vi))
+            c = np.linalg.solve(X, beta[i] * np.eye(Vi.shape[1])[:, 0])
+            coefs.append(
+                (Vi, X.dot(np.exp(-np.outer(lam, t)) * c[:, np.newaxis]).real)
+            )
+
+        for tInd in range(self.nT):
+            u = np.zeros((M.shape[0], nSrc))
+            for i, (Vi, coef) in zip(srcInds, coefs):
+                u[:, i] = Vi.dot(coef[:, tInd])
+            F[:, ftype, tInd+1] = u
+
+        if self.verbose:
+            print('{}\nDone calculating fields(m)\n{}'.format('*'*50, '*'*50))
+        return F
+
+    def _getPoleInv(self, sigma, K, M):
+        """
+        Factorization of K + sigma M, shared with Adiag for dt = 1/sigma
+        """
+        key = (1./sigma, False)
+        Ainv = self._AdiagInvCache.get(key)
+        if Ainv is None:
+            A = K + sigma * M
+            if self.verbose:
+                print('Factoring...   (pole = {:e})'.format(sigma))
+            Ainv = self._AdiagInvCache.add(
+                key, self.Solver(A, **self.solverOpts), A
+            )
+        return Ainv
+
+    def stepFields(self, tInd, u):
+        """
+        Take a time step for all the sources
+
+        :param int tInd: time index
+        :param numpy.ndarray u: solution at tInd (nP, nSrc)
+        :rtype: numpy.ndarray
+        :return: solution at tInd+1
+        """
+        # factors are shared by all the steps with the same dt
+        Ainv = self.getAdiagInv(tInd)
+
+        rhs = self.getRHS(tInd+1)  # this is on the nodes of the time mesh
+        Asubdiag = self.getAsubdiag(tInd)
+
+        return Ainv * (rhs - Asubdiag * u)
+
     def Jvec(self, m, v, f=None):
         """
         Jvec computes the sensitivity times a vector
@@ -137,22 +332,15 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
         # store the field derivs we need to project to calc full deriv
         df_dm_v = Fields_Derivs(self.mesh, self.survey)
 
-        Adiaginv = None
-
         for tInd, dt in zip(range(self.nT), self.timeSteps):
-            # keep factors if dt is the same as previous step b/c A will be the
-            # same
-            if Adiaginv is not None and (tInd > 0 and dt !=
-                                         self.timeSteps[tInd - 1]):
-                Adiaginv.clean()
-                Adiaginv = None
-
-            if Adiaginv is None:
-                A = self.getAdiag(tInd)
-                Adiaginv = self.Solver(A, **self.solverOpts)
+            # factors shared with fields
+            Adiaginv = self.getAdiagInv(tInd)
 
             Asubdiag = self.getAsubdiag(tInd)
 
+            # right hand sides of all the sources, one column per source
+            JRHS = np.empty_like(dun_dm_v)
+
             for i, src in enumerate(self.survey.srcList):
 
                 # here, we are lagging by a timestep, so filling in as we go
@@ -177,13 +365,15 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
                     tInd, f[src, ftype, tInd], v
                 )
 
-                JRHS = dRHS_dm_v - dAsubdiag_dm_v - dA_dm_v
+                JRHS[:, i] = Utils.mkvc(
+                    dRHS_dm_v - dAsubdiag_dm_v - dA_dm_v
+                )
 
-                # step in time and overwrite
-                if tInd != len(self.timeSteps+1):
-                    dun_dm_v[:, i] = Adiaginv * (
-                        JRHS - Asubdiag * dun_dm_v[:, i]
-                    )
+            # step all the sources in time and overwrite: one multi-column
+            # solve per time step
+            dun_dm_v = (
+                Adiaginv * (JRHS - Asubdiag * dun_dm_v)
+            ).reshape(JRHS.shape, order='F')
 
         Jv = []
         for src in self.survey.srcList:
@@ -194,7 +384,6 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
                         )
                     )
                 )
-        Adiaginv.clean()
         # del df_dm_v, dun_dm_v, Asubdiag
         # return Utils.mkvc(Jv)
         return np.hstack(Jv)
@@ -231,11 +420,11 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
 
         df_duT_v = Fields_Derivs(self.mesh, self.survey)
 
-        # same size as fields at a single timestep
+        # same size as fields at a single timestep, one column per source
         ATinv_df_duT_v = np.zeros(
             (
-                len(self.survey.srcList),
-                len(f[self.survey.srcList[0], ftype, 0])
+                len(f[self.survey.srcList[0], ftype, 0]),
+                len(self.survey.srcList)
             ),
             dtype=float
         )
@@ -264,7 +453,12 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
                 # self.timeMesh.nN), order='F')
                 df_duTFun = getattr(f, '_{}Deriv'.format(rx.projField), None)
 
-                for tInd in range(self.nT+1):
+                # PT_v is only nonzero on the time slices used by the receiver
+                _, timeInds, _, _ = rx.getInterpolation(
+                    self.mesh, self.timeMesh, f
+                )
+
+                for tInd in timeInds:
                     cur = df_duTFun(
                         tInd, src, None, Utils.mkvc(
                             PT_v[src, '{}Deriv'.format(rx.projField), tInd]
@@ -279,58 +473,42 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
 
         del PT_v # no longer need this
 
-        AdiagTinv = None
-
         # Do the back-solve through time
-        # if the previous timestep is the same: no need to refactor the matrix
-        # for tInd, dt in zip(range(self.nT), self.timeSteps):
+        # the factors of each dt are shared with fields and Jvec
 
         for tInd in reversed(range(self.nT)):
-            # tInd = tIndP - 1
-            if AdiagTinv is not None and (
-                tInd <= self.nT and
-                self.timeSteps[tInd] != self.timeSteps[tInd+1]
-            ):
-                AdiagTinv.clean()
-                AdiagTinv = None
+            AdiagTinv = self.getAdiagInv(tInd, adjoint=True)
 
-            # refactor if we need to
-            if AdiagTinv is None:  # and tInd > -1:
-                Adiag = self.getAdiag(tInd)
-                AdiagTinv = self.Solver(Adiag.T, **self.solverOpts)
+            # solve against df_duT_v for all the sources at once
+            df_duT_v_t = np.column_stack([
+                Utils.mkvc(
+                    df_duT_v[src, '{}Deriv'.format(self._fieldType), tInd+1]
+                )
+                for src in self.survey.srcList
+            ])
 
             if tInd < self.nT - 1:
                 Asubdiag = self.getAsubdiag(tInd+1)
+                df_duT_v_t = df_duT_v_t - Asubdiag.T * ATinv_df_duT_v
+
+            ATinv_df_duT_v = (AdiagTinv * df_duT_v_t).reshape(
+                df_duT_v_t.shape, order='F'
+            )
 
             for isrc, src in enumerate(self.survey.srcList):
 
-                # solve against df_duT_v
-                if tInd >= self.nT-1:
-                    # last timestep (first to be solved)
-                    ATinv_df_duT_v[isrc, :] = AdiagTinv * df_duT_v[
-                        src, '{}Deriv'.format(self._fieldType), tInd+1]
-                elif tInd > -1:
-                    ATinv_df_duT_v[isrc, :] = AdiagTinv * (
-                        Utils.mkvc(df_duT_v[
-                            src, '{}Deriv'.format(self._fieldType), tInd+1
-                        ]
-                        ) - Asubdiag.T * Utils.mkvc(ATinv_df_duT_v[isrc, :]))
-
-                if tInd < self.nT:
-                    dAsubdiagT_dm_v = self.getAsubdiagDeriv(
-                        tInd, f[src, ftype, tInd], ATinv_df_duT_v[isrc, :],
-                        adjoint=True)
-                else:
-                    dAsubdiagT_dm_v = Utils.Zero()
+                dAsubdiagT_dm_v = self.getAsubdiagDeriv(
+                    tInd, f[src, ftype, tInd], ATinv_df_duT_v[:, isrc],
+                    adjoint=True)
 
                 dRHST_dm_v = self.getRHSDeriv(
-                        tInd+1, src, ATinv_df_duT_v[isrc, :], adjoint=True
+                        tInd+1, src, ATinv_df_duT_v[:, isrc], adjoint=True
                         )  # on nodes of time mesh
 
                 un_src = f[src, ftype, tInd+1]
                 # cell centered on time mesh
                 dAT_dm_v = self.getAdiagDeriv(
-                    tInd, un_src, ATinv_df_duT_v[isrc, :], adjoint=True
+                    tInd, un_src, ATinv_df_duT_v[:, isrc], adjoint=True
                 )
 
                 JTv = JTv + Utils.mkvc(
@@ -338,8 +516,6 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
                 )
 
         # del df_duT_v, ATinv_df_duT_v, A, Asubdiag
-        if AdiagTinv is not None:
-            AdiagTinv.clean()
 
         return Utils.mkvc(JTv).astype(float)
 
@@ -479,6 +655,10 @@ class Problem3D_b(BaseTDEMProblem):
     fieldsPair = Fields3D_b  #: A SimPEG.EM.TDEM.Fields3D_b object
     surveyPair = SurveyTDEM
 
+    @property
+    def _AisSymmetric(self):
+        return self._makeASymmetric is True
+
     def __init__(self, mesh, **kwargs):
         BaseTDEMProblem.__init__(self, mesh, **kwargs)
 
@@ -648,6 +828,7 @@ class Problem3D_e(BaseTDEMProblem):
     fieldsPair = Fields3D_e  #: A Fields3D_e
     surveyPair = SurveyTDEM
     Adcinv = None
+    _AisSymmetric = True
 
     def __init__(self, mesh, **kwargs):
         BaseTDEMProblem.__init__(self, mesh, **kwargs)
@@ -671,11 +852,11 @@ class Problem3D_e(BaseTDEMProblem):
 
         df_duT_v = Fields_Derivs(self.mesh, self.survey)
 
-        # same size as fields at a single timestep
+        # same size as fields at a single timestep, one column per source
         ATinv_df_duT_v = np.zeros(
             (
-                len(self.survey.srcList),
-                len(f[self.survey.srcList[0], ftype, 0])
+                len(f[self.survey.srcList[0], ftype, 0]),
+                len(self.survey.srcList)
             ),
             dtype=float
         )
@@ -705,7 +886,12 @@ class Problem3D_e(BaseTDEMProblem):
                 # self.timeMesh.nN), order='F')
                 df_duTFun = getattr(f, '_{}Deriv'.format(rx.projField), None)
 
-                for tInd in range(self.nT+1):
+                # PT_v is only nonzero on the time slices used by the receiver
+                _, timeInds, _, _ = rx.getInterpolation(
+                    self.mesh, self.timeMesh, f
+                )
+
+                for tInd in timeInds:
                     cur = df_duTFun(
                         tInd, src, None, Utils.mkvc(
                             PT_v[src, '{}Deriv'.format(rx.projField), tInd]
@@ -722,55 +908,42 @@ class Problem3D_e(BaseTDEMProblem):
         # no longer need this
         del PT_v
 
-        AdiagTinv = None
-
         # Do the back-solve through time
-        # if the previous timestep is the same: no need to refactor the matrix
-        # for tInd, dt in zip(range(self.nT), self.timeSteps):
+        # the factors of each dt are shared with fields and Jvec
 
         for tInd in reversed(range(self.nT)):
-            # tInd = tIndP - 1
-            if AdiagTinv is not None and (
-                tInd <= self.nT and
-                self.timeSteps[tInd] != self.timeSteps[tInd+1]
-            ):
-                AdiagTinv.clean()
-                AdiagTinv = None
+            AdiagTinv = self.getAdiagInv(tInd, adjoint=True)
 
-            # refactor if we need to
-            if AdiagTinv is None:  # and tInd > -1:
-                Adiag = self.getAdiag(tInd)
-                AdiagTinv = self.Solver(Adiag.T, **self.solverOpts)
+            # solve against df_duT_v for all the sources at once
+            df_duT_v_t = np.column_stack([
+                Utils.mkvc(
+                    df_duT_v[src, '{}Deriv'.format(self._fieldType), tInd+1]
+                )
+                for src in self.survey.srcList
+            ])
 
             if tInd < self.nT - 1:
                 Asubdiag = self.getAsubdiag(tInd+1)
+                df_duT_v_t = df_duT_v_t - Asubdiag.T * ATinv_df_duT_v
 
-            for isrc, src in enumerate(self.survey.srcList):
+            ATinv_df_duT_v = (AdiagTinv * df_duT_v_t).reshape(
+                df_duT_v_t.shape, order='F'
+            )
 
-                # solve against df_duT_v
-                if tInd >= self.nT-1:
-                    # last timestep (first to be solved)
-                    ATinv_df_duT_v[isrc, :] = AdiagTinv * df_duT_v[
-                        src, '{}Deriv'.format(self._fieldType), tInd+1]
-                elif tInd > -1:
-                    ATinv_df_duT_v[isrc, :] = AdiagTinv * (
-                        Utils.mkvc(df_duT_v[
-                            src, '{}Deriv'.format(self._fieldType), tInd+1
-                        ]
-                        ) - Asubdiag.T * Utils.mkvc(ATinv_df_duT_v[isrc, :]))
+            for isrc, src in enumerate(self.survey.srcList):
 
                 dAsubdiagT_dm_v = self.getAsubdiagDeriv(
-                    tInd, f[src, ftype, tInd], ATinv_df_duT_v[isrc, :],
+                    tInd, f[src, ftype, tInd], ATinv_df_duT_v[:, isrc],
                     adjoint=True)
 
                 dRHST_dm_v = self.getRHSDeriv(
-                        tInd+1, src, ATinv_df_duT_v[isrc, :], adjoint=True
+                        tInd+1, src, ATinv_df_duT_v[:, isrc], adjoint=True
                         )  # on nodes of time mesh
 
                 un_src = f[src, ftype, tInd+1]
                 # cell centered on time mesh
                 dAT_dm_v = self.getAdiagDeriv(
-                    tInd, un_src, ATinv_df_duT_v[isrc, :], adjoint=True
+                    tInd, un_src, ATinv_df_duT_v[:, isrc], adjoint=True
                 )
 
                 JTv = JTv + Utils.mkvc(
@@ -784,21 +957,21 @@ class Problem3D_e(BaseTDEMProblem):
         for isrc, src in enumerate(self.survey.srcList):
             if src.srcType == "Galvanic":
 
-                ATinv_df_duT_v[isrc, :] = Grad*(self.Adcinv*(Grad.T*(
+                ATinv_df_duT_v[:, isrc] = Grad*(self.Adcinv*(Grad.T*(
                     Utils.mkvc(df_duT_v[
                         src, '{}Deriv'.format(self._fieldType), tInd+1
                     ]
-                    ) - Asubdiag.T * Utils.mkvc(ATinv_df_duT_v[isrc, :]))
+                    ) - Asubdiag.T * Utils.mkvc(ATinv_df_duT_v[:, isrc]))
                 ))
 
                 dRHST_dm_v = self.getRHSDeriv(
-                        tInd+1, src, ATinv_df_duT_v[isrc, :], adjoint=True
+                        tInd+1, src, ATinv_df_duT_v[:, isrc], adjoint=True
                         )  # on nodes of time mesh
 
                 un_src = f[src, ftype, tInd+1]
                 # cell centered on time mesh
                 dAT_dm_v = (
-                    self.MeSigmaDeriv(un_src).T * ATinv_df_duT_v[isrc, :]
+                    self.MeSigmaDeriv(un_src).T * ATinv_df_duT_v[:, isrc]
                     )
 
                 JTv = JTv + Utils.mkvc(
@@ -806,8 +979,6 @@ class Problem3D_e(BaseTDEMProblem):
                 )
 
         # del df_duT_v, ATinv_df_duT_v, A, Asubdiag
-        if AdiagTinv is not None:
-            AdiagTinv.clean()
 
         return Utils.mkvc(JTv).astype(float)
 
@@ -932,6 +1103,7 @@ class Problem3D_e(BaseTDEMProblem):
         """
         Clean factors
         """
+        BaseTDEMProblem.clean(self)
         if self.Adcinv is not None:
             self.Adcinv.clean()
 
@@ -976,6 +1148,7 @@ class Problem3D_h(BaseTDEMProblem):
     _formulation = 'HJ'
     fieldsPair = Fields3D_h  #: Fields object pair
     surveyPair = SurveyTDEM
+    _AisSymmetric = True
 
     def __init__(self, mesh, **kwargs):
         BaseTDEMProblem.__init__(self, mesh, **kwargs)
@@ -1052,6 +1225,10 @@ class Problem3D_j(BaseTDEMProblem):
     fieldsPair = Fields3D_j  #: Fields object pair
     surveyPair = SurveyTDEM  #: survey
 
+    @property
+    def _AisSymmetric(self):
+        return self._makeASymmetric is True
+
     def __init__(self, mesh, **kwargs):
         BaseTDEMProblem.__init__(self, mesh, **kwargs)
 
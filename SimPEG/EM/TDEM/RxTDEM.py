@@ -1,3 +1,4 @@
+import numpy as np
 import SimPEG
 from SimPEG import Utils
 import scipy.sparse as sp
@@ -86,9 +87,44 @@ class BaseRx(SimPEG.Survey.BaseTimeRx):
         # else:
         return timeMesh.getInterpolationMat(self.times, self.projTLoc(f))
 
+    def getInterpolation(self, mesh, timeMesh, f):
+        """
+            Returns the spatial projection matrix, the indices of the time
+            slices used by the receiver times and the time interpolation
+            restricted to those slices. The projection :code:`getP` is the
+            kron product of these, but it is never formed.
+
+            .. note::
+
+                These are stored as a dictionary (mesh, timeMesh) if
+                storeProjections is True
+        """
+        if getattr(self, '_Pinterp', None) is None:
+            self._Pinterp = {}
+        if (mesh, timeMesh) in self._Pinterp:
+            return self._Pinterp[(mesh, timeMesh)]
+
+        Ps = self.getSpatialP(mesh, f)
+        Pt = self.getTimeP(timeMesh, f).tocsc()
+        timeInds = np.unique(Pt.tocoo().col)
+        interp = (Ps, timeInds, Pt[:, timeInds].tocsr(), Pt.shape[1])
+
+        if self.storeProjections:
+            self._Pinterp[(mesh, timeMesh)] = interp
+
+        return interp
+
+    def _evalTimeSlices(self, src, mesh, timeMesh, f, fieldType):
+        Ps, timeInds, Pt, _ = self.getInterpolation(mesh, timeMesh, f)
+        f_part = f[src, fieldType, timeInds].reshape(
+            (Ps.shape[1], len(timeInds)), order='F'
+        )
+        return Utils.mkvc(Ps * (Pt * f_part.T).T)
+
     def eval(self, src, mesh, timeMesh, f):
         """
-        Project fields to receivers to get data.
+        Project fields to receivers to get data. Only the time slices that
+        bracket the receiver times are used.
 
         :param SimPEG.EM.TDEM.SrcTDEM.BaseSrc src: TDEM source
         :param BaseMesh mesh: mesh used
@@ -96,10 +132,7 @@ class BaseRx(SimPEG.Survey.BaseTimeRx):
         :rtype: numpy.ndarray
         :return: fields projected to recievers
         """
-
-        P = self.getP(mesh, timeMesh, f)
-        f_part = Utils.mkvc(f[src, self.projField, :])
-        return P*f_part
+        return self._evalTimeSlices(src, mesh, timeMesh, f, self.projField)
 
     def evalDeriv(self, src, mesh, timeMesh, f, v, adjoint=False):
         """
@@ -114,13 +147,16 @@ class BaseRx(SimPEG.Survey.BaseTimeRx):
         :return: fields projected to recievers
         """
 
-        P = self.getP(mesh, timeMesh, f)
+        Ps, timeInds, Pt, nT = self.getInterpolation(mesh, timeMesh, f)
         if not adjoint:
-            return P * v # Utils.mkvc(v[src, self.projField+'Deriv', :])
+            v = v.reshape((Ps.shape[1], nT), order='F')[:, timeInds]
+            return Utils.mkvc(Ps * (Pt * v.T).T)
         elif adjoint:
-            # dP_dF_T = P.T * v #[src, self]
-            # newshape = (len(dP_dF_T)/timeMesh.nN, timeMesh.nN )
-            return P.T * v # np.reshape(dP_dF_T, newshape, order='F')
+            # scatter into the time slices used by the receiver only
+            v = v.reshape((Ps.shape[0], Pt.shape[0]), order='F')
+            PT_v = np.zeros((Ps.shape[1], nT), dtype=v.dtype)
+            PT_v[:, timeInds] = Ps.T * (Pt.T * v.T).T
+            return Utils.mkvc(PT_v)
 
 
 class Point_e(BaseRx):
@@ -169,9 +205,7 @@ class Point_dbdt(BaseRx):
         if self.projField in f.aliasFields:
             return super(Point_dbdt, self).eval(src, mesh, timeMesh, f)
 
-        P = self.getP(mesh, timeMesh, f)
-        f_part = Utils.mkvc(f[src, 'b', :])
-        return P*f_part
+        return self._evalTimeSlices(src, mesh, timeMesh, f, 'b')
 
     def projGLoc(self, f):
         """Grid Location projection (e.g. Ex Fy ...)"""
@@ -277,14 +277,31 @@ class MagDipole(BaseTDEMSrc):
 
         return a
 
+    def _primaryKey(self, prob):
+        """
+        The source fields only depend on these, sources that share them
+        share their fields
+        """
+        return (
+            self.__class__, tuple(Utils.mkvc(self.loc)), self.moment, self.mu,
+            tuple(self.orientation), getattr(self, 'radius', None),
+            prob._formulation
+        )
+
     def _bSrc(self, prob):
+        """
+        Curl of the vector potential. It is computed once and shared through
+        :code:`prob.primaryFieldCache`.
+        """
         if prob._formulation == 'EB':
             C = prob.mesh.edgeCurl
 
         elif prob._formulation == 'HJ':
             C = prob.mesh.edgeCurl.T
 
-        return C*self._aSrc(prob)
+        return prob.primaryFieldCache.get(
+            self._primaryKey(prob), lambda: C*self._aSrc(prob)
+        )
 
     def bInitial(self, prob):
 
@@ -34,3 +34,25 @@ class Survey(SimPEG.Survey.BaseSurvey):
 
     def evalDeriv(self, u, v=None, adjoint=False):
         raise Exception('Use Receivers to project fields deriv.')
+
+
+class Survey_F2T(Survey):
+    """
+    Time domain electromagnetic survey of a
+    :class:`SimPEG.EM.TDEM.ProblemF2T.Problem3D_F2T`, whose fields are
+    solved in the frequency domain
+    """
+
+    def eval(self, f):
+        """
+        TDEM data of the frequency domain fields, filtered from the data of
+        the FDEM survey of the problem.
+
+        :param SimPEG.EM.FDEM.FieldsFDEM f: fields object
+        :rtype: SimPEG.Survey.Data
+        :return: data
+        """
+        fdemData = self.prob.fdemSurvey.eval(f)
+        return SimPEG.Survey.Data(
+            self, self.prob.transform * Utils.mkvc(fdemData)
+        )
@@ -1,10 +1,11 @@
 from .ProblemTDEM import (
     BaseTDEMProblem, Problem3D_b, Problem3D_e, Problem3D_h, Problem3D_j
 )
+from .ProblemF2T import Problem3D_F2T
 from .FieldsTDEM import (
     FieldsTDEM, Fields3D_b, Fields3D_e, Fields3D_h, Fields3D_j
 )
-from .SurveyTDEM import Survey
+from .SurveyTDEM import Survey, Survey_F2T
 from . import SrcTDEM as Src
 from . import RxTDEM as Rx
 
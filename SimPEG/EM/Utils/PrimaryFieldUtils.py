@@ -0,0 +1,74 @@
+from __future__ import division
+from collections import OrderedDict
+import threading
+
+
+class PrimaryFieldCache(object):
+    """
+    Least recently used cache of the primary fields of the sources.
+
+    ::
+
+        b = prob.primaryFieldCache.get(key, lambda: C * a)
+
+    Primary fields do not depend on the inversion model, so they are
+    computed once per key (typically the source parameters) and shared by
+    all the sources, frequencies and times of the problem using that key.
+    Each problem holds its own cache, which is released with the problem
+    and its mesh. The cached arrays are read only. Fields are evicted from
+    the least recently used, once the memory held by the cache exceeds
+    maxMemory (GB). The most recent field is always kept.
+    """
+
+    def __init__(self, maxMemory=1.):
+        self.maxMemory = maxMemory
+        self._fields = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def get(self, key, fct):
+        """Cached field for key, computed with fct() if it is not cached"""
+        with self._lock:
+            if key in self._fields:
+                # Move to the most recently used
+                field = self._fields.pop(key)
+                self._fields[key] = field
+                return field
+
+        field = fct()
+        field.flags.writeable = False
+
+        with self._lock:
+            self._fields[key] = field
+
+            if self.maxMemory is not None:
+                while (
+                    len(self._fields) > 1 and
+                    self.memory > self.maxMemory * 1e+9
+                ):
+                    self._fields.popitem(last=False)
+
+        return field
+
+    def __getstate__(self):
+        # The fields are not sent to other processes, which compute their
+        # own in an empty cache
+        return {'maxMemory': self.maxMemory}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def memory(self):
+        """Memory (bytes) held by the cached fields"""
+        return sum(field.nbytes for field in self._fields.values())
+
+    def clean(self):
+        """Remove all the cached fields"""
+        with self._lock:
+            self._fields.clear()
@@ -0,0 +1,106 @@
+from __future__ import division
+import numpy as np
+from scipy.interpolate import splrep, splev
+
+
+def stepOffFrequencies(times, nFreq=40, low=1e-2, high=1e+3):
+    """
+    Log-spaced frequencies (Hz) for the transform of step-off responses at
+    times (s) after the shut-off. The angular frequencies range from
+    low/max(times) to high/min(times).
+
+    :param numpy.ndarray times: times after the shut-off
+    :param int nFreq: number of frequencies
+    :rtype: numpy.ndarray
+    :return: frequencies
+    """
+    times = np.atleast_1d(times)
+    if np.any(times <= 0.):
+        raise ValueError('The times must be after the shut-off.')
+    return np.logspace(
+        np.log10(low/times.max()), np.log10(high/times.min()), nFreq
+    ) / (2.*np.pi)
+
+
+def stepOffTransform(freqs, times, kind='cos', nInterp=100):
+    """
+    Filter transforming the imaginary part of a frequency domain response
+    (:math:`e^{i \\omega t}`), sampled at the frequencies freqs (Hz), to the
+    step-off response (kind='cos') or its time derivative (kind='sin') at the
+    times after the shut-off
+
+    .. math::
+
+        f(t) = - \\frac{2}{\\pi} \\int_0^\\infty
+            \\frac{\\text{Im} F(\\omega)}{\\omega} \\cos(\\omega t) d\\omega
+
+        \\frac{\\partial f}{\\partial t}(t) = \\frac{2}{\\pi} \\int_0^\\infty
+            \\text{Im} F(\\omega) \\sin(\\omega t) d\\omega
+
+    The samples are interpolated with a cubic spline in :math:`\\log \\omega`
+    (nInterp points per decade), tapered over the last decade, extended to
+    :math:`\\omega = 0` and the integrals of the piecewise linear interpolant
+    are exact, so the filter does not depend on the response.
+
+    ::
+
+        T = stepOffTransform(freqs, times, 'cos')
+        b = T.dot(B.imag)
+
+    :param numpy.ndarray freqs: increasing frequencies
+    :param numpy.ndarray times: times after the shut-off
+    :param str kind: 'cos' (fields) or 'sin' (time derivatives)
+    :rtype: numpy.ndarray
+    :return: filter (nTimes, nFreq)
+    """
+    if kind not in ['cos', 'sin']:
+        raise ValueError("kind must be 'cos' or 'sin', not {}".format(kind))
+
+    w = 2.*np.pi*np.asarray(freqs, dtype=float)
+    times = np.atleast_1d(np.asarray(times, dtype=float))
+    if np.any(times <= 0.):
+        raise ValueError('The times must be after the shut-off.')
+
+    # interpolant of each sample (the filter is linear in the samples)
+    nDecade = np.log10(w[-1]/w[0])
+    wI = np.logspace(
+        np.log10(w[0]), np.log10(w[-1]), int(np.ceil(nInterp*nDecade)) + 1
+    )
+    E = np.eye(w.size)
+    if kind == 'cos':
+        E = E / w[:, None]
+    k = min(3, w.size - 1)
+    S = np.column_stack([
+        splev(np.log(wI), splrep(np.log(w), e, k=k, s=0)) for e in E.T
+    ])
+
+    # extend to omega = 0: Im F/omega is constant, Im F linear
+    wI = np.r_[0., wI]
+    S = np.vstack([S[:1] if kind == 'cos' else np.zeros((1, w.size)), S])
+
+    # cosine taper over the last decade
+    taper = np.ones_like(wI)
+    ind = wI > wI[-1]/10.
+    taper[ind] = 0.5*(1. + np.cos(np.pi*np.log10(10.*wI[ind]/wI[-1])))
+    S *= taper[:, None]
+
+    a, b = wI[:-1], wI[1:]
+    slope = (S[1:] - S[:-1]) / (b - a)[:, None]
+
+    T = np.empty((times.size, w.size))
+    for i, t in enumerate(times):
+        # differences of cos and sin without cancellation
+        sinHalf = np.sin((b - a)*t/2.)
+        if kind == 'cos':
+            dCos = -2.*np.sin((a + b)*t/2.)*sinHalf
+            T[i] = -2./np.pi * (
+                (S[-1]*np.sin(wI[-1]*t) - S[0]*np.sin(wI[0]*t))/t +
+                dCos.dot(slope)/t**2
+            )
+        else:
+            dSin = 2.*np.cos((a + b)*t/2.)*sinHalf
+            T[i] = 2./np.pi * (
+                -(S[-1]*np.cos(wI[-1]*t) - S[0]*np.cos(wI[0]*t))/t +
+                dSin.dot(slope)/t**2
+            )
+    return T
@@ -6,3 +6,5 @@ from .AnalyticUtils import (
 from .CurrentUtils import (
     getSourceTermLineCurrentPolygon, getStraightLineCurrentIntegral
     )
+from .PrimaryFieldUtils import PrimaryFieldCache
+from .TransformUtils import stepOffFrequencies, stepOffTransform
@@ -4,6 +4,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from six import string_types
+import tempfile
 import numpy as np
 from . import Utils
 
@@ -187,8 +188,178 @@ class TimeFields(Fields):
         u[:,'phi', timeInd] = phi
         print(u[src0,'phi'])
 
+    The memory used by the known fields can be traded for extra time steps
+    by only storing every :code:`checkpointInterval` time slice (and,
+    optionally, the slices needed by the receivers). The other slices are
+    recomputed from the closest stored slice, a window at a time, with
+    :code:`survey.prob.stepFields` when they are accessed::
+
+        u = TimeFields(mesh, survey, checkpointInterval=10)
+
+    The stored slices can also be kept in a memory-mapped file in
+    :code:`storageDir` rather than in memory.
     """
 
+    #: Store every k-th time slice of the known fields, 1 stores them all
+    checkpointInterval = 1
+    #: Also store the time slices used by the receivers
+    storeRxTimes = False
+    #: Directory of the memory-mapped storage, None keeps it in memory
+    storageDir = None
+
+    @property
+    def _checkpointing(self):
+        return self.checkpointInterval > 1
+
+    @property
+    def _storedTimes(self):
+        """Indices of the time slices kept in storage"""
+        if getattr(self, '_storedTimesCache', None) is None:
+            nT = self.survey.prob.nT + 1
+            storedTimes = np.arange(0, nT, max(self.checkpointInterval, 1))
+            if self._checkpointing and self.storeRxTimes:
+                rxTimes = [
+                    self._rxTimeP(rx).tocoo().col
+                    for src in self.survey.srcList for rx in src.rxList
+                ]
+                storedTimes = np.unique(np.hstack([storedTimes] + rxTimes))
+            self._storedTimesCache = storedTimes.astype(int)
+            # the missing slices can only be recomputed for this model
+            model = getattr(self.survey.prob, 'model', None)
+            if self._checkpointing and model is not None:
+                self._model = np.array(model)
+        return self._storedTimesCache
+
+    def _rxTimeP(self, rx):
+        return rx.getTimeP(self.survey.prob.timeMesh)
+
+    def _initStore(self, name):
+        if name in self._fields:
+            return self._fields[name]
+
+        assert name in self.knownFields, 'field name is not known.'
+
+        if type(self.dtype) is dict:
+            dtype = self.dtype[name]
+        else:
+            dtype = self.dtype
+
+        nP, nSrc, _ = self._storageShape(self.knownFields[name])
+        shape = (nP, nSrc, len(self._storedTimes))
+
+        if self.storageDir is None:
+            field = np.zeros(shape, dtype=dtype)
+        else:
+            # the file is removed when the memory map is released
+            field = np.memmap(
+                tempfile.TemporaryFile(dir=self.storageDir), dtype=dtype,
+                mode='w+', shape=shape
+            )
+
+        self._fields[name] = field
+
+        return field
+
+    def _storedIndex(self, timeII):
+        storedTimes = self._storedTimes
+        ind = np.searchsorted(storedTimes, timeII)
+        if ind < len(storedTimes) and storedTimes[ind] == timeII:
+            return ind
+        return None
+
+    def _window(self, name, timeII, recompute=True):
+        """
+        Slices between two stored slices. If recompute is True, they are
+        stepped from the stored slice, otherwise they are initialized to be
+        set one at a time.
+        """
+        storedTimes = self._storedTimes
+        ind = np.searchsorted(storedTimes, timeII, side='right') - 1
+        start = storedTimes[ind]
+        if ind + 1 < len(storedTimes):
+            stop = storedTimes[ind + 1]
+        else:
+            stop = self.survey.prob.nT + 1
+
+        window = self._windows.get(name, None)
+        if window is not None and window[0] == start:
+            if not recompute or window[2][timeII - start - 1]:
+                return window
+
+        field = self._fields[name]
+        nP, nSrc, _ = field.shape
+        slices = np.zeros((nP, nSrc, stop - start - 1), dtype=field.dtype)
+        filled = np.zeros(stop - start - 1, dtype=bool)
+
+        if recompute:
+            prob = self.survey.prob
+            model = getattr(prob, 'model', None)
+            if getattr(self, '_model', None) is not None and (
+                model is None or model.shape != self._model.shape or
+                not np.allclose(model, self._model)
+            ):
+                raise Exception(
+                    'The model has changed since the fields were computed, '
+                    'the time slices that were not stored cannot be '
+                    'recomputed.'
+                )
+            u = field[:, :, ind]
+            for tInd in range(start, stop - 1):
+                u = prob.stepFields(tInd, u).reshape((nP, nSrc), order='F')
+                slices[:, :, tInd - start] = u
+            filled[:] = True
+
+        window = (start, slices, filled)
+        self._windows[name] = window
+        return window
+
+    def _getSlices(self, name, srcInd, timeInd):
+        """field[:, srcInd, timeInd] of the full time history"""
+        if not self._checkpointing:
+            return self._fields[name][:, srcInd, timeInd]
+
+        timeII = np.arange(self.survey.prob.nT + 1)[timeInd]
+        out = []
+        for tInd in np.atleast_1d(timeII):
+            ind = self._storedIndex(tInd)
+            if ind is not None:
+                out.append(self._fields[name][:, srcInd, ind])
+            else:
+                start, slices, _ = self._window(name, tInd)
+                out.append(slices[:, srcInd, tInd - start - 1])
+        if np.ndim(timeII) == 0:
+            return np.array(out[0])
+        return np.stack(out, axis=-1)
+
+    def _setSlices(self, name, srcInd, timeInd, val):
+        """field[:, srcInd, timeInd] = val on the full time history"""
+        field = self._fields[name]
+        if not self._checkpointing:
+            field[:, srcInd, timeInd] = val
+            return
+
+        timeII = np.arange(self.survey.prob.nT + 1)[timeInd]
+        for i, tInd in enumerate(np.atleast_1d(timeII)):
+            if np.isscalar(val) or np.ndim(timeII) == 0:
+                val_t = val
+            else:
+                val_t = val[..., i]
+            ind = self._storedIndex(tInd)
+            if ind is not None:
+                field[:, srcInd, ind] = val_t
+            else:
+                start, slices, filled = self._window(
+                    name, tInd, recompute=False
+                )
+                slices[:, srcInd, tInd - start - 1] = val_t
+                filled[tInd - start - 1] = True
+
+    @property
+    def _windows(self):
+        if getattr(self, '_windowsCache', None) is None:
+            self._windowsCache = {}
+        return self._windowsCache
+
     def _storageShape(self, loc):
         nP = {'CC': self.mesh.nC,
               'N':  self.mesh.nN,
@@ -237,18 +408,22 @@ class TimeFields(Fields):
         if isinstance(val, np.ndarray) and val.size == 1:
             val = val[0]
         if np.isscalar(val):
-            field[:, srcInd, timeInd] = val
+            self._setSlices(name, srcInd, timeInd, val)
             return
         if val.size != np.array(shape).prod():
             raise ValueError('Incorrect size for data.')
-        correctShape = field[:, srcInd, timeInd].shape
-        field[:, srcInd, timeInd] = val.reshape(correctShape, order='F')
+        correctShape = (field.shape[0],) + np.empty(
+            (1,) + self._storageShape(self.knownFields[name])[1:], dtype=bool
+        )[:, srcInd, timeInd].shape[1:]
+        self._setSlices(
+            name, srcInd, timeInd, val.reshape(correctShape, order='F')
+        )
 
     def _getField(self, name, ind):
         srcInd, timeInd = ind
 
         if name in self._fields:
-            out = self._fields[name][:, srcInd, timeInd]
+            out = self._getSlices(name, srcInd, timeInd)
         else:
             # Aliased fields
             alias, loc, func = self.aliasFields[name]
@@ -258,7 +433,7 @@ class TimeFields(Fields):
                     'not exist in the Fields class.'
                 )
                 func = getattr(self, func)
-            pointerFields = self._fields[alias][:, srcInd, timeInd]
+            pointerFields = self._getSlices(alias, srcInd, timeInd)
             pointerShape = self._correctShape(alias, ind)
             pointerFields = pointerFields.reshape(pointerShape, order='F')
 
@@ -6,6 +6,7 @@ from __future__ import unicode_literals
 from six import integer_types
 from six import string_types
 from collections import namedtuple
+import inspect
 import warnings
 
 import numpy as np
@@ -121,6 +122,22 @@ class IdentityMap(object):
             return sp.identity(self.nP)
         return Utils.Identity()
 
+    def deriv_adjoint(self, m, v):
+        """
+            The adjoint of the derivative of the transformation times a
+            vector.
+
+            :param numpy.array m: model
+            :param numpy.array v: vector to multiply
+            :rtype: numpy.array
+            :return: deriv(m).T * v
+
+        """
+        deriv = self.deriv(m)
+        if isinstance(deriv, Utils.Identity):
+            return v
+        return deriv.T * v
+
     def test(self, m=None, num=4, **kwargs):
         """Test the derivative of the mapping.
 
@@ -276,19 +293,70 @@ class ComboMap(IdentityMap):
             m = map_i * m
         return m
 
+    def _chain(self, m):
+        """
+        Models seen by each map, from the last map to the first, and the
+        key of the model they are cached for
+        """
+        cache = getattr(self, '_chain_cache', None)
+        if cache is not None and np.array_equal(cache[0], m):
+            return cache
+
+        key = np.array(m, copy=True)
+        models = [key]
+        for map_i in reversed(self.maps[1:]):
+            models.append(map_i * models[-1])
+
+        self._chain_cache = (key, models)
+        return self._chain_cache
+
     def deriv(self, m, v=None):
+        """
+            The derivative of the transformation (chain rule).
+
+            With v, the derivative of each map is applied to the vector in
+            turn and the product of the derivatives is not formed. Without
+            v, the product is formed and kept for the model.
+
+            :param numpy.array m: model
+            :param numpy.array v: vector to multiply
+            :rtype: scipy.sparse.csr_matrix
+            :return: derivative of transformed model
+
+        """
+        key, models = self._chain(m)
 
         if v is not None:
-            deriv = v
-        else:
-            deriv = 1
+            for map_i, mi in zip(reversed(self.maps), models):
+                v = _deriv_times(map_i, mi, v)
+            return v
 
-        mi = m
-        for map_i in reversed(self.maps):
+        cache = getattr(self, '_deriv_cache', None)
+        if cache is not None and cache[0] is key:
+            return cache[1]
+
+        deriv = 1
+        for map_i, mi in zip(reversed(self.maps), models):
             deriv = map_i.deriv(mi) * deriv
-            mi = map_i * mi
+        self._deriv_cache = (key, deriv)
         return deriv
 
+    def deriv_adjoint(self, m, v):
+        """
+            The adjoint of the derivative times a vector, the adjoint of
+            each map is applied to the vector in turn.
+
+            :param numpy.array m: model
+            :param numpy.array v: vector to multiply
+            :rtype: numpy.array
+            :return: deriv(m).T * v
+
+        """
+        _, models = self._chain(m)
+        for map_i, mi in zip(self.maps, reversed(models)):
+            v = map_i.deriv_adjoint(mi, v)
+        return v
+
     def __str__(self):
         return 'ComboMap[{0!s}]({1!s},{2!s})'.format(
             ' * '.join([m.__str__() for m in self.maps]),
@@ -300,6 +368,21 @@ class ComboMap(IdentityMap):
         return len(self.maps)
 
 
+def _is_vector(v):
+    return isinstance(v, np.ndarray) and v.ndim == 1
+
+
+def _deriv_times(mapping, m, v):
+    """mapping.deriv(m) * v, with the vector when deriv accepts one"""
+    try:
+        accepts_v = 'v' in inspect.signature(mapping.deriv).parameters
+    except AttributeError:  # python 2
+        accepts_v = 'v' in inspect.getargspec(mapping.deriv).args
+    if accepts_v:
+        return mapping.deriv(m, v)
+    return mapping.deriv(m) * v
+
+
 class Projection(IdentityMap):
     """
         A map to rearrange / select parameters
@@ -347,6 +430,9 @@ class Projection(IdentityMap):
             return self.P * v
         return self.P
 
+    def deriv_adjoint(self, m, v):
+        return self.P.T * v
+
 
 class Wires(object):
 
@@ -708,11 +794,16 @@ class ExpMap(IdentityMap):
 
                 \\frac{\partial \exp{m}}{\partial m} = \\text{sdiag}(\exp{m})
         """
+        if _is_vector(v):
+            return np.exp(Utils.mkvc(m)) * v
         deriv = Utils.sdiag(np.exp(Utils.mkvc(m)))
         if v is not None:
             return deriv * v
         return deriv
 
+    def deriv_adjoint(self, m, v):
+        return self.deriv(m, v)
+
 
 class ReciprocalMap(IdentityMap):
     """
@@ -735,11 +826,16 @@ class ReciprocalMap(IdentityMap):
 
     def deriv(self, m, v=None):
         # TODO: if this is a tensor, you might have a problem.
+        if _is_vector(v):
+            return - Utils.mkvc(m)**(-2) * v
         deriv = Utils.sdiag(- Utils.mkvc(m)**(-2))
         if v is not None:
             return deriv * v
         return deriv
 
+    def deriv_adjoint(self, m, v):
+        return self.deriv(m, v)
+
 
 class LogMap(IdentityMap):
     """
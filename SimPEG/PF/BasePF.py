@@ -0,0 +1,691 @@
+from __future__ import print_function
+
+import hashlib
+import multiprocessing
+import multiprocessing.pool
+import os
+import numpy as np
+import scipy.sparse as sp
+
+from SimPEG import Problem
+
+
+class BaseIntegralProblem(Problem.LinearProblem):
+    """
+    Base class for the potential field problems in integral form.
+
+    The rows of the forward operator G are computed for blocks of receivers
+    by a kernel function (see :func:`calcRows`), either in the current
+    process or spread over a pool of processes.
+
+    If :attr:`Gpath` is set, G is written to a memory mapped file in that
+    directory instead of being held in RAM, and the products with G stream
+    over blocks of rows. The file name is a hash of everything G depends on
+    (cell corners, receivers, inducing field, ...), so a later run of the
+    same problem reuses the stored G instead of computing it again.
+
+    If :attr:`compression` is set, the smallest entries of each row of G are
+    dropped and G is stored as a sparse (CSR) matrix. The entries dropped
+    from a row have an l2-norm of at most compression times the norm of that
+    row, which bounds the relative error on each datum of G*m for a smooth
+    model. The size reduction obtained is reported.
+
+    If :attr:`forwardOnly` is set, G is never formed. The products with G
+    and G^T (and the diagonal of G^T*G) recompute the rows of G for blocks
+    of receivers on the fly, spread over :attr:`n_cpu` threads, so the
+    memory used is bounded by :attr:`maxRAM` whatever the size of the
+    survey. Subclasses describe their kernel with :meth:`getKernelArgs`.
+    """
+
+    maxRAM = 0.1  #: Memory (GB) allowed for a block of receivers in G
+    parallelized = False  #: Build G with a pool of processes
+    n_cpu = None  #: Number of processes (or threads), defaults to all cpus
+    forwardOnly = False  #: Never form G, products with G are matrix-free
+    Gpath = None  #: Directory where G is stored on disk, None keeps it in RAM
+    compression = None  #: Relative accuracy of a compressed (sparse) G
+
+    def __init__(self, mesh, **kwargs):
+        Problem.LinearProblem.__init__(self, mesh, **kwargs)
+
+    def Jvec(self, m, v, f=None):
+        return self.Gvec(v)
+
+    def Jtvec(self, m, v, f=None):
+        return self.Gtvec(v)
+
+    def Gvec(self, v):
+        """
+        Product G*v, streamed over blocks of rows if G is stored on disk
+
+        :param numpy.array v: vector of size nC
+        :rtype: numpy.array
+        :return: G*v
+        """
+        if self.forwardOnly:
+            return self._matrixFreeGvec(v)
+
+        G = self.G
+
+        if not isinstance(G, np.memmap):
+            return G.dot(v)
+
+        Gv = np.empty(G.shape[0])
+        for rows in self._rowBlocks(G):
+            Gv[rows] = G[rows].dot(v)
+
+        return Gv
+
+    def Gtvec(self, v):
+        """
+        Product G^T*v, streamed over blocks of rows if G is stored on disk
+
+        :param numpy.array v: vector of size nD
+        :rtype: numpy.array
+        :return: G^T*v
+        """
+        if self.forwardOnly:
+            return self._matrixFreeGtvec(v)
+
+        G = self.G
+
+        if not isinstance(G, np.memmap):
+            return G.T.dot(v)
+
+        Gtv = np.zeros(G.shape[1])
+        for rows in self._rowBlocks(G):
+            Gtv += G[rows].T.dot(v[rows])
+
+        return Gtv
+
+    def getGtGdiag(self):
+        """
+        Diagonal of G^T*G (squared norm of the columns of G), streamed over
+        blocks of rows if G is stored on disk or never formed
+        """
+        if self.forwardOnly:
+            return self._matrixFreeGtGdiag()
+
+        G = self.G
+
+        if sp.issparse(G):
+            return np.asarray(G.multiply(G).sum(axis=0)).ravel()
+
+        if not isinstance(G, np.memmap):
+            return Problem.LinearProblem.getGtGdiag(self)
+
+        GtGdiag = np.zeros(G.shape[1])
+        for rows in self._rowBlocks(G):
+            GtGdiag += np.sum(G[rows]**2., axis=0)
+
+        return GtGdiag
+
+    def _rowBlocks(self, G):
+        nRows = blockSize(G.shape[1], self.maxRAM, nArrays=1)
+        return [
+            slice(ii, min(ii + nRows, G.shape[0]))
+            for ii in range(0, G.shape[0], nRows)
+        ]
+
+    def getKernelArgs(self):
+        """
+        Description of the forward operator used by the matrix-free
+        products, as the arguments of :meth:`calcRows`
+
+        :rtype: tuple
+        :return: (kernel, rxLoc, arrays, params, nComp, nCol)
+        """
+        raise NotImplementedError(
+            "getKernelArgs is required for forwardOnly products"
+        )
+
+    def mapKernelBlocks(self, func, kernelArgs=None):
+        """
+        Evaluate the kernel for blocks of receivers over a pool of threads
+        and apply func to each block of rows
+
+        :param function func: called as func(rows, blockRows), with rows the
+            indices of the receivers in the block and blockRows the list of
+            nComp [nB x nCol] blocks of rows of G
+        :param tuple kernelArgs: output of :meth:`getKernelArgs`
+        :rtype: list
+        :return: outputs of func, in the order of the blocks
+        """
+        if kernelArgs is None:
+            kernelArgs = self.getKernelArgs()
+
+        kernel, rxLoc, arrays, params, nComp, nCol = kernelArgs
+
+        ndata = rxLoc.shape[0]
+
+        n_cpu = self.n_cpu
+        if n_cpu is None:
+            n_cpu = multiprocessing.cpu_count()
+
+        # Memory budget shared by the blocks held by the threads
+        nBlock = blockSize(nCol, self.maxRAM / n_cpu)
+        nBlock = min(nBlock, int(np.ceil(float(ndata) / n_cpu)))
+
+        kwargs = dict(arrays)
+        kwargs.update(params)
+
+        def evalBlock(ii):
+            rows = np.arange(ii, min(ii + nBlock, ndata))
+            return func(rows, kernel(rxLoc[rows, :], **kwargs))
+
+        starts = range(0, ndata, nBlock)
+
+        if n_cpu == 1 or len(starts) == 1:
+            return [evalBlock(ii) for ii in starts]
+
+        # The kernel spends its time in numpy, which releases the GIL
+        pool = multiprocessing.pool.ThreadPool(n_cpu)
+        try:
+            return pool.map(evalBlock, starts)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _matrixFreeGvec(self, v):
+        kernelArgs = self.getKernelArgs()
+        ndata = kernelArgs[1].shape[0]
+        Gv = np.empty(kernelArgs[4]*ndata)
+
+        def func(rows, blockRows):
+            for jj, row in enumerate(blockRows):
+                Gv[rows + jj*ndata] = row.dot(v)
+
+        self.mapKernelBlocks(func, kernelArgs)
+
+        return Gv
+
+    def _matrixFreeGtvec(self, v):
+        kernelArgs = self.getKernelArgs()
+        ndata = kernelArgs[1].shape[0]
+
+        def func(rows, blockRows):
+            return sum(
+                row.T.dot(v[rows + jj*ndata])
+                for jj, row in enumerate(blockRows)
+            )
+
+        return np.sum(self.mapKernelBlocks(func, kernelArgs), axis=0)
+
+    def _matrixFreeGtGdiag(self):
+
+        def func(rows, blockRows):
+            return sum(np.sum(row**2., axis=0) for row in blockRows)
+
+        return np.sum(self.mapKernelBlocks(func), axis=0)
+
+    def calcRows(self, kernel, rxLoc, arrays, params, nComp, nCol, m=None):
+        """
+        Evaluate the forward operator for all receivers
+
+        :param function kernel: module level function returning the list of
+            the nComp blocks of rows of G for a block of receivers, called as
+            kernel(rxLoc, \*\*arrays, \*\*params)
+        :param numpy.array rxLoc: receiver locations [ndata x 3]
+        :param dict arrays: large arrays needed by the kernel (shared with
+            the processes without being copied)
+        :param dict params: small parameters needed by the kernel
+        :param int nComp: number of components per receiver
+        :param int nCol: number of columns of G
+        :param numpy.array m: model, if provided G*m is returned instead of G
+        :rtype: numpy.array
+        :return: G [nComp*ndata x nCol] or G*m [nComp*ndata]
+        """
+
+        ndata = rxLoc.shape[0]
+
+        # Number of receivers computed at once within the memory budget
+        nBlock = blockSize(nCol, self.maxRAM)
+
+        n_cpu = 1
+        if self.parallelized:
+
+            n_cpu = self.n_cpu
+            if n_cpu is None:
+                n_cpu = multiprocessing.cpu_count()
+
+            # Give at least one block to each process
+            nBlock = min(nBlock, int(np.ceil(float(ndata) / n_cpu)))
+
+        blocks = [
+            (ii, min(ii + nBlock, ndata)) for ii in range(0, ndata, nBlock)
+        ]
+
+        if m is None and self.compression is not None:
+            return self.calcCompressedRows(
+                kernel, rxLoc, arrays, params, nComp, blocks, n_cpu
+            )
+
+        if m is None:
+            shape = (nComp*ndata, nCol)
+        else:
+            shape = (nComp*ndata,)
+
+        fileName = None
+        if m is None and self.Gpath is not None:
+
+            fileName = os.path.join(
+                self.Gpath,
+                'G_' + hashArrays(kernel.__name__, rxLoc, arrays, params) +
+                '.npy'
+            )
+
+            if os.path.exists(fileName):
+                print("Loading stored forward operator: " + fileName)
+                return np.load(fileName, mmap_mode='r')
+
+            if not os.path.exists(self.Gpath):
+                os.makedirs(self.Gpath)
+
+            # Written under a temporary name, so that an interrupted run
+            # never leaves an incomplete G to be reused
+            tmpName = fileName + '.tmp'
+            np.lib.format.open_memmap(
+                tmpName, mode='w+', dtype=float, shape=shape
+            )
+
+        if n_cpu > 1:
+
+            if fileName is None:
+                out = multiprocessing.RawArray('d', int(np.prod(shape)))
+
+            else:
+                # The workers write in the memory mapped file
+                out = tmpName
+
+            mapWorkers(
+                _workerRows, blocks, n_cpu, kernel, rxLoc, arrays, params,
+                m=m, out=out, shape=shape
+            )
+
+            if fileName is None:
+                return np.frombuffer(out).reshape(shape)
+
+            return storeG(tmpName, fileName)
+
+        if fileName is None:
+            fwr_out = np.zeros(shape)
+
+        else:
+            fwr_out = np.lib.format.open_memmap(tmpName, mode='r+')
+
+        # Add counter to dsiplay progress. Good for large problems
+        count = -1
+        for block in blocks:
+
+            writeRows(fwr_out, kernel, rxLoc, block, arrays, params, m)
+
+            # Display progress
+            count = progress(block[1]-1, count, ndata)
+
+        if fileName is not None:
+            fwr_out.flush()
+            del fwr_out
+            return storeG(tmpName, fileName)
+
+        return fwr_out
+
+    def calcCompressedRows(
+        self, kernel, rxLoc, arrays, params, nComp, blocks, n_cpu
+    ):
+        """
+        Compute G block by block and keep it as a compressed sparse matrix
+        (see :attr:`compression`)
+        """
+        tol = self.compression
+
+        fileName = None
+        if self.Gpath is not None:
+
+            fileName = os.path.join(
+                self.Gpath,
+                'G_' + hashArrays(
+                    kernel.__name__, rxLoc, arrays, params, tol
+                ) + '.npz'
+            )
+
+            if os.path.exists(fileName):
+                print("Loading stored forward operator: " + fileName)
+                stored = np.load(fileName)
+                return sp.csr_matrix(
+                    (stored['data'], stored['indices'], stored['indptr']),
+                    shape=tuple(stored['shape'])
+                )
+
+            if not os.path.exists(self.Gpath):
+                os.makedirs(self.Gpath)
+
+        if n_cpu > 1:
+            compressed = mapWorkers(
+                _workerCompressedRows, blocks, n_cpu, kernel, rxLoc, arrays,
+                dict(params, tol=tol)
+            )
+
+        else:
+            compressed = []
+            count = -1
+            for block in blocks:
+
+                compressed.append(compressRows(
+                    kernel, rxLoc, block, arrays, params, tol
+                ))
+
+                # Display progress
+                count = progress(block[1]-1, count, rxLoc.shape[0])
+
+        # Rows are ordered by component, then by receiver
+        G = sp.vstack([
+            rows[jj] for jj in range(nComp) for rows in compressed
+        ]).tocsr()
+
+        nDense = G.shape[0] * G.shape[1]
+        print(
+            "Compressed forward operator (tolerance {0:.1e}): kept {1:.2f}% "
+            "of the entries, {2:.1f} MB instead of {3:.1f} MB".format(
+                tol, 100.*G.nnz/nDense,
+                (G.data.nbytes + G.indices.nbytes + G.indptr.nbytes)/1e+6,
+                8.*nDense/1e+6
+            )
+        )
+
+        if fileName is not None:
+            # Written under a temporary name, so that an interrupted run
+            # never leaves an incomplete G to be reused
+            tmpName = fileName[:-4] + '.tmp.npz'
+            # The CSR arrays, rather than sp.save_npz (scipy >= 0.19)
+            np.savez(
+                tmpName, data=G.data, indices=G.indices, indptr=G.indptr,
+                shape=np.array(G.shape)
+            )
+            os.rename(tmpName, fileName)
+            print("Forward operator stored in: " + fileName)
+
+        return G
+
+
+def activeIndices(mesh, actInd=None):
+    """
+    activeIndices(mesh, actInd)
+
+    Indices of the active cells, from a boolean or an index vector (all the
+    cells if actInd is None)
+    """
+    if actInd is None:
+        return np.arange(mesh.nC)
+
+    actInd = np.asarray(actInd)
+
+    if actInd.dtype == 'bool':
+        return np.where(actInd)[0]
+
+    return actInd
+
+
+def cellCentersWidths(mesh, inds=None):
+    """
+    cellCentersWidths(mesh, inds)
+
+    Centers and widths of the cells of a 3D mesh. Only the cell centers and
+    widths are used, so any mesh exposing them works: a TensorMesh, or a
+    TreeMesh refined near the receivers.
+
+    INPUT
+    mesh    : 3D mesh
+    inds    : Indices of the active cells, all the cells if None
+
+    OUTPUT
+    centers, widths : [nC x 3] arrays
+    """
+    centers = mesh.gridCC
+
+    widths = getattr(mesh, 'h_gridded', None)
+    if widths is None:
+        # Tensor mesh, widths ordered like the cell centers
+        hY, hX, hZ = np.meshgrid(mesh.hy, mesh.hx, mesh.hz)
+        widths = np.c_[
+            hX.ravel(order='F'), hY.ravel(order='F'), hZ.ravel(order='F')
+        ]
+
+    if inds is not None:
+        centers, widths = centers[inds, :], widths[inds, :]
+
+    return centers, widths
+
+
+def cellCorners(mesh, inds=None):
+    """
+    cellCorners(mesh, inds)
+
+    Lower and upper corners of the cells of a 3D mesh (see
+    :func:`cellCentersWidths`)
+
+    OUTPUT
+    Xn, Yn, Zn : [nC x 2] arrays of the lower and upper corners
+    """
+    centers, widths = cellCentersWidths(mesh, inds)
+
+    lower = centers - widths/2.
+    upper = centers + widths/2.
+
+    return [np.c_[lower[:, ii], upper[:, ii]] for ii in range(3)]
+
+
+def storeG(tmpName, fileName):
+    """
+    Move a completed G to its final name and memory map it (read only)
+    """
+    os.rename(tmpName, fileName)
+    print("Forward operator stored in: " + fileName)
+    return np.load(fileName, mmap_mode='r')
+
+
+def hashArrays(*args):
+    """
+    hashArrays(*args)
+
+    Hash of a set of arrays, dictionaries of arrays and parameters. Used to
+    identify a stored forward operator.
+    """
+    sha = hashlib.sha1()
+
+    def update(val):
+        if isinstance(val, dict):
+            for key in sorted(val.keys()):
+                update(key)
+                update(val[key])
+
+        elif isinstance(val, np.ndarray):
+            sha.update(str(val.shape).encode())
+            sha.update(np.ascontiguousarray(val, dtype=float).tobytes())
+
+        else:
+            sha.update(repr(val).encode())
+
+    for arg in args:
+        update(arg)
+
+    return sha.hexdigest()
+
+
+def writeRows(fwr_out, kernel, rxLoc, block, arrays, params, m=None):
+    """
+    writeRows(fwr_out, kernel, rxLoc, block, arrays, params, m)
+
+    Compute the rows of G for the receivers in block = (start, stop) and
+    write them (or their product with m) in fwr_out.
+    """
+    ndata = rxLoc.shape[0]
+    rows = np.arange(block[0], block[1])
+
+    kwargs = dict(arrays)
+    kwargs.update(params)
+
+    for jj, row in enumerate(kernel(rxLoc[rows, :], **kwargs)):
+
+        if m is None:
+            fwr_out[rows + jj*ndata, :] = row
+
+        else:
+            fwr_out[rows + jj*ndata] = row.dot(m)
+
+
+def compressRows(kernel, rxLoc, block, arrays, params, tol):
+    """
+    compressRows(kernel, rxLoc, block, arrays, params, tol)
+
+    Compute the rows of G for the receivers in block = (start, stop) and
+    drop their smallest entries, such that the norm of the dropped entries
+    of a row is at most tol times the norm of the row.
+
+    OUTPUT
+    List of scipy.sparse.csr_matrix, one per component of the data
+    """
+    rows = np.arange(block[0], block[1])
+
+    kwargs = dict(arrays)
+    kwargs.update(params)
+
+    compressed = []
+    for row in kernel(rxLoc[rows, :], **kwargs):
+
+        absRow = np.abs(row)
+        sortRow = np.sort(absRow, axis=1)
+
+        # Number of entries that can be dropped from each row
+        energy = np.cumsum(sortRow**2., axis=1)
+        nDrop = np.sum(energy <= (tol**2.) * energy[:, -1:], axis=1)
+        nDrop = np.minimum(nDrop, row.shape[1]-1)
+
+        cutoff = sortRow[np.arange(row.shape[0]), nDrop]
+        row[absRow < cutoff[:, None]] = 0.
+
+        compressed.append(sp.csr_matrix(row))
+
+    return compressed
+
+
+def mapWorkers(
+    worker, blocks, n_cpu, kernel, rxLoc, arrays, params, m=None, out=None,
+    shape=None
+):
+    """
+    Map the blocks of receivers to a pool of n_cpu processes. Everything
+    the workers read or write lives in shared memory, or in the memory
+    mapped file named out.
+    """
+    shared = dict(
+        (key, sharedArray(val)) for key, val in arrays.items()
+    )
+    if m is not None:
+        shared['m'] = sharedArray(m)
+    shared['rxLoc'] = sharedArray(rxLoc)
+
+    pool = multiprocessing.Pool(
+        n_cpu, initializer=_initWorker,
+        initargs=(kernel, shared, params, out, shape)
+    )
+    try:
+        return pool.map(worker, blocks)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def sharedArray(val):
+    """
+    Copy an array of floats in shared memory
+
+    :rtype: tuple
+    :return: (multiprocessing.RawArray, shape)
+    """
+    val = np.asarray(val, dtype=float)
+    shared = multiprocessing.RawArray('d', int(val.size))
+    np.frombuffer(shared).reshape(val.shape)[...] = val
+    return shared, val.shape
+
+
+#: Data of the worker processes, set once by _initWorker
+_workerData = {}
+
+
+def _initWorker(kernel, shared, params, out, shape):
+    _workerData['kernel'] = kernel
+    _workerData['params'] = params
+    _workerData['arrays'] = dict(
+        (key, np.frombuffer(val).reshape(valShape))
+        for key, (val, valShape) in shared.items()
+    )
+
+    if isinstance(out, str):
+        _workerData['out'] = np.lib.format.open_memmap(out, mode='r+')
+
+    elif out is not None:
+        _workerData['out'] = np.frombuffer(out).reshape(shape)
+
+
+def _workerRows(block):
+    arrays = dict(_workerData['arrays'])
+    rxLoc = arrays.pop('rxLoc')
+    m = arrays.pop('m', None)
+
+    writeRows(
+        _workerData['out'], _workerData['kernel'], rxLoc, block, arrays,
+        _workerData['params'], m
+    )
+
+    if isinstance(_workerData['out'], np.memmap):
+        _workerData['out'].flush()
+
+
+def _workerCompressedRows(block):
+    arrays = dict(_workerData['arrays'])
+    rxLoc = arrays.pop('rxLoc')
+    params = dict(_workerData['params'])
+    tol = params.pop('tol')
+
+    return compressRows(
+        _workerData['kernel'], rxLoc, block, arrays, params, tol
+    )
+
+
+def blockSize(nC, maxRAM, nArrays=12):
+    """
+    blockSize(nC, maxRAM)
+
+    Number of receivers for which the rows of the forward operator can be
+    computed at once, given that about nArrays float64 arrays of size nC
+    are held per receiver (tensor rows and projected rows).
+
+    INPUT
+    nC      : Number of columns of the forward operator
+    maxRAM  : Memory budget in GB
+    nArrays : Number of nC-long arrays held per receiver
+
+    OUTPUT
+    Number of receivers per block (at least 1)
+    """
+    return max(1, int(maxRAM * 1e+9 / (8. * nArrays * nC)))
+
+
+def progress(iter, prog, final):
+    """
+    progress(iter,prog,final)
+
+    Function measuring the progress of a process and print to screen the %.
+    Useful to estimate the remaining runtime of a large problem.
+
+    Created on Dec, 20th 2015
+
+    @author: dominiquef
+    """
+    arg = np.floor(float(iter)/float(final)*10.)
+
+    if arg > prog:
+
+        print("Done " + str(arg*10) + " %")
+        prog = arg
+
+    return prog
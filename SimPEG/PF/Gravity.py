@@ -4,12 +4,13 @@ from SimPEG import Utils
 from SimPEG import Props
 import scipy.sparse as sp
 from . import BaseGrav as GRAV
+from .BasePF import BaseIntegralProblem, activeIndices, cellCorners
 import re
 import numpy as np
 
 
 
-class GravityIntegral(Problem.LinearProblem):
+class GravityIntegral(BaseIntegralProblem):
 
     rho, rhoMap, rhoDeriv = Props.Invertible(
         "Specific density (g/cc)",
@@ -22,90 +23,15 @@ class GravityIntegral(Problem.LinearProblem):
     rtype = 'z'
 
     def __init__(self, mesh, **kwargs):
-        Problem.BaseProblem.__init__(self, mesh, **kwargs)
+        BaseIntegralProblem.__init__(self, mesh, **kwargs)
 
     def fwr_op(self):
         # Add forward function
         # kappa = self.model.kappa TODO
         rho = self.rhoMap*self.model
 
-        if self.forwardOnly:
-
-            if getattr(self, 'actInd', None) is not None:
-
-                if self.actInd.dtype == 'bool':
-                    inds = np.asarray([inds for inds,
-                                      elem in enumerate(self.actInd, 1)
-                                      if elem], dtype=int) - 1
-                else:
-                    inds = self.actInd
-
-            else:
-
-                inds = np.asarray(range(self.mesh.nC))
-
-            nC = len(inds)
-
-            # Create active cell projector
-            P = sp.csr_matrix(
-                (np.ones(nC), (inds, range(nC))),
-                shape=(self.mesh.nC, nC)
-            )
-
-            # Create vectors of nodal location
-            # (lower and upper corners for each cell)
-            xn = self.mesh.vectorNx
-            yn = self.mesh.vectorNy
-            zn = self.mesh.vectorNz
-
-            yn2, xn2, zn2 = np.meshgrid(yn[1:], xn[1:], zn[1:])
-            yn1, xn1, zn1 = np.meshgrid(yn[0:-1], xn[0:-1], zn[0:-1])
-
-            Yn = P.T*np.c_[Utils.mkvc(yn1), Utils.mkvc(yn2)]
-            Xn = P.T*np.c_[Utils.mkvc(xn1), Utils.mkvc(xn2)]
-            Zn = P.T*np.c_[Utils.mkvc(zn1), Utils.mkvc(zn2)]
-
-            rxLoc = self.survey.srcField.rxList[0].locs
-            ndata = rxLoc.shape[0]
-
-            # Pre-allocate space and create magnetization matrix if required
-            # Pre-allocate space
-            if self.rtype == 'z':
-
-                fwr_d = np.zeros(self.survey.nRx)
-
-            elif self.rtype == 'xyz':
-
-                fwr_d = np.zeros(3*self.survey.nRx)
-
-            else:
-
-                print("""Flag must be either 'z' | 'xyz', please revised""")
-                return
-
-            # Add counter to dsiplay progress. Good for large problems
-            count = -1
-            for ii in range(ndata):
-
-                tx, ty, tz = get_T_mat(Xn, Yn, Zn, rxLoc[ii, :])
-
-                if self.rtype == 'z':
-                    fwr_d[ii] = tz.dot(rho)
-
-                elif self.rtype == 'xyz':
-                    fwr_d[ii] = tx.dot(rho)
-                    fwr_d[ii+ndata] = ty.dot(rho)
-                    fwr_d[ii+2*ndata] = tz.dot(rho)
-
-            # Display progress
-                count = progress(ii, count, ndata)
-
-            print("Done 100% ...forward operator completed!!\n")
-
-            return fwr_d
-
-        else:
-            return self.G.dot(rho)
+        # Matrix-free if forwardOnly, see BaseIntegralProblem.Gvec
+        return self.Gvec(rho)
 
     def fields(self, m):
         self.model = m
@@ -116,11 +42,11 @@ class GravityIntegral(Problem.LinearProblem):
 
     def Jvec(self, m, v, f=None):
         dmudm = self.rhoMap.deriv(m)
-        return self.G.dot(dmudm*v)
+        return self.Gvec(dmudm*v)
 
     def Jtvec(self, m, v, f=None):
         dmudm = self.rhoMap.deriv(m)
-        return dmudm.T * (self.G.T.dot(v))
+        return dmudm.T * (self.Gtvec(v))
 
     @property
     def G(self):
@@ -132,13 +58,19 @@ class GravityIntegral(Problem.LinearProblem):
 
         return self._G
 
-    def Intrgl_Fwr_Op(self, flag):
+    def Intrgl_Fwr_Op(self, flag, m=None):
 
         """
 
         Gravity forward operator in integral form
 
         flag        = 'z' | 'xyz'
+        m           = Density model. If provided, the product G*m is
+                      returned without storing G
+
+        The rows are computed for blocks of receivers at once, with the
+        size of each block limited by :attr:`maxRAM`, and spread over
+        :attr:`n_cpu` processes if :attr:`parallelized`.
 
         Return
         _G        = Linear forward modeling operation
@@ -148,104 +80,94 @@ class GravityIntegral(Problem.LinearProblem):
         @author: dominiquef
 
          """
-        # Find non-zero cells
-        # inds = np.nonzero(actv)[0]
-        if getattr(self, 'actInd', None) is not None:
+        if flag not in ['z', 'xyz']:
+            print("""Flag must be either 'z' | 'xyz', please revised""")
+            return
 
-            if self.actInd.dtype == 'bool':
-                inds = np.asarray([inds for inds,
-                                  elem in enumerate(self.actInd, 1)
-                                  if elem], dtype=int) - 1
-            else:
-                inds = self.actInd
+        if m is None:
+            # Loop through all observations
+            print("Begin calculation of forward operator: " + flag)
 
-        else:
+        G = self.calcRows(*self.getKernelArgs(flag), m=m)
 
-            inds = np.asarray(range(self.mesh.nC))
+        print("Done 100% ...forward operator completed!!\n")
 
-        nC = len(inds)
+        return G
 
-        # Create active cell projector
-        P = sp.csr_matrix(
-            (np.ones(nC), (inds, range(nC))),
-            shape=(self.mesh.nC, nC)
-        )
+    def getKernelArgs(self, flag=None):
+        """
+        Kernel of the gravity forward operator and its arguments, see
+        :meth:`BaseIntegralProblem.calcRows`
 
-        # Create vectors of nodal location
-        # (lower and upper corners for each cell)
-        xn = self.mesh.vectorNx
-        yn = self.mesh.vectorNy
-        zn = self.mesh.vectorNz
+        flag        = 'z' | 'xyz', defaults to :attr:`rtype`
+        """
+        if flag is None:
+            flag = self.rtype
 
-        yn2, xn2, zn2 = np.meshgrid(yn[1:], xn[1:], zn[1:])
-        yn1, xn1, zn1 = np.meshgrid(yn[0:-1], xn[0:-1], zn[0:-1])
+        # Find non-zero cells
+        inds = activeIndices(self.mesh, getattr(self, 'actInd', None))
+        nC = len(inds)
 
-        Yn = P.T*np.c_[Utils.mkvc(yn1), Utils.mkvc(yn2)]
-        Xn = P.T*np.c_[Utils.mkvc(xn1), Utils.mkvc(xn2)]
-        Zn = P.T*np.c_[Utils.mkvc(zn1), Utils.mkvc(zn2)]
+        # Lower and upper corners of each active cell, from the cell
+        # centers and widths (TensorMesh or TreeMesh)
+        Xn, Yn, Zn = cellCorners(self.mesh, inds)
 
         rxLoc = self.survey.srcField.rxList[0].locs
-        ndata = rxLoc.shape[0]
 
-        # Pre-allocate space and create magnetization matrix if required
-        # Pre-allocate space
         if flag == 'z':
 
-            G = np.zeros((ndata, nC))
+            nComp = 1
 
         elif flag == 'xyz':
 
-            G = np.zeros((int(3*ndata), nC))
-
-        else:
+            nComp = 3
 
-            print("""Flag must be either 'z' | 'xyz', please revised""")
-            return
-
-        # Loop through all observations
-        print("Begin calculation of forward operator: " + flag)
-
-        # Add counter to dsiplay progress. Good for large problems
-        count = -1
-        for ii in range(ndata):
+        return (
+            calcGravRows, rxLoc, {'Xn': Xn, 'Yn': Yn, 'Zn': Zn},
+            {'flag': flag}, nComp, nC
+        )
 
-            tx, ty, tz = get_T_mat(Xn, Yn, Zn, rxLoc[ii, :])
 
-            if flag == 'z':
+def calcGravRows(rxLoc, Xn, Yn, Zn, flag):
+    """
+    calcGravRows(rxLoc, Xn, Yn, Zn, flag)
 
-                G[ii, :] = tz
+    Rows of the gravity forward operator for a block of receivers
 
-            elif flag == 'xyz':
-                G[ii, :] = tx
-                G[ii+ndata, :] = ty
-                G[ii+2*ndata, :] = tz
+    INPUT
+    rxLoc       : [nB-by-3] Observation locations
+    Xn, Yn, Zn  : [nC-by-2] Lower and upper corners of the cells
+    flag        : 'z' | 'xyz'
 
-            # Display progress
-            count = progress(ii, count, ndata)
+    OUTPUT
+    List of [nB-by-nC] blocks of rows, one per component of the data
+    """
+    tx, ty, tz = get_T_mat(Xn, Yn, Zn, rxLoc)
 
-        print("Done 100% ...forward operator completed!!\n")
+    if flag == 'z':
+        return [tz]
 
-        return G
+    return [tx, ty, tz]
 
 
 def get_T_mat(Xn, Yn, Zn, rxLoc):
     """
     Load in the active nodes of a tensor mesh and computes the gravity tensor
-    for a given observation location rxLoc[obsx, obsy, obsz]
+    for a given observation location rxLoc[obsx, obsy, obsz], or for a block
+    of observation locations rxLoc[nB, 3] at once
 
     INPUT:
     Xn, Yn, Zn: Node location matrix for the lower and upper most corners of
                 all cells in the mesh shape[nC,2]
-    M
+    rxLoc:      Observation location(s), shape[3] or shape[nB, 3]
+
     OUTPUT:
     Tx = [Txx Txy Txz]
     Ty = [Tyx Tyy Tyz]
     Tz = [Tzx Tzy Tzz]
 
-    where each elements have dimension 1-by-nC.
-    Only the upper half 5 elements have to be computed since symetric.
-    Currently done as for-loops but will eventually be changed to vector
-    indexing, once the topography has been figured out.
+    where each elements have dimension nB-by-nC (1-by-nC for a single
+    location).
 
     """
     from scipy.constants import G as NewtG
@@ -253,18 +175,22 @@ def get_T_mat(Xn, Yn, Zn, rxLoc):
     NewtG = NewtG*1e+8  # Convertion from mGal (1e-5) and g/cc (1e-3)
     eps = 1e-10  # add a small value to the locations to avoid
 
+    rxLoc = np.atleast_2d(rxLoc)
+
     nC = Xn.shape[0]
+    nB = rxLoc.shape[0]
 
-    # Pre-allocate space for 1D array
-    tx = np.zeros((1, nC))
-    ty = np.zeros((1, nC))
-    tz = np.zeros((1, nC))
+    # Pre-allocate space for the block of rows
+    tx = np.zeros((nB, nC))
+    ty = np.zeros((nB, nC))
+    tz = np.zeros((nB, nC))
 
-    dz = rxLoc[2] - Zn + eps
+    # Distances from the receivers to the cell faces [nB x nC]
+    dz = [rxLoc[:, 2:3] - Zn[:, cc] + eps for cc in range(2)]
 
-    dy = Yn - rxLoc[1] + eps
+    dy = [Yn[:, bb] - rxLoc[:, 1:2] + eps for bb in range(2)]
 
-    dx = Xn - rxLoc[0] + eps
+    dx = [Xn[:, aa] - rxLoc[:, 0:1] + eps for aa in range(2)]
 
     # Compute contribution from each corners
     for aa in range(2):
@@ -272,28 +198,28 @@ def get_T_mat(Xn, Yn, Zn, rxLoc):
             for cc in range(2):
 
                 r = (
-                        dx[:, aa] ** 2 +
-                        dy[:, bb] ** 2 +
-                        dz[:, cc] ** 2
+                        dx[aa] ** 2 +
+                        dy[bb] ** 2 +
+                        dz[cc] ** 2
                     ) ** (0.50)
 
                 tx = tx - NewtG * (-1) ** aa * (-1) ** bb * (-1) ** cc * (
-                    dy[:, bb] * np.log(dz[:, cc] + r) +
-                    dz[:, cc] * np.log(dy[:, bb] + r) -
-                    dx[:, aa] * np.arctan(dy[:, bb] * dz[:, cc] /
-                                          (dx[:, aa] * r)))
+                    dy[bb] * np.log(dz[cc] + r) +
+                    dz[cc] * np.log(dy[bb] + r) -
+                    dx[aa] * np.arctan(dy[bb] * dz[cc] /
+                                       (dx[aa] * r)))
 
                 ty = ty - NewtG * (-1) ** aa * (-1) ** bb * (-1) ** cc * (
-                    dx[:, aa] * np.log(dz[:, cc] + r) +
-                    dz[:, cc] * np.log(dx[:, aa] + r) -
-                    dy[:, bb] * np.arctan(dx[:, aa] * dz[:, cc] /
-                                          (dy[:, bb] * r)))
+                    dx[aa] * np.log(dz[cc] + r) +
+                    dz[cc] * np.log(dx[aa] + r) -
+                    dy[bb] * np.arctan(dx[aa] * dz[cc] /
+                                       (dy[bb] * r)))
 
                 tz = tz - NewtG * (-1) ** aa * (-1) ** bb * (-1) ** cc * (
-                    dx[:, aa] * np.log(dy[:, bb] + r) +
-                    dy[:, bb] * np.log(dx[:, aa] + r) -
-                    dz[:, cc] * np.arctan(dx[:, aa] * dy[:, bb] /
-                                          (dz[:, cc] * r)))
+                    dx[aa] * np.log(dy[bb] + r) +
+                    dy[bb] * np.log(dx[aa] + r) -
+                    dz[cc] * np.arctan(dx[aa] * dy[bb] /
+                                       (dz[cc] * r)))
 
     return tx, ty, tz
 
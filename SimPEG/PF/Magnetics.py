@@ -1,5 +1,7 @@
 from __future__ import print_function
 
+import multiprocessing
+import multiprocessing.pool
 import numpy as np
 import scipy.sparse as sp
 from scipy.constants import mu_0
@@ -10,10 +12,12 @@ from SimPEG import Solver
 from SimPEG import Props
 
 from . import BaseMag as MAG
+from .BasePF import BaseIntegralProblem, activeIndices, blockSize
+from .BasePF import cellCentersWidths, cellCorners
 from .MagAnalytics import spheremodel, CongruousMagBC
 
 
-class MagneticIntegral(Problem.LinearProblem):
+class MagneticIntegral(BaseIntegralProblem):
 
     chi, chiMap, chiDeriv = Props.Invertible(
         "Magnetic Susceptibility (SI)",
@@ -24,26 +28,19 @@ class MagneticIntegral(Problem.LinearProblem):
     actInd = None  #: Active cell indices provided
     M = None  #: Magnetization matrix provided, otherwise all induced
     rtype = 'tmi'  #: Receiver type either "tmi" | "xyz"
+    magnetization = 'ind'  #: Columns of G, either "ind" | "xyz"
 
     def __init__(self, mesh, **kwargs):
-        Problem.BaseProblem.__init__(self, mesh, **kwargs)
+        BaseIntegralProblem.__init__(self, mesh, **kwargs)
 
     def fwr_ind(self, m):
 
-        if self.forwardOnly:
-
-            # Compute the linear operation without forming the full dense G
-            fwr_d = self.Intrgl_Fwr_Op(m=m)
-
-            return fwr_d
-
-        else:
-
-            return self.G.dot(m)
+        # Without forming the full dense G if forwardOnly
+        return self.Gvec(m)
 
     def fwr_rem(self):
         # TODO check if we are inverting for M
-        return self.G.dot(self.chiMap(m))
+        return self.Gvec(self.chiMap(m))
 
     def fields(self, m, **kwargs):
         self.model = m
@@ -79,58 +76,64 @@ class MagneticIntegral(Problem.LinearProblem):
 
         return self._G
 
-    def Intrgl_Fwr_Op(self, m=None, Magnetization="ind"):
+    def Intrgl_Fwr_Op(self, m=None, Magnetization=None):
 
         """
 
         Magnetic forward operator in integral form
 
-        flag        = 'ind' | 'xyz'
+        flag        = 'ind' | 'xyz', defaults to :attr:`magnetization`
 
           1- ind : Magnetization fixed by user
 
           3- xyz: xyz tensor matrix stored with shape([3*ndata, 3*nc])
 
+        The rows are computed for blocks of receivers at once, with the
+        size of each block limited by :attr:`maxRAM`, and spread over
+        :attr:`n_cpu` processes if :attr:`parallelized`.
+
         Return
         _G = Linear forward modeling operation
 
          """
 
-        # Find non-zero cells
-        if getattr(self, 'actInd', None) is not None:
-            if self.actInd.dtype == 'bool':
-                inds = np.asarray([inds for inds,
-                                  elem in enumerate(self.actInd, 1) if elem],
-                                  dtype=int) - 1
-            else:
-                inds = self.actInd
+        if Magnetization is None:
+            Magnetization = self.magnetization
 
-        else:
+        if Magnetization not in ['ind', 'xyz']:
+            print("""Flag must be either 'ind' | 'xyz', please revised""")
+            return
 
-            inds = np.asarray(range(self.mesh.nC))
+        if m is None:
+            # Loop through all observations and create forward operator (nD-by-nC)
+            print("Begin calculation of forward operator: " + Magnetization)
 
-        nC = len(inds)
+        fwr_out = self.calcRows(*self.getKernelArgs(Magnetization), m=m)
+
+        print("Done 100% ...forward operator completed!!\n")
+
+        return fwr_out
 
-        # Create active cell projector
-        P = sp.csr_matrix((np.ones(nC), (inds, range(nC))),
-                          shape=(self.mesh.nC, nC))
+    def getKernelArgs(self, Magnetization=None):
+        """
+        Kernel of the magnetic forward operator and its arguments, see
+        :meth:`BaseIntegralProblem.calcRows`
 
-        # Create vectors of nodal location
-        # (lower and upper coners for each cell)
-        xn = self.mesh.vectorNx
-        yn = self.mesh.vectorNy
-        zn = self.mesh.vectorNz
+        Magnetization = 'ind' | 'xyz', defaults to :attr:`magnetization`
+        """
+        if Magnetization is None:
+            Magnetization = self.magnetization
 
-        yn2, xn2, zn2 = np.meshgrid(yn[1:], xn[1:], zn[1:])
-        yn1, xn1, zn1 = np.meshgrid(yn[0:-1], xn[0:-1], zn[0:-1])
+        # Find non-zero cells
+        inds = activeIndices(self.mesh, getattr(self, 'actInd', None))
+        nC = len(inds)
 
-        Yn = P.T*np.c_[Utils.mkvc(yn1), Utils.mkvc(yn2)]
-        Xn = P.T*np.c_[Utils.mkvc(xn1), Utils.mkvc(xn2)]
-        Zn = P.T*np.c_[Utils.mkvc(zn1), Utils.mkvc(zn2)]
+        # Lower and upper corners of each active cell, from the cell
+        # centers and widths (TensorMesh or TreeMesh)
+        Xn, Yn, Zn = cellCorners(self.mesh, inds)
 
         survey = self.survey
         rxLoc = survey.srcField.rxList[0].locs
-        ndata = rxLoc.shape[0]
 
         # Pre-allocate space and create magnetization matrix if required
 
@@ -143,104 +146,47 @@ class MagneticIntegral(Problem.LinearProblem):
         if getattr(self, 'M', None) is None:
             M = dipazm_2_xyz(np.ones(nC) * survey.srcField.param[1],
                              np.ones(nC) * survey.srcField.param[2])
+        else:
+            M = self.M
 
-        Mx = Utils.sdiag(M[:, 0]*survey.srcField.param[0])
-        My = Utils.sdiag(M[:, 1]*survey.srcField.param[0])
-        Mz = Utils.sdiag(M[:, 2]*survey.srcField.param[0])
-
-        Mxyz = sp.vstack((Mx, My, Mz))
-
-        if survey.srcField.rxList[0].rxType == 'tmi':
-
+        # Magnetization scaled by the inducing field strength
+        Mxyz = M * survey.srcField.param[0]
 
-            # Convert Bdecination from north to cartesian
-            D = (450.-float(survey.srcField.param[2])) % 360.
-            I = survey.srcField.param[1]
-            # Projection matrix
-            Ptmi = Utils.mkvc(np.r_[np.cos(np.deg2rad(I))*np.cos(np.deg2rad(D)),
-                              np.cos(np.deg2rad(I))*np.sin(np.deg2rad(D)),
-                              np.sin(np.deg2rad(I))], 2).T
+        # Convert Bdecination from north to cartesian
+        D = (450.-float(survey.srcField.param[2])) % 360.
+        I = survey.srcField.param[1]
+        # Projection matrix
+        Ptmi = np.r_[np.cos(np.deg2rad(I))*np.cos(np.deg2rad(D)),
+                     np.cos(np.deg2rad(I))*np.sin(np.deg2rad(D)),
+                     np.sin(np.deg2rad(I))]
 
         if self.forwardOnly:
 
-            if self.rtype == 'tmi':
-
-                fwr_out = np.zeros(self.survey.nRx)
-
-            else:
-
-                fwr_out = np.zeros(3*self.survey.nRx)
+            rtype = self.rtype
 
         else:
 
-            if (Magnetization == 'ind'):
-
-                if survey.srcField.rxList[0].rxType == 'tmi':
-                    fwr_out = np.zeros((ndata, nC))
-
-                elif survey.srcField.rxList[0].rxType == 'xyz':
-
-                    fwr_out = np.zeros((int(3*ndata), nC))
-
-            elif Magnetization == 'xyz':
-                if survey.srcField.rxList[0].rxType == 'tmi':
-                    fwr_out = np.zeros((int(ndata), int(3*nC)))
-
-                elif survey.srcField.rxList[0].rxType == 'xyz':
-                    fwr_out = np.zeros((int(3*ndata), int(3*nC)))
-
-            else:
-                print("""Flag must be either 'ind' | 'xyz', please revised""")
-                return
-
-            # Loop through all observations and create forward operator (nD-by-nC)
-            print("Begin calculation of forward operator: " + Magnetization)
-
-        # Add counter to dsiplay progress. Good for large problems
-        count = -1
-        for ii in range(ndata):
-
-            tx, ty, tz = get_T_mat(Xn, Yn, Zn, rxLoc[ii, :])
-
-            if self.forwardOnly:
-
-                if self.rtype == 'tmi':
-                    fwr_out[ii] = (Ptmi.dot(np.vstack((tx, ty, tz)))*Mxyz).dot(m)
+            rtype = survey.srcField.rxList[0].rxType
 
-                elif self.rtype == 'xyz':
-                    fwr_out[ii] = (tx*Mxyz).dot(m)
-                    fwr_out[ii+ndata] = (ty*Mxyz).dot(m)
-                    fwr_out[ii+2*ndata] = (tz*Mxyz).dot(m)
+        if rtype == 'tmi':
+            nComp = 1
 
-            else:
+        elif rtype == 'xyz':
+            nComp = 3
 
-                if Magnetization == 'ind':
+        if Magnetization == 'ind':
+            nCol = nC
 
-                    if survey.srcField.rxList[0].rxType == 'tmi':
-                        fwr_out[ii, :] = Ptmi.dot(np.vstack((tx, ty, tz)))*Mxyz
-
-                    elif survey.srcField.rxList[0].rxType == 'xyz':
-                        fwr_out[ii, :] = tx*Mxyz
-                        fwr_out[ii+ndata, :] = ty*Mxyz
-                        fwr_out[ii+2*ndata, :] = tz*Mxyz
-
-                elif Magnetization == 'xyz':
-
-                    if survey.srcField.rxList[0].rxType == 'tmi':
-                        fwr_out[ii, :] = Ptmi.dot(np.vstack((tx, ty, tz)) *
-                                                  survey.srcField.param[0])
-
-                    elif survey.srcField.rxList[0].rxType == 'xyz':
-                        fwr_out[ii, :] = tx * survey.srcField.param[0]
-                        fwr_out[ii+ndata, :] = ty * survey.srcField.param[0]
-                        fwr_out[ii+2*ndata, :] = tz * survey.srcField.param[0]
-
-            # Display progress
-            count = progress(ii, count, ndata)
-
-        print("Done 100% ...forward operator completed!!\n")
+        else:
+            nCol = 3*nC
 
-        return fwr_out
+        return (
+            calcMagRows, rxLoc,
+            {'Xn': Xn, 'Yn': Yn, 'Zn': Zn, 'Mxyz': Mxyz},
+            {'Ptmi': Ptmi, 'rtype': rtype, 'Magnetization': Magnetization,
+             'H0': survey.srcField.param[0]},
+            nComp, nCol
+        )
 
 
 class MagneticVector(MagneticIntegral):
@@ -249,35 +195,11 @@ class MagneticVector(MagneticIntegral):
     actInd = None  #: Active cell indices provided
     M = None  #: Magnetization matrix provided, otherwise all induced
     rtype = 'tmi'  #: Receiver type either "tmi" | "xyz"
+    magnetization = 'xyz'  #: Columns of G, either "ind" | "xyz"
 
     def __init__(self, mesh, **kwargs):
         Problem.BaseProblem.__init__(self, mesh, **kwargs)
 
-    def fwr_ind(self, m):
-
-        if self.forwardOnly:
-
-            # Compute the linear operation without forming the full dense G
-            fwr_d = Intrgl_Fwr_Op(m=m, Magnetization='xyz')
-
-            return fwr_d
-
-        else:
-
-            # m = np.hstack([m, mii])
-
-            return self.G.dot(m)
-
-    @property
-    def G(self):
-        if not self.ispaired:
-            raise Exception('Need to pair!')
-
-        if getattr(self, '_G', None) is None:
-            self._G = self.Intrgl_Fwr_Op(Magnetization='xyz')
-
-        return self._G
-
 
 class MagneticAmplitude(MagneticIntegral):
 
@@ -286,6 +208,9 @@ class MagneticAmplitude(MagneticIntegral):
     M = None  #: Magnetization matrix provided, otherwise all induced
     rtype = 'xyz'  #: Receivers must be "xyz"
 
+    #: Field components and derivatives of the current model
+    deleteTheseOnModelUpdate = ['_Bxyz', '_dfdm']
+
     def __init__(self, mesh, **kwargs):
         Problem.BaseProblem.__init__(self, mesh, **kwargs)
 
@@ -293,20 +218,13 @@ class MagneticAmplitude(MagneticIntegral):
 
         self.survey.srcField.rxList[0].rxType = 'xyz'
 
-        if self.forwardOnly:
-
-            # Compute the linear operation without forming the full dense G
-            Bxyz = Intrgl_Fwr_Op(m=m)
-
-            return self.calcAmpData(Bxyz)
-
-        else:
-            if m is None:
-                m = self.chiMap*self.model
+        if m is None:
+            m = self.chiMap*self.model
 
-            Bxyz = self.G.dot(m)
+        # Without forming the full dense G if forwardOnly
+        Bxyz = self.Gvec(m)
 
-            return self.calcAmpData(Bxyz)
+        return self.calcAmpData(Bxyz)
 
     def calcAmpData(self, Bxyz):
 
@@ -322,17 +240,26 @@ class MagneticAmplitude(MagneticIntegral):
 
         self.model = m
 
-        ampB = self.fwr_ind(m)
+        ampB = self.calcAmpData(self.Bxyz)
 
         return ampB
 
     def Jvec(self, m, v, f=None):
+        self.model = m
+
         dmudm = self.chiMap.deriv(m)
-        return self.dfdm*(self.G.dot(dmudm*v))
+        Gv = self.Gvec(dmudm*v)
+
+        # Scale and sum the three components of G*v
+        return np.sum(self.dfdm * Gv.reshape(self.dfdm.shape), axis=0)
 
     def Jtvec(self, m, v, f=None):
+        self.model = m
+
         dmudm = self.chiMap.deriv(m)
-        return dmudm.T * (self.G.T.dot(self.dfdm.T*v))
+
+        # Three scaled copies of v, one per component
+        return dmudm.T * (self.Gtvec((self.dfdm * v).ravel()))
 
     @property
     def G(self):
@@ -345,23 +272,32 @@ class MagneticAmplitude(MagneticIntegral):
         return self._G
 
     @property
-    def dfdm(self):
+    def Bxyz(self):
+        """
+        Field components [Bx, By, Bz] of the current model, computed once
+        per model and shared by the data and the derivatives
+        """
+        if getattr(self, '_Bxyz', None) is None:
 
-        if getattr(self, '_dfdm', None) is None:
+            self.survey.srcField.rxList[0].rxType = 'xyz'
 
-            ndata = self.survey.srcField.rxList[0].locs.shape[0]
+            # Without forming the full dense G if forwardOnly
+            self._Bxyz = self.Gvec(self.chiMap*self.model)
 
-            # Get field data
-            m = self.chiMap*self.model
+        return self._Bxyz
 
-            Bxyz = self.G.dot(m)
+    @property
+    def dfdm(self):
+        """
+        Derivative of the amplitude data with respect to the field
+        components, as the [3 x ndata] array [Bx, By, Bz] / |B| of the
+        current model
+        """
+        if getattr(self, '_dfdm', None) is None:
 
-            Bamp = self.calcAmpData(Bxyz)
+            Bxyz = self.Bxyz.reshape((3, -1))
 
-            Bx = sp.spdiags(Bxyz[:ndata]/Bamp, 0, ndata, ndata)
-            By = sp.spdiags(Bxyz[ndata:2*ndata]/Bamp, 0, ndata, ndata)
-            Bz = sp.spdiags(Bxyz[2*ndata:]/Bamp, 0, ndata, ndata)
-            self._dfdm = sp.hstack((Bx, By, Bz))
+            self._dfdm = Bxyz / self.calcAmpData(self.Bxyz)
 
         return self._dfdm
 
@@ -734,24 +670,27 @@ def MagneticsDiffSecondaryInv(mesh, model, data, **kwargs):
     return inv, reg
 
 
-def get_T_mat(Xn, Yn, Zn, rxLoc):
+def get_T_mat(Xn, Yn, Zn, rxLoc, nTile=8192):
     """
     Load in the active nodes of a tensor mesh and computes the magnetic tensor
-    for a given observation location rxLoc[obsx, obsy, obsz]
+    for a given observation location rxLoc[obsx, obsy, obsz], or for a block
+    of observation locations rxLoc[nB, 3] at once
 
     INPUT:
     Xn, Yn, Zn: Node location matrix for the lower and upper most corners of
                 all cells in the mesh shape[nC,2]
-    M
+    rxLoc:      Observation location(s), shape[3] or shape[nB, 3]
+    nTile:      Number of receiver-cell pairs evaluated at once. The cells
+                are processed in tiles so that the temporaries stay in cache.
+
     OUTPUT:
     Tx = [Txx Txy Txz]
     Ty = [Tyx Tyy Tyz]
     Tz = [Tzx Tzy Tzz]
 
-    where each elements have dimension 1-by-nC.
-    Only the upper half 5 elements have to be computed since symetric.
-    Currently done as for-loops but will eventually be changed to vector
-    indexing, once the topography has been figured out.
+    where each elements have dimension nB-by-nC (1-by-nC for a single
+    location). Only the upper half 5 elements have to be computed since
+    symetric.
 
     Created on Oct, 20th 2015
 
@@ -759,95 +698,179 @@ def get_T_mat(Xn, Yn, Zn, rxLoc):
 
      """
 
-    eps = 1e-10  # add a small value to the locations to avoid /0
+    rxLoc = np.atleast_2d(rxLoc)
 
     nC = Xn.shape[0]
+    nB = rxLoc.shape[0]
 
-    # Pre-allocate space for 1D array
-    Tx = np.zeros((1, 3*nC))
-    Ty = np.zeros((1, 3*nC))
-    Tz = np.zeros((1, 3*nC))
-
-    dz2 = rxLoc[2] - Zn[:, 0] + eps
-    dz1 = rxLoc[2] - Zn[:, 1] + eps
-
-    dy2 = Yn[:, 1] - rxLoc[1] + eps
-    dy1 = Yn[:, 0] - rxLoc[1] + eps
-
-    dx2 = Xn[:, 1] - rxLoc[0] + eps
-    dx1 = Xn[:, 0] - rxLoc[0] + eps
-
-    R1 = (dy2**2 + dx2**2)
-    R2 = (dy2**2 + dx1**2)
-    R3 = (dy1**2 + dx2**2)
-    R4 = (dy1**2 + dx1**2)
-
-    arg1 = np.sqrt(dz2**2 + R2)
-    arg2 = np.sqrt(dz2**2 + R1)
-    arg3 = np.sqrt(dz1**2 + R1)
-    arg4 = np.sqrt(dz1**2 + R2)
-    arg5 = np.sqrt(dz2**2 + R3)
-    arg6 = np.sqrt(dz2**2 + R4)
-    arg7 = np.sqrt(dz1**2 + R4)
-    arg8 = np.sqrt(dz1**2 + R3)
-
-    Tx[0, 0:nC] = np.arctan2(dy1 * dz2, (dx2 * arg5)) +\
-        - np.arctan2(dy2 * dz2, (dx2 * arg2)) +\
-        np.arctan2(dy2 * dz1, (dx2 * arg3)) +\
-        - np.arctan2(dy1 * dz1, (dx2 * arg8)) +\
-        np.arctan2(dy2 * dz2, (dx1 * arg1)) +\
-        - np.arctan2(dy1 * dz2, (dx1 * arg6)) +\
-        np.arctan2(dy1 * dz1, (dx1 * arg7)) +\
-        - np.arctan2(dy2 * dz1, (dx1 * arg4))
-
-    Ty[0, 0:nC] = np.log((dz2 + arg2) / (dz1 + arg3)) +\
-        -np.log((dz2 + arg1) / (dz1 + arg4)) +\
-        np.log((dz2 + arg6) / (dz1 + arg7)) +\
-        -np.log((dz2 + arg5) / (dz1 + arg8))
-
-    Ty[0, nC:2*nC] = np.arctan2(dx1 * dz2, (dy2 * arg1)) +\
-        - np.arctan2(dx2 * dz2, (dy2 * arg2)) +\
-        np.arctan2(dx2 * dz1, (dy2 * arg3)) +\
-        - np.arctan2(dx1 * dz1, (dy2 * arg4)) +\
-        np.arctan2(dx2 * dz2, (dy1 * arg5)) +\
-        - np.arctan2(dx1 * dz2, (dy1 * arg6)) +\
-        np.arctan2(dx1 * dz1, (dy1 * arg7)) +\
-        - np.arctan2(dx2 * dz1, (dy1 * arg8))
-
-    R1 = (dy2**2 + dz1**2)
-    R2 = (dy2**2 + dz2**2)
-    R3 = (dy1**2 + dz1**2)
-    R4 = (dy1**2 + dz2**2)
-
-    Ty[0, 2*nC:] = np.log((dx1 + np.sqrt(dx1**2 + R1)) /
-                          (dx2 + np.sqrt(dx2**2 + R1))) +\
-        -np.log((dx1 + np.sqrt(dx1**2 + R2)) / (dx2 + np.sqrt(dx2**2 + R2))) +\
-        np.log((dx1 + np.sqrt(dx1**2 + R4)) / (dx2 + np.sqrt(dx2**2 + R4))) +\
-        -np.log((dx1 + np.sqrt(dx1**2 + R3)) / (dx2 + np.sqrt(dx2**2 + R3)))
-
-    R1 = (dx2**2 + dz1**2)
-    R2 = (dx2**2 + dz2**2)
-    R3 = (dx1**2 + dz1**2)
-    R4 = (dx1**2 + dz2**2)
-
-    Tx[0, 2*nC:] = np.log((dy1 + np.sqrt(dy1**2 + R1)) /
-                          (dy2 + np.sqrt(dy2**2 + R1))) +\
-        -np.log((dy1 + np.sqrt(dy1**2 + R2)) / (dy2 + np.sqrt(dy2**2 + R2))) +\
-        np.log((dy1 + np.sqrt(dy1**2 + R4)) / (dy2 + np.sqrt(dy2**2 + R4))) +\
-        -np.log((dy1 + np.sqrt(dy1**2 + R3)) / (dy2 + np.sqrt(dy2**2 + R3)))
-
-    Tz[0, 2*nC:] = -(Ty[0, nC:2*nC] + Tx[0, 0:nC])
-    Tz[0, nC:2*nC] = Ty[0, 2*nC:]
-    Tx[0, nC:2*nC] = Ty[0, 0:nC]
-    Tz[0, 0:nC] = Tx[0, 2*nC:]
-
-    Tx = Tx/(4*np.pi)
-    Ty = Ty/(4*np.pi)
-    Tz = Tz/(4*np.pi)
+    # Pre-allocate space for the block of rows
+    Tx = np.empty((nB, 3*nC))
+    Ty = np.empty((nB, 3*nC))
+    Tz = np.empty((nB, 3*nC))
+
+    nCt = max(1, int(nTile / nB))
+
+    for ind in range(0, nC, nCt):
+
+        cells = slice(ind, min(ind + nCt, nC))
+        cellsy = slice(nC + cells.start, nC + cells.stop)
+        cellsz = slice(2*nC + cells.start, 2*nC + cells.stop)
+
+        txx, txy, txz, tyy, tyz = get_T_comp(
+            Xn[cells, :], Yn[cells, :], Zn[cells, :], rxLoc
+        )
+
+        Tx[:, cells], Tx[:, cellsy], Tx[:, cellsz] = txx, txy, txz
+        Ty[:, cells], Ty[:, cellsy], Ty[:, cellsz] = txy, tyy, tyz
+        Tz[:, cells], Tz[:, cellsy], Tz[:, cellsz] = txz, tyz, -(txx + tyy)
 
     return Tx, Ty, Tz
 
 
+def get_T_comp(Xn, Yn, Zn, rxLoc):
+    """
+    Computes the five independent components of the magnetic tensor for a
+    block of observation locations rxLoc[nB, 3] and a set of prisms. The
+    distances to the eight corners of the prisms are evaluated once and
+    shared by all the components.
+
+    INPUT:
+    Xn, Yn, Zn: Node location matrix for the lower and upper most corners of
+                the cells shape[nC,2]
+    rxLoc:      Observation locations shape[nB, 3]
+
+    OUTPUT:
+    [Txx, Txy, Txz, Tyy, Tyz], each of dimension nB-by-nC
+
+    """
+
+    eps = 1e-10  # add a small value to the locations to avoid /0
+
+    # Distances from the receivers to the cell faces [nB x nC]
+    dz2 = rxLoc[:, 2:3] - Zn[:, 0] + eps
+    dz1 = rxLoc[:, 2:3] - Zn[:, 1] + eps
+
+    dy2 = Yn[:, 1] - rxLoc[:, 1:2] + eps
+    dy1 = Yn[:, 0] - rxLoc[:, 1:2] + eps
+
+    dx2 = Xn[:, 1] - rxLoc[:, 0:1] + eps
+    dx1 = Xn[:, 0] - rxLoc[:, 0:1] + eps
+
+    dx1s, dx2s = dx1**2, dx2**2
+    dy1s, dy2s = dy1**2, dy2**2
+    dz1s, dz2s = dz1**2, dz2**2
+
+    R1 = (dy2s + dx2s)
+    R2 = (dy2s + dx1s)
+    R3 = (dy1s + dx2s)
+    R4 = (dy1s + dx1s)
+
+    # Distances to the eight corners of each prism
+    arg1 = np.sqrt(dz2s + R2)
+    arg2 = np.sqrt(dz2s + R1)
+    arg3 = np.sqrt(dz1s + R1)
+    arg4 = np.sqrt(dz1s + R2)
+    arg5 = np.sqrt(dz2s + R3)
+    arg6 = np.sqrt(dz2s + R4)
+    arg7 = np.sqrt(dz1s + R4)
+    arg8 = np.sqrt(dz1s + R3)
+
+    # Products shared by the arctan terms
+    dy1dz1, dy1dz2 = dy1 * dz1, dy1 * dz2
+    dy2dz1, dy2dz2 = dy2 * dz1, dy2 * dz2
+    dx1dz1, dx1dz2 = dx1 * dz1, dx1 * dz2
+    dx2dz1, dx2dz2 = dx2 * dz1, dx2 * dz2
+
+    txx = np.arctan2(dy1dz2, (dx2 * arg5)) +\
+        - np.arctan2(dy2dz2, (dx2 * arg2)) +\
+        np.arctan2(dy2dz1, (dx2 * arg3)) +\
+        - np.arctan2(dy1dz1, (dx2 * arg8)) +\
+        np.arctan2(dy2dz2, (dx1 * arg1)) +\
+        - np.arctan2(dy1dz2, (dx1 * arg6)) +\
+        np.arctan2(dy1dz1, (dx1 * arg7)) +\
+        - np.arctan2(dy2dz1, (dx1 * arg4))
+
+    # Sum of logs evaluated as the log of a single ratio
+    txy = np.log(
+        ((dz2 + arg2) * (dz1 + arg4) * (dz2 + arg6) * (dz1 + arg8)) /
+        ((dz1 + arg3) * (dz2 + arg1) * (dz1 + arg7) * (dz2 + arg5))
+    )
+
+    tyy = np.arctan2(dx1dz2, (dy2 * arg1)) +\
+        - np.arctan2(dx2dz2, (dy2 * arg2)) +\
+        np.arctan2(dx2dz1, (dy2 * arg3)) +\
+        - np.arctan2(dx1dz1, (dy2 * arg4)) +\
+        np.arctan2(dx2dz2, (dy1 * arg5)) +\
+        - np.arctan2(dx1dz2, (dy1 * arg6)) +\
+        np.arctan2(dx1dz1, (dy1 * arg7)) +\
+        - np.arctan2(dx2dz1, (dy1 * arg8))
+
+    tyz = np.log(
+        ((dx1 + arg4) * (dx2 + arg2) * (dx1 + arg6) * (dx2 + arg8)) /
+        ((dx2 + arg3) * (dx1 + arg1) * (dx2 + arg5) * (dx1 + arg7))
+    )
+
+    txz = np.log(
+        ((dy1 + arg8) * (dy2 + arg2) * (dy1 + arg6) * (dy2 + arg4)) /
+        ((dy2 + arg3) * (dy1 + arg5) * (dy2 + arg1) * (dy1 + arg7))
+    )
+
+    return [t / (4*np.pi) for t in [txx, txy, txz, tyy, tyz]]
+
+
+def calcMagRows(rxLoc, Xn, Yn, Zn, Mxyz, Ptmi, rtype, Magnetization, H0):
+    """
+    calcMagRows(rxLoc, Xn, Yn, Zn, Mxyz, Ptmi, rtype, Magnetization, H0)
+
+    Rows of the magnetic forward operator for a block of receivers
+
+    INPUT
+    rxLoc         : [nB-by-3] Observation locations
+    Xn, Yn, Zn    : [nC-by-2] Lower and upper corners of the cells
+    Mxyz          : [nC-by-3] Magnetization scaled by the inducing field
+    Ptmi          : Unit vector of the inducing field
+    rtype         : 'tmi' | 'xyz'
+    Magnetization : 'ind' | 'xyz'
+    H0            : Inducing field strength
+
+    OUTPUT
+    List of [nB-by-nC] ('ind') or [nB-by-3nC] ('xyz') blocks of rows, one
+    per component of the data
+    """
+    tx, ty, tz = get_T_mat(Xn, Yn, Zn, rxLoc)
+
+    if rtype == 'tmi':
+        rows = [Ptmi[0]*tx + Ptmi[1]*ty + Ptmi[2]*tz]
+
+    elif rtype == 'xyz':
+        rows = [tx, ty, tz]
+
+    if Magnetization == 'ind':
+        return [magnetizeRows(row, Mxyz) for row in rows]
+
+    return [row * H0 for row in rows]
+
+
+def magnetizeRows(T, M):
+    """
+    magnetizeRows(T, M)
+
+    Apply a magnetization to a block of rows of the magnetic tensor.
+    Equivalent to T*[diag(Mx); diag(My); diag(Mz)] without forming the
+    sparse magnetization matrix.
+
+    INPUT
+    T       : [nB-by-3nC] Block of rows from get_T_mat
+    M       : [nC-by-3] Magnetization vector of each cell
+
+    OUTPUT
+    [nB-by-nC] Block of rows for the induced problem
+    """
+    nC = M.shape[0]
+
+    return (T[:, :nC]*M[:, 0] + T[:, nC:2*nC]*M[:, 1] + T[:, 2*nC:]*M[:, 2])
+
+
 def progress(iter, prog, final):
     """
     progress(iter,prog,final)
@@ -904,19 +927,24 @@ def dipazm_2_xyz(dip, azm_N):
     return M
 
 
-def get_dist_wgt(mesh, rxLoc, actv, R, R0):
+def get_dist_wgt(mesh, rxLoc, actv, R, R0, maxRAM=0.1, n_cpu=1):
     """
-    get_dist_wgt(xn,yn,zn,rxLoc,R,R0)
+    get_dist_wgt(mesh,rxLoc,actv,R,R0)
 
     Function creating a distance weighting function required for the magnetic
     inverse problem.
 
+    The receivers are processed in blocks, whose size is limited by maxRAM,
+    and the blocks can be spread over n_cpu threads.
+
     INPUT
-    xn, yn, zn : Node location
+    mesh        : 3D mesh (TensorMesh or TreeMesh)
     rxLoc       : Observation locations [obsx, obsy, obsz]
     actv        : Active cell vector [0:air , 1: ground]
     R           : Decay factor (mag=3, grav =2)
     R0          : Small factor added (default=dx/4)
+    maxRAM      : Memory (GB) allowed for a block of receivers
+    n_cpu       : Number of threads, None for all the cpus
 
     OUTPUT
     wr       : [nC] Vector of distance weighting
@@ -927,68 +955,64 @@ def get_dist_wgt(mesh, rxLoc, actv, R, R0):
     """
 
     # Find non-zero cells
-    if actv.dtype == 'bool':
-        inds = np.asarray([inds for inds,
-                          elem in enumerate(actv, 1) if elem], dtype=int) - 1
-    else:
-        inds = actv
-
+    inds = activeIndices(mesh, actv)
     nC = len(inds)
 
-    # Create active cell projector
-    P = sp.csr_matrix((np.ones(nC), (inds, range(nC))),
-                      shape=(mesh.nC, nC))
-
     # Geometrical constant
     p = 1/np.sqrt(3)
 
-    # Create cell center location
-    Ym, Xm, Zm = np.meshgrid(mesh.vectorCCy, mesh.vectorCCx, mesh.vectorCCz)
-    hY, hX, hZ = np.meshgrid(mesh.hy, mesh.hx, mesh.hz)
-
-    # Remove air cells
-    Xm = P.T*Utils.mkvc(Xm)
-    Ym = P.T*Utils.mkvc(Ym)
-    Zm = P.T*Utils.mkvc(Zm)
+    # Cell centers and widths of the active cells (TensorMesh or TreeMesh)
+    centers, widths = cellCentersWidths(mesh, inds)
 
-    hX = P.T*Utils.mkvc(hX)
-    hY = P.T*Utils.mkvc(hY)
-    hZ = P.T*Utils.mkvc(hZ)
+    # Lower and upper points sampled in each cell [3 x nC]
+    lower = (centers - widths * p).T
+    upper = (centers + widths * p).T
 
-    V = P.T * Utils.mkvc(mesh.vol)
-    wr = np.zeros(nC)
+    V = Utils.mkvc(mesh.vol)[inds]
 
     ndata = rxLoc.shape[0]
-    count = -1
-    print("Begin calculation of distance weighting for R= " + str(R))
 
-    for dd in range(ndata):
+    if n_cpu is None:
+        n_cpu = multiprocessing.cpu_count()
+
+    # About ten [nB x nC] arrays are held per block of receivers
+    nBlock = blockSize(nC, maxRAM / n_cpu, nArrays=10)
+    nBlock = min(nBlock, int(np.ceil(float(ndata) / n_cpu)))
+
+    print("Begin calculation of distance weighting for R= " + str(R))
 
-        nx1 = (Xm - hX * p - rxLoc[dd, 0])**2
-        nx2 = (Xm + hX * p - rxLoc[dd, 0])**2
+    def calcBlock(ii):
+        rx = rxLoc[ii:ii + nBlock, :]
 
-        ny1 = (Ym - hY * p - rxLoc[dd, 1])**2
-        ny2 = (Ym + hY * p - rxLoc[dd, 1])**2
+        # Squared distances along each axis [nB x nC]
+        n1 = [(lower[jj] - rx[:, jj:jj+1])**2. for jj in range(3)]
+        n2 = [(upper[jj] - rx[:, jj:jj+1])**2. for jj in range(3)]
 
-        nz1 = (Zm - hZ * p - rxLoc[dd, 2])**2
-        nz2 = (Zm + hZ * p - rxLoc[dd, 2])**2
+        temp = np.zeros((rx.shape[0], nC))
+        for nx in [n1[0], n2[0]]:
+            for ny in [n1[1], n2[1]]:
+                nxy = nx + ny
+                for nz in [n1[2], n2[2]]:
+                    temp += (np.sqrt(nxy + nz) + R0)**-R
 
-        R1 = np.sqrt(nx1 + ny1 + nz1)
-        R2 = np.sqrt(nx1 + ny1 + nz2)
-        R3 = np.sqrt(nx2 + ny1 + nz1)
-        R4 = np.sqrt(nx2 + ny1 + nz2)
-        R5 = np.sqrt(nx1 + ny2 + nz1)
-        R6 = np.sqrt(nx1 + ny2 + nz2)
-        R7 = np.sqrt(nx2 + ny2 + nz1)
-        R8 = np.sqrt(nx2 + ny2 + nz2)
+        return np.sum((V*temp/8.)**2., axis=0)
 
-        temp = (R1 + R0)**-R + (R2 + R0)**-R + (R3 + R0)**-R + \
-            (R4 + R0)**-R + (R5 + R0)**-R + (R6 + R0)**-R + \
-            (R7 + R0)**-R + (R8 + R0)**-R
+    starts = range(0, ndata, nBlock)
 
-        wr = wr + (V*temp/8.)**2.
+    if n_cpu == 1 or len(starts) == 1:
+        wr = np.zeros(nC)
+        count = -1
+        for ii in starts:
+            wr += calcBlock(ii)
+            count = progress(min(ii + nBlock, ndata) - 1, count, ndata)
 
-        count = progress(dd, count, ndata)
+    else:
+        pool = multiprocessing.pool.ThreadPool(n_cpu)
+        try:
+            wr = np.sum(pool.map(calcBlock, starts), axis=0)
+        finally:
+            pool.close()
+            pool.join()
 
     wr = np.sqrt(wr)/V
     wr = Utils.mkvc(wr)
@@ -999,6 +1023,37 @@ def get_dist_wgt(mesh, rxLoc, actv, R, R0):
     return wr
 
 
+def get_sens_wgt(prob):
+    """
+    get_sens_wgt(prob)
+
+    Function creating a sensitivity weighting function from the forward
+    operator of an integral problem, as a cheaper and exact alternative to
+    :func:`get_dist_wgt` once G is available. The norm of each column of G
+    is used in place of the distance decay, with the same normalization.
+
+    INPUT
+    prob        : Paired GravityIntegral or MagneticIntegral. G can be
+                  stored in RAM, on disk or compressed, or be matrix-free
+                  if forwardOnly
+
+    OUTPUT
+    wr       : [nC] Vector of sensitivity weighting
+    """
+    inds = activeIndices(prob.mesh, getattr(prob, 'actInd', None))
+    V = Utils.mkvc(prob.mesh.vol)[inds]
+
+    wr = np.sqrt(prob.getGtGdiag())
+
+    # Columns of all the magnetization components of a cell
+    wr = np.sqrt(np.sum(wr.reshape((-1, len(inds)))**2., axis=0))
+
+    wr = wr/V
+    wr = np.sqrt(wr/(np.max(wr)))
+
+    return wr
+
+
 def writeUBCobs(filename, survey, d):
     """
     writeUBCobs(filename,B,M,rxLoc,d,wd)
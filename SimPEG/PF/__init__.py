@@ -1,3 +1,4 @@
+from . import BasePF
 from . import MagAnalytics
 from . import GravAnalytics
 from . import BaseMag
@@ -134,6 +134,11 @@ class BaseProblem(Props.HasModel):
             return
         for prop in self.deleteTheseOnModelUpdate:
             if hasattr(self, prop):
+                # release factorizations explicitly rather than waiting
+                # for the garbage collector
+                clean = getattr(getattr(self, prop), 'clean', None)
+                if callable(clean):
+                    clean()
                 delattr(self, prop)
 
     @property
@@ -266,6 +271,23 @@ class BaseTimeProblem(BaseProblem):
         if hasattr(self, '_timeMesh'):
             del self._timeMesh
 
+    def stepFields(self, tInd, u):
+        """
+        Advance the fields of all the sources from time index tInd to tInd+1.
+        Used by :class:`SimPEG.Fields.TimeFields` to recompute the time
+        slices that were not stored.
+
+        :param int tInd: time index
+        :param numpy.ndarray u: fields at tInd (nP, nSrc)
+        :rtype: numpy.ndarray
+        :return: fields at tInd+1
+        """
+        raise NotImplementedError(
+            'stepFields is not implemented for {}'.format(
+                self.__class__.__name__
+            )
+        )
+
 
 class LinearProblem(BaseProblem):
 
@@ -295,3 +317,9 @@ class LinearProblem(BaseProblem):
 
     def Jtvec(self, m, v, f=None):
         return self.G.T.dot(v)
+
+    def getGtGdiag(self):
+        """
+        Diagonal of G^T*G, the squared norm of the columns of G
+        """
+        return np.sum(self.G**2., axis=0)
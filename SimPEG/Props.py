@@ -121,9 +121,11 @@ class Mapping(SphinxProp, properties.Property):
             self._set(scope.name, value)
             if value is not properties.utils.undefined:
                 scope.clear_props(self)
+            _clear_model_cache(self)
 
         def fdel(self):
             self._set(scope.name, properties.utils.undefined)
+            _clear_model_cache(self)
 
         return property(fget=fget, fset=fset, fdel=fdel, doc=scope.doc)
 
@@ -194,7 +196,10 @@ class PhysicalProperty(SphinxProp, properties.Property):
                             )
                         )
                 # Set by mapped reciprocal
-                return 1.0 / getattr(self, scope.reciprocal.name)
+                return _get_model_cached(
+                    self, scope.name,
+                    lambda: 1.0 / getattr(self, scope.reciprocal.name)
+                )
 
             mapping = getattr(self, scope.mapping.name)
             if mapping is None:
@@ -210,7 +215,9 @@ class PhysicalProperty(SphinxProp, properties.Property):
                         scope.name
                     )
                 )
-            return mapping * self.model
+            return _get_model_cached(
+                self, scope.name, lambda: mapping * self.model
+            )
 
         def fset(self, value):
             if value is not properties.utils.undefined:
@@ -220,9 +227,11 @@ class PhysicalProperty(SphinxProp, properties.Property):
             self._set(scope.name, value)
             if value is not properties.utils.undefined:
                 scope.clear_mappings(self)
+            _clear_model_cache(self)
 
         def fdel(self):
             self._set(scope.name, properties.utils.undefined)
+            _clear_model_cache(self)
 
         return property(fget=fget, fset=fset, fdel=fdel, doc=scope.doc)
 
@@ -316,11 +325,54 @@ class Derivative(SphinxProp, properties.GettableProperty):
             if self.model is None:
                 return Utils.Zero()
 
-            return mapping.deriv(self.model)
+            return _get_model_cached(
+                self, scope.name, lambda: mapping.deriv(self.model)
+            )
 
         return property(fget=fget, doc=scope.doc)
 
 
+def _get_model_cached(instance, name, fct):
+    """
+    Value of fct() for the current model of instance, computed once per
+    model. Cached arrays are returned as read only views.
+
+    The cache is kept with a copy of the model it was computed for, so an
+    in place change of the model values also invalidates it.
+    """
+    model = getattr(instance, 'model', None)
+    cache = getattr(instance, '_model_cache', None)
+    if cache is None or not _same_model(
+        getattr(instance, '_model_cache_model', None), model
+    ):
+        cache = {}
+        instance._model_cache = cache
+        instance._model_cache_model = (
+            None if model is None else np.array(model, copy=True)
+        )
+
+    if name not in cache:
+        value = fct()
+        if isinstance(value, np.ndarray):
+            value = value.view()
+            value.flags.writeable = False
+        cache[name] = value
+    return cache[name]
+
+
+def _same_model(cached, model):
+    """True if the cached copy holds the values of model"""
+    if cached is None or model is None:
+        return cached is None and model is None
+    return np.array_equal(cached, model)
+
+
+def _clear_model_cache(instance):
+    """Forget the values cached for the model of instance"""
+    if getattr(instance, '_model_cache', None):
+        instance._model_cache = {}
+
+
 def Invertible(help, default=None):
 
     mapping = Mapping(
@@ -386,6 +438,12 @@ class HasModel(BaseSimPEG):
                 return True
         return False
 
+    @properties.observer('model')
+    def _on_model_cache_update(self, change):
+        # physical properties and their derivatives are cached per model
+        if change['previous'] is not change['value']:
+            _clear_model_cache(self)
+
     @properties.validator('model')
     def _check_model_valid(self, change):
         """Checks the model length and necessity"""
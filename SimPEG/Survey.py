@@ -51,17 +51,18 @@ class BaseRx(object):
 
             .. note::
 
-                Projection matrices are stored as a dictionary listed by meshes.
+                Projection matrices are stored as a dictionary listed by
+                meshes and grid locations.
         """
-        if mesh in self._Ps:
-            return self._Ps[mesh]
-
         if projGLoc is None:
             projGLoc = self.projGLoc
 
+        if (mesh, projGLoc) in self._Ps:
+            return self._Ps[(mesh, projGLoc)]
+
         P = mesh.getInterpolationMat(self.locs, projGLoc)
         if self.storeProjections:
-            self._Ps[mesh] = P
+            self._Ps[(mesh, projGLoc)] = P
         return P
 
 
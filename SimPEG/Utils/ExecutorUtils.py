@@ -0,0 +1,93 @@
+from __future__ import print_function
+import uuid
+from multiprocessing.pool import Pool
+
+# Copies of the problems held by the workers of a ProblemPool, by pool key
+_workerProblems = {}
+
+
+def _initWorker(key, prob):
+    _workerProblems[key] = prob
+
+
+class ProblemPool(Pool):
+    """
+    Process pool whose workers each keep their own copy of a problem, and
+    so its cached factorizations, between the calls of the problem.
+
+    ::
+
+        prob.pair(survey)
+        prob.executor = ExecutorUtils.ProblemPool(prob, processes=4)
+
+    The problem is copied to the workers once, when the pool starts. The
+    tasks then only carry the model and the vectors of the call: a worker
+    updates the model of its copy, which keeps its factorizations while the
+    model is unchanged, and solves its own fields rather than receiving
+    them. Create the pool once the problem is set up, a change to the
+    problem other than its model is not seen by the workers.
+    """
+
+    def __init__(self, prob, processes=None):
+        self.prob = prob
+        self.key = uuid.uuid4().hex
+        Pool.__init__(self, processes, _initWorker, (self.key, prob))
+
+
+class ProblemTask(object):
+    """
+    Evaluates method(index, \*args, \*\*kwargs) of a problem, as a function
+    of the index that an executor maps. A module level class, so that it
+    can be sent to the workers of a process pool.
+
+    Sent to a :class:`ProblemPool` of the problem, the task holds the model
+    instead of the problem, and the fields (keyword f) are left out: the
+    method then gets f=None and solves the fields it needs in the worker.
+    Sent to any other process pool, the task holds a copy of the problem,
+    without its cached factorizations.
+    """
+
+    def __init__(self, prob, method, args=(), kwargs=None):
+        self.prob = prob
+        self.method = method
+        self.args = args
+        self.kwargs = {} if kwargs is None else kwargs
+
+        executor = getattr(prob, 'executor', None)
+        if isinstance(executor, ProblemPool) and executor.prob is prob:
+            self.key = executor.key
+        else:
+            self.key = None
+
+    def __call__(self, index):
+        return getattr(self.prob, self.method)(
+            index, *self.args, **self.kwargs
+        )
+
+    def __getstate__(self):
+        if self.key is None:
+            return self.__dict__
+
+        kwargs = dict(self.kwargs)
+        if 'f' in kwargs:
+            kwargs['f'] = None
+        return {
+            'key': self.key, 'model': self.prob.model, 'method': self.method,
+            'args': self.args, 'kwargs': kwargs
+        }
+
+    def __setstate__(self, state):
+        if state['key'] is None:
+            self.__dict__.update(state)
+            return
+
+        # The copy of the worker keeps its factorizations if the model is
+        # unchanged
+        prob = _workerProblems[state.pop('key')]
+        model = state.pop('model')
+        if model is not None:
+            prob.model = model
+
+        self.__dict__.update(state)
+        self.prob = prob
+        self.key = None
@@ -1,4 +1,7 @@
 from __future__ import print_function
+from collections import OrderedDict
+import threading
+import copy
 import numpy as np, scipy.sparse as sp
 from .matutils import mkvc
 import warnings
@@ -14,15 +17,17 @@ def _checkAccuracy(A, b, X, accuracyTol):
         warnings.warn(msg, RuntimeWarning)
 
 
-def SolverWrapD(fun, factorize=True, checkAccuracy=True, accuracyTol=1e-6, name=None):
+def SolverWrapD(fun, factorize=True, checkAccuracy=True, accuracyTol=1e-6, name=None, transposable=False):
     """
     Wraps a direct Solver.
 
     ::
 
         Solver   = SolverUtils.SolverWrapD(sp.linalg.spsolve, factorize=False)
-        SolverLU = SolverUtils.SolverWrapD(sp.linalg.splu, factorize=True)
+        SolverLU = SolverUtils.SolverWrapD(sp.linalg.splu, factorize=True, transposable=True)
 
+    If transposable, the solve method of the factorization takes a trans
+    argument, and Ainv.T solves A^T with the same factors.
     """
 
     def __init__(self, A, **kwargs):
@@ -38,6 +43,13 @@ def SolverWrapD(fun, factorize=True, checkAccuracy=True, accuracyTol=1e-6, name=
         if factorize:
             self.solver = fun(self.A, **kwargs)
 
+        self._trans = 'N'
+
+    def _solve(self, b, **kwargs):
+        if self._trans != 'N':
+            kwargs['trans'] = self._trans
+        return self.solver.solve(b, **kwargs)
+
     def __mul__(self, b):
         if type(b) is not np.ndarray:
             raise TypeError('Can only multiply by a numpy array.')
@@ -50,19 +62,19 @@ def SolverWrapD(fun, factorize=True, checkAccuracy=True, accuracyTol=1e-6, name=
                 b = b.astype(type(b[0]))
 
             if factorize:
-                X = self.solver.solve(b, **self.kwargs)
+                X = self._solve(b, **self.kwargs)
             else:
                 X = fun(self.A, b, **self.kwargs)
         else: # Multiple RHSs
             if b.dtype is np.dtype('O'):
                 b = b.astype(type(b[0,0]))
 
-            X = np.empty_like(b)
-
-            for i in range(b.shape[1]):
-                if factorize:
-                    X[:,i] = self.solver.solve(b[:,i])
-                else:
+            if factorize:
+                # all the columns go through the triangular solves together
+                X = self._solve(b)
+            else:
+                X = np.empty_like(b)
+                for i in range(b.shape[1]):
                     X[:,i] = fun(self.A, b[:,i], **self.kwargs)
 
         if self.checkAccuracy:
@@ -73,7 +85,16 @@ def SolverWrapD(fun, factorize=True, checkAccuracy=True, accuracyTol=1e-6, name=
         if factorize and hasattr(self.solver, 'clean'):
             return self.solver.clean()
 
-    return type(name if name is not None else fun.__name__, (object,), {"__init__": __init__, "clean": clean, "__mul__": __mul__})
+    def T(self):
+        """Solver of A^T, with the factors of A"""
+        if not (factorize and transposable):
+            raise AttributeError('The factorization cannot solve A^T.')
+        ATinv = copy.copy(self)
+        ATinv.A = self.A.T.tocsc()
+        ATinv._trans = 'T' if self._trans == 'N' else 'N'
+        return ATinv
+
+    return type(name if name is not None else fun.__name__, (object,), {"__init__": __init__, "_solve": _solve, "clean": clean, "__mul__": __mul__, "T": property(T)})
 
 
 
@@ -134,7 +155,7 @@ def SolverWrapI(fun, checkAccuracy=True, accuracyTol=1e-5, name=None):
 
 from scipy.sparse import linalg
 Solver   = SolverWrapD(linalg.spsolve, factorize=False, name="Solver")
-SolverLU = SolverWrapD(linalg.splu, factorize=True, name="SolverLU")
+SolverLU = SolverWrapD(linalg.splu, factorize=True, name="SolverLU", transposable=True)
 SolverCG = SolverWrapI(linalg.cg, name="SolverCG")
 SolverBiCG = SolverWrapI(linalg.bicgstab, name="SolverBiCG")
 
@@ -169,3 +190,106 @@ class SolverDiag(object):
 
     def clean(self):
         pass
+
+
+class SolverCache(object):
+    """
+    Least recently used cache of factorized solvers.
+
+    ::
+
+        cache = SolverUtils.SolverCache(maxMemory=2.)
+        Ainv = cache.get(key)
+        if Ainv is None:
+            Ainv = cache.add(key, Solver(A), A)
+
+    Solvers are evicted from the least recently used, once the memory held
+    by the cache exceeds maxMemory (GB). The most recent solver is always
+    kept. The memory of a factorization is read from its L and U factors
+    when the solver exposes them (SolverLU), and estimated as ten times the
+    size of A otherwise.
+
+    The cache can be shared by threads. An evicted solver is not cleaned, as
+    another thread may still be solving with it: its factors are released by
+    the garbage collector once it is no longer used. Only :meth:`clean`
+    releases them explicitly.
+    """
+
+    def __init__(self, maxMemory=None):
+        self.maxMemory = maxMemory
+        self._solvers = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._solvers)
+
+    def __contains__(self, key):
+        return key in self._solvers
+
+    def get(self, key):
+        """Cached solver for key, or None"""
+        with self._lock:
+            if key not in self._solvers:
+                return None
+
+            # Move to the most recently used
+            Ainv, nbytes = self._solvers.pop(key)
+            self._solvers[key] = (Ainv, nbytes)
+
+        return Ainv
+
+    def add(self, key, Ainv, A=None):
+        """Add the solver Ainv (of the matrix A) for key, and return it"""
+        nbytes = _solverMemory(Ainv, A)
+
+        with self._lock:
+            # Replaced or evicted solvers are dropped, not cleaned
+            self._solvers.pop(key, None)
+
+            self._solvers[key] = (Ainv, nbytes)
+
+            if self.maxMemory is not None:
+                while (
+                    len(self._solvers) > 1 and
+                    self.memory > self.maxMemory * 1e+9
+                ):
+                    self._solvers.popitem(last=False)
+
+        return Ainv
+
+    @property
+    def memory(self):
+        """Memory (bytes) held by the cached solvers"""
+        return sum(nbytes for _, nbytes in self._solvers.values())
+
+    def clean(self):
+        """Clean and remove all the cached solvers"""
+        with self._lock:
+            while self._solvers:
+                self._solvers.popitem()[1][0].clean()
+
+    def __getstate__(self):
+        # Factorizations are not sent to other processes, which build their
+        # own in an empty cache
+        return {'maxMemory': self.maxMemory}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __del__(self):
+        self.clean()
+
+
+def _solverMemory(Ainv, A=None):
+    factors = getattr(Ainv, 'solver', None)
+
+    if hasattr(factors, 'L') and hasattr(factors, 'U'):
+        return sum(
+            M.data.nbytes + M.indices.nbytes + M.indptr.nbytes
+            for M in [factors.L, factors.U]
+        )
+
+    if A is not None and sp.issparse(A):
+        return 10 * A.data.nbytes
+
+    return 0
@@ -22,6 +22,7 @@ from .curvutils import volTetra, faceInfo, indexCube
 from .CounterUtils import Counter, count, timeIt
 from . import ModelBuilder
 from . import SolverUtils
+from . import ExecutorUtils
 from .coordutils import rotatePointsFromNormals, rotationMatrixFromNormals
 from .modelutils import surface2ind_topo
 from .PlotUtils import plot2Ddata, plotLayer
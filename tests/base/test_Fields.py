@@ -3,6 +3,7 @@ import unittest
 from SimPEG import Mesh, Problem, Fields, Survey, Utils
 import numpy as np
 import sys
+import tempfile
 
 np.random.seed(32)
 
@@ -425,5 +426,57 @@ class FieldsTest_Time_Aliased(unittest.TestCase):
         self.assertTrue(count[0] == 1)  # ensure that this is called only once.
 
 
+class FieldsTest_Time_Checkpoint(unittest.TestCase):
+
+    def setUp(self):
+        mesh = Mesh.TensorMesh([np.ones(n)*5 for n in [10, 11, 12]],
+                               [0, 0, -30])
+        srcList = [Survey.BaseSrc([], loc=np.r_[0, 0, 0.]) for i in range(3)]
+        survey = Survey.BaseSurvey(srcList=srcList)
+
+        class StepProblem(Problem.BaseTimeProblem):
+            def stepFields(self, tInd, u):
+                return 0.5*u + tInd
+
+        prob = StepProblem(mesh, timeSteps=[(10., 5), (20., 6)])
+        survey.pair(prob)
+        self.survey = survey
+        self.mesh = mesh
+
+    def getFields(self, **kwargs):
+        F = Problem.TimeFields(self.mesh, self.survey,
+                               knownFields={'phi': 'CC'}, **kwargs)
+        prob = self.survey.prob
+        F[:, 'phi', 0] = np.random.rand(self.mesh.nC, self.survey.nSrc)
+        for tInd in range(prob.nT):
+            F[:, 'phi', tInd+1] = prob.stepFields(tInd, F[:, 'phi', tInd])
+        return F
+
+    def test_checkpoint(self):
+        np.random.seed(1)
+        F = self.getFields()
+        np.random.seed(1)
+        Fc = self.getFields(checkpointInterval=4)
+
+        self.assertTrue(Fc._fields['phi'].shape[2] == 3)
+
+        src = self.survey.srcList[1]
+        self.assertTrue(np.allclose(F[:, 'phi'], Fc[:, 'phi']))
+        self.assertTrue(np.allclose(F[src, 'phi'], Fc[src, 'phi']))
+        for tInd in reversed(range(self.survey.prob.nT + 1)):
+            self.assertTrue(
+                np.allclose(F[src, 'phi', tInd], Fc[src, 'phi', tInd])
+            )
+
+    def test_memmap(self):
+        np.random.seed(1)
+        F = self.getFields()
+        np.random.seed(1)
+        Fm = self.getFields(storageDir=tempfile.gettempdir())
+
+        self.assertTrue(isinstance(Fm._fields['phi'], np.memmap))
+        self.assertTrue(np.allclose(F[:, 'phi'], Fm[:, 'phi']))
+
+
 if __name__ == '__main__':
     unittest.main()
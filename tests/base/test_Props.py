@@ -184,6 +184,38 @@ class TestPropMaps(unittest.TestCase):
         PM = pickle.loads(pickle.dumps(PM))
         assert isinstance(PM.sigmaDeriv.todense(), np.ndarray)
 
+    def test_model_cache(self):
+        mesh = Mesh.TensorMesh((3,))
+
+        PM = ReciprocalMappingExample(sigmaMap=Maps.ExpMap(mesh))
+        PM.model = np.r_[1., 2., 3.]
+
+        # computed once per model
+        assert PM.sigma is PM.sigma
+        assert PM.rho is PM.rho
+        assert PM.sigmaDeriv is PM.sigmaDeriv
+        assert PM.rhoDeriv is PM.rhoDeriv
+        self.assertRaises(ValueError, PM.sigma.__setitem__, 0, 1.)
+
+        # a new model
+        sigmaDeriv = PM.sigmaDeriv
+        PM.model = np.r_[3., 2., 1.]
+        assert PM.sigmaDeriv is not sigmaDeriv
+        assert np.all(PM.sigma == np.exp(np.r_[3., 2., 1.]))
+        assert np.allclose(PM.rho, 1./np.exp(np.r_[3., 2., 1.]))
+
+        # a new mapping
+        PM.sigmaMap = Maps.IdentityMap(mesh)
+        assert np.all(PM.sigma == np.r_[3., 2., 1.])
+        assert np.all(PM.sigmaDeriv.todense() == np.eye(3))
+
+        # the model itself stays writeable, edits in place are followed
+        sigma = PM.sigma
+        PM.model[0] = 0.
+        assert PM.model[0] == 0.
+        assert PM.sigma is not sigma
+        assert np.all(PM.sigma == np.r_[0., 2., 1.])
+
     def test_reciprocal_no_map(self):
         expMap = Maps.ExpMap(Mesh.TensorMesh((3,)))
 
@@ -1,4 +1,5 @@
 import unittest
+from multiprocessing.pool import ThreadPool
 from SimPEG import Mesh, Solver, SolverDiag, SolverCG, SolverLU, Utils
 from discretize import TensorMesh
 from SimPEG.Utils import sdiag
@@ -54,6 +55,89 @@ class TestSolver(unittest.TestCase):
     def test_iterative_cg_1(self): self.assertLess(dotest(SolverCG, False),TOLI)
     def test_iterative_cg_M(self): self.assertLess(dotest(SolverCG, True),TOLI)
 
+    def test_direct_splu_T(self):
+        A = sparse.rand(20, 20, 0.2) + 1j*sparse.rand(20, 20, 0.2)
+        A = (A + 5.*sparse.identity(20)).tocsc()
+        e = np.random.rand(20, numRHS)
+
+        # A^T solved with the factors of A
+        ATinv = SolverLU(A).T
+        self.assertLess(np.linalg.norm(e - ATinv * (A.T * e), np.inf), TOLD)
+        self.assertLess(
+            np.linalg.norm(e[:, 0] - ATinv * (A.T * e[:, 0]), np.inf), TOLD
+        )
+        self.assertLess(
+            np.linalg.norm(e - ATinv.T * (A * e), np.inf), TOLD
+        )
+
+        # not available without a factorization
+        self.assertFalse(hasattr(Solver(A), 'T'))
+
+
+class TestSolverCache(unittest.TestCase):
+
+    def test_lru(self):
+        A = Utils.sdiag(np.random.rand(100)+1.0)
+        nbytes = Utils.SolverUtils._solverMemory(SolverLU(A), A)
+
+        # Room for two factorizations
+        cache = Utils.SolverUtils.SolverCache(maxMemory=2.5*nbytes/1e+9)
+        for key in ['a', 'b']:
+            cache.add(key, SolverLU(A), A)
+
+        # 'a' is used again, 'b' is the least recently used
+        self.assertTrue(cache.get('a') is not None)
+        cache.add('c', SolverLU(A), A)
+
+        self.assertTrue('a' in cache and 'c' in cache)
+        self.assertFalse('b' in cache)
+        self.assertTrue(cache.get('b') is None)
+
+        cache.clean()
+        self.assertEqual(len(cache), 0)
+
+    def test_evicted_in_use(self):
+        A = Utils.sdiag(np.random.rand(100)+1.0)
+        b = np.random.rand(100)
+
+        # Room for a single factorization
+        cache = Utils.SolverUtils.SolverCache(maxMemory=1e-12)
+
+        # A solver still used after its eviction is not cleaned
+        Ainv = cache.add('a', CleanedSolverLU(A), A)
+        cache.add('b', CleanedSolverLU(A), A)
+        self.assertFalse('a' in cache)
+        self.assertTrue(np.allclose(A * (Ainv * b), b))
+
+        # nor when its key is added again
+        Ainv = cache.get('b')
+        cache.add('b', CleanedSolverLU(A), A)
+        self.assertTrue(np.allclose(A * (Ainv * b), b))
+
+        # Threads solving while the others evict their solvers
+        def solve(i):
+            key = i % 5
+            Ainv = cache.get(key)
+            if Ainv is None:
+                Ainv = cache.add(key, CleanedSolverLU(A*(key+1.)), A)
+            for _ in range(10):
+                x = Ainv * b
+            return np.allclose((key+1.)*(A * x), b)
+
+        pool = ThreadPool(4)
+        self.assertTrue(all(pool.map(solve, range(100))))
+        pool.close()
+        pool.join()
+
+        cache.clean()
+        self.assertEqual(len(cache), 0)
+
+
+class CleanedSolverLU(SolverLU):
+    """SolverLU whose factors are freed by clean"""
+
+    def clean(self):
+        self.solver = None
 
 
 if __name__ == '__main__':
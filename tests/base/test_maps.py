@@ -200,6 +200,34 @@ class MapTests(unittest.TestCase):
         self.assertRaises(ValueError, lambda: expMap * actMap * vertMap)
         self.assertRaises(ValueError, lambda: actMap * vertMap * expMap)
 
+    def test_comboDerivAdjoint(self):
+        M = Mesh.TensorMesh([2, 4], '0C')
+        actMap = Maps.InjectActiveCells(M, M.vectorCCy <= 0, 10, nC=M.nCy)
+        combo = (
+            Maps.ReciprocalMap(M) * Maps.ExpMap(M) *
+            Maps.SurjectVertical1D(M) * actMap
+        )
+        m = np.r_[1., 2.]
+        v = np.random.rand(2)
+        w = np.random.rand(M.nC)
+
+        # the product is formed once per model
+        D = combo.deriv(m)
+        self.assertTrue(combo.deriv(m) is D)
+        self.assertFalse(combo.deriv(m + 1.) is D)
+
+        # matrix-free products
+        self.assertLess(
+            np.linalg.norm(combo.deriv(m, v) - D * v), TOL
+        )
+        self.assertLess(
+            np.linalg.norm(combo.deriv_adjoint(m, w) - D.T * w), TOL
+        )
+        w = np.random.rand(actMap.shape[0])
+        self.assertLess(
+            np.linalg.norm(actMap.deriv_adjoint(m, w) - actMap.P.T * w), TOL
+        )
+
     def test_map2Dto3D_x(self):
         M2 = Mesh.TensorMesh([2, 4])
         M3 = Mesh.TensorMesh([3, 2, 4])
@@ -0,0 +1,105 @@
+import unittest
+import numpy as np
+from multiprocessing.pool import ThreadPool
+
+from SimPEG import EM, Mesh, Maps, Utils
+
+
+def nWorkerFactors(key):
+    # factorizations kept by the copy of the problem in a worker
+    prob = Utils.ExecutorUtils._workerProblems[key]
+    return len(getattr(prob, '_Ainv', None) or [])
+
+
+class FDEM_Executor(unittest.TestCase):
+
+    def setUp(self):
+        cs = 10.
+        h = [(cs, 6, -1.3), (cs, 4), (cs, 6, 1.3)]
+        mesh = Mesh.TensorMesh([h, h, h], 'CCC')
+
+        x = np.linspace(-2.*cs, 2.*cs, 3) + cs/4.
+        XYZ = Utils.ndgrid(x, x, np.r_[0.])
+
+        srcList = []
+        for freq in [1e1, 1e2, 1e3]:
+            rxList = [
+                EM.FDEM.Rx.Point_e(XYZ, 'x', 'real'),
+                EM.FDEM.Rx.Point_e(XYZ, 'x', 'imag')
+            ]
+            srcList.append(
+                EM.FDEM.Src.MagDipole(rxList, freq=freq, loc=np.r_[0., 0., 0.])
+            )
+
+        self.survey = EM.FDEM.Survey(srcList)
+        self.prob = EM.FDEM.Problem3D_e(mesh, sigmaMap=Maps.ExpMap(mesh))
+        self.prob.pair(self.survey)
+
+        self.m = np.log(1e-2)*np.ones(mesh.nC)
+
+    def test_executor(self):
+        v = np.random.rand(self.prob.mesh.nC)
+        w = np.random.rand(self.survey.nD)
+
+        # Solved in turn
+        f = self.prob.fields(self.m)
+        d = self.survey.dpred(self.m, f=f)
+        Jv = self.prob.Jvec(self.m, v, f=f)
+        Jtw = self.prob.Jtvec(self.m, w, f=f)
+
+        # Frequencies spread over threads
+        pool = ThreadPool(3)
+        self.prob.executor = pool
+        del self.prob._Ainv
+
+        f_pool = self.prob.fields(self.m)
+        self.assertTrue(
+            np.allclose(d, self.survey.dpred(self.m, f=f_pool))
+        )
+        self.assertTrue(np.allclose(Jv, self.prob.Jvec(self.m, v, f=f_pool)))
+        self.assertTrue(
+            np.allclose(Jtw, self.prob.Jtvec(self.m, w, f=f_pool))
+        )
+
+        pool.close()
+        pool.join()
+
+    def test_problemPool(self):
+        v = np.random.rand(self.prob.mesh.nC)
+        w = np.random.rand(self.survey.nD)
+
+        f = self.prob.fields(self.m)
+        d = self.survey.dpred(self.m, f=f)
+        Jv = self.prob.Jvec(self.m, v, f=f)
+        Jtw = self.prob.Jtvec(self.m, w, f=f)
+
+        # A single worker, which gets all the frequencies
+        pool = Utils.ExecutorUtils.ProblemPool(self.prob, processes=1)
+        self.prob.executor = pool
+
+        f_pool = self.prob.fields(self.m)
+        self.assertTrue(
+            np.allclose(d, self.survey.dpred(self.m, f=f_pool))
+        )
+        self.assertTrue(np.allclose(Jv, self.prob.Jvec(self.m, v, f=f_pool)))
+        self.assertTrue(
+            np.allclose(Jtw, self.prob.Jtvec(self.m, w, f=f_pool))
+        )
+
+        # the worker factored each frequency once, A is symmetric
+        self.assertEqual(pool.map(nWorkerFactors, [pool.key]), [3])
+
+        # and factors them again for a new model
+        m = self.m + 1.
+        self.prob.executor = None
+        Jv = self.prob.Jvec(m, v)
+        self.prob.executor = pool
+        self.assertTrue(np.allclose(Jv, self.prob.Jvec(m, v)))
+        self.assertEqual(pool.map(nWorkerFactors, [pool.key]), [3])
+
+        pool.close()
+        pool.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
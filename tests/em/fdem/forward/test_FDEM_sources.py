@@ -307,6 +307,24 @@ class TestSimpleSourcePropertiesTensor(unittest.TestCase):
                                     loc=self.loc, orientation='Z', mu=50.*mu_0)
         assert self.bPrimaryTest(src, 'j')
 
+    def test_bPrimaryShared(self):
+        srcs = [
+            FDEM.Src.MagDipole([], freq=freq, loc=self.loc, orientation='Z')
+            for freq in [1., 10.]
+        ]
+        bp = [src.bPrimary(self.prob_e) for src in srcs]
+        self.assertTrue(bp[0] is bp[1])
+        self.assertFalse(bp[0].flags.writeable)
+        self.assertEqual(len(self.prob_e.primaryFieldCache), 1)
+
+        # the source term only differs by -i omega
+        s_m = [src.s_m(self.prob_e) for src in srcs]
+        self.assertTrue(np.allclose(10.*s_m[0], s_m[1]))
+
+        loop = FDEM.Src.CircularLoop([], freq=1., loc=self.loc,
+                                     orientation='Z')
+        self.assertFalse(loop.bPrimary(self.prob_e) is bp[0])
+
 
 
 
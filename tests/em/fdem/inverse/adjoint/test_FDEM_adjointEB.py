@@ -1,7 +1,7 @@
 from __future__ import print_function
 import unittest
 import numpy as np
-from SimPEG import EM
+from SimPEG import EM, SolverLU
 from scipy.constants import mu_0
 from SimPEG.EM.Utils.testingUtils import getFDEMProblem
 
@@ -46,6 +46,11 @@ def adjointTest(fdemType, comp):
     print(vJw, wJtv, vJw - wJtv, tol, np.abs(vJw - wJtv) < tol)
     return np.abs(vJw - wJtv) < tol
 
+class Problem3D_b_unsymmetric(EM.FDEM.Problem3D_b):
+    # A without the symmetric scaling
+    _makeASymmetric = False
+
+
 class FDEM_AdjointTests(unittest.TestCase):
     if testE:
         def test_Jtvec_adjointTest_exr_Eform(self):
@@ -154,5 +159,32 @@ class FDEM_AdjointTests(unittest.TestCase):
             self.assertTrue(adjointTest('b', 'hzi'))
 
 
+class FDEM_TransposedFactorsTests(unittest.TestCase):
+
+    def test_Jtvec_adjointTest_unsymmetric(self):
+        prb = getFDEMProblem('b', 'bzr', SrcList, freq)
+        survey = prb.survey
+        survey.unpair()
+
+        prb = Problem3D_b_unsymmetric(prb.mesh, sigmaMap=prb.sigmaMap)
+        prb.Solver = SolverLU
+        prb.pair(survey)
+
+        m = np.log(np.ones(prb.sigmaMap.nP)*CONDUCTIVITY)
+        u = prb.fields(m)
+
+        v = np.random.rand(survey.nD)
+        w = np.random.rand(prb.mesh.nC)
+
+        vJw = v.dot(prb.Jvec(m, w, u))
+        wJtv = w.dot(prb.Jtvec(m, v, u))
+        tol = np.max([TOL*(10**int(np.log10(np.abs(vJw)))), FLR])
+        self.assertTrue(np.abs(vJw - wJtv) < tol)
+
+        # A^T is solved with the LU factors of A
+        self.assertFalse(prb._AisSymmetric)
+        self.assertEqual(len(prb._Ainv), 1)
+
+
 if __name__ == '__main__':
     unittest.main()
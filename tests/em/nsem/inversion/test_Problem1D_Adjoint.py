@@ -39,6 +39,8 @@ def JvecAdjointTest(sigmaHalf, formulation='PrimSec'):
     tol = np.max([TOL*(10**int(np.log10(np.abs(vJw)))),FLR])
     print(' vJw   wJtv  vJw - wJtv     tol    abs(vJw - wJtv) < tol')
     print(vJw, wJtv, vJw - wJtv, tol, np.abs(vJw - wJtv) < tol)
+    # A is symmetric, Jtvec reuses the factorization of each frequency
+    assert len(problem._Ainv) == len(survey.freqs)
     return np.abs(vJw - wJtv) < tol
 
 
@@ -30,6 +30,7 @@ class DCProblemAnalyticTests_PDP(unittest.TestCase):
         survey = DC.Survey_ky([src0])
 
         self.survey = survey
+        self.M, self.N, self.A0loc = M, N, A0loc
         self.mesh = mesh
         self.sigma = sigma
         self.data_anal = data_anal
@@ -75,6 +76,30 @@ class DCProblemAnalyticTests_PDP(unittest.TestCase):
             print(">> DC analytic test for Problem3D_CC is failed")
         self.assertTrue(passed)
 
+    def test_Problem2D_optimizedKys(self):
+        for Problem in [DC.Problem2D_N, DC.Problem2D_CC]:
+            problem = Problem(
+                self.mesh, sigma=self.sigma, kyQuadrature='optimized', nky=6
+            )
+            problem.Solver = self.Solver
+            # a new survey, the receivers keep the projection of a problem
+            rx = DC.Rx.Dipole_ky(self.M, self.N)
+            survey = DC.Survey_ky([DC.Src.Pole([rx], self.A0loc)])
+            problem.pair(survey)
+            data = survey.dpred()
+            self.assertEqual(problem.kys.size, 6)
+            err = (
+                np.linalg.norm((data-self.data_anal)/self.data_anal)**2 /
+                self.data_anal.size
+            )
+            print(
+                ">> DC analytic test for {} with 6 optimized ky: {:e}".format(
+                    Problem.__name__, err
+                )
+            )
+            self.assertTrue(err < 0.05)
+
+
 # This does not work well.
 class DCProblemAnalyticTests_DPP(unittest.TestCase):
 
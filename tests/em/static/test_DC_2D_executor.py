@@ -0,0 +1,101 @@
+import unittest
+import numpy as np
+from multiprocessing.pool import ThreadPool
+
+from SimPEG import Mesh, Maps, Utils
+import SimPEG.EM.Static.DC as DC
+
+
+def nWorkerFactors(key):
+    # factorizations kept by the copy of the problem in a worker
+    prob = Utils.ExecutorUtils._workerProblems[key]
+    return len(getattr(prob, '_Ainv', None) or [])
+
+
+class DC_2D_Executor(unittest.TestCase):
+
+    def setUp(self):
+        cs = 12.5
+        hx = [(cs, 7, -1.3), (cs, 41), (cs, 7, 1.3)]
+        hy = [(cs, 7, -1.3), (cs, 20)]
+        self.mesh = Mesh.TensorMesh([hx, hy], x0="CN")
+
+        self.m = np.log(1e-2)*np.ones(self.mesh.nC)
+
+    def get_survey(self):
+        # receivers keep their projections, one survey per problem
+        x = np.linspace(-135, 250., 20)
+        M = Utils.ndgrid(x-12.5, np.r_[0.])
+        N = Utils.ndgrid(x+12.5, np.r_[0.])
+        rx = DC.Rx.Dipole_ky(M, N)
+        src0 = DC.Src.Pole([rx], np.r_[-150, 0.])
+        src1 = DC.Src.Pole([rx], np.r_[-130, 0.])
+        return DC.Survey_ky([src0, src1])
+
+    def test_executor(self):
+        for Problem in [DC.Problem2D_CC, DC.Problem2D_N]:
+            prob = Problem(self.mesh, sigmaMap=Maps.ExpMap(self.mesh))
+            survey = self.get_survey()
+            prob.pair(survey)
+
+            v = np.random.rand(len(self.m))
+            w = np.random.rand(survey.nD)
+
+            # Wavenumbers solved in turn, one factorization each
+            f = prob.fields(self.m)
+            self.assertEqual(len(prob._Ainv), prob.nky)
+            d = survey.dpred(self.m, f=f)
+            Jv = prob.Jvec(self.m, v, f=f)
+            Jtw = prob.Jtvec(self.m, w, f=f)
+            self.assertEqual(len(prob._Ainv), prob.nky)
+
+            # Wavenumbers spread over threads
+            pool = ThreadPool(4)
+            prob.executor = pool
+            del prob._Ainv
+
+            f_pool = prob.fields(self.m)
+            self.assertTrue(
+                np.allclose(d, survey.dpred(self.m, f=f_pool))
+            )
+            self.assertTrue(np.allclose(Jv, prob.Jvec(self.m, v, f=f_pool)))
+            self.assertTrue(np.allclose(Jtw, prob.Jtvec(self.m, w, f=f_pool)))
+
+            pool.close()
+            pool.join()
+
+            # the factorizations belong to the instance
+            self.assertFalse(hasattr(Problem, '_Ainv'))
+
+    def test_problemPool(self):
+        for Problem in [DC.Problem2D_CC, DC.Problem2D_N]:
+            prob = Problem(self.mesh, sigmaMap=Maps.ExpMap(self.mesh))
+            survey = self.get_survey()
+            prob.pair(survey)
+
+            v = np.random.rand(len(self.m))
+            w = np.random.rand(survey.nD)
+
+            f = prob.fields(self.m)
+            d = survey.dpred(self.m, f=f)
+            Jv = prob.Jvec(self.m, v, f=f)
+            Jtw = prob.Jtvec(self.m, w, f=f)
+
+            # A single worker, which gets all the wavenumbers
+            pool = Utils.ExecutorUtils.ProblemPool(prob, processes=1)
+            prob.executor = pool
+
+            f_pool = prob.fields(self.m)
+            self.assertTrue(np.allclose(d, survey.dpred(self.m, f=f_pool)))
+            self.assertTrue(np.allclose(Jv, prob.Jvec(self.m, v, f=f_pool)))
+            self.assertTrue(np.allclose(Jtw, prob.Jtvec(self.m, w, f=f_pool)))
+
+            # the worker factored each wavenumber once, for all three calls
+            self.assertEqual(pool.map(nWorkerFactors, [pool.key]), [prob.nky])
+
+            pool.close()
+            pool.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+from __future__ import print_function
+import unittest
+import numpy as np
+from SimPEG import Mesh, Maps
+import SimPEG.EM.Static.DC as DC
+
+
+class DCElectrodeTests(unittest.TestCase):
+
+    def setUp(self):
+
+        self.aSpacing = aSpacing = 2.5
+        self.nElecs = nElecs = 10
+
+        surveySize = nElecs*aSpacing - aSpacing
+        cs = surveySize / nElecs / 4
+
+        self.mesh = Mesh.TensorMesh([
+            [(cs, 10, -1.3), (cs, surveySize / cs), (cs, 10, 1.3)],
+            [(cs, 3, -1.3), (cs, 3, 1.3)],
+        ], 'CN')
+        self.m = np.ones(self.mesh.nC)
+
+    def get_wenner(self):
+        # Wenner array, more sources than current electrodes
+        return DC.Utils.WennerSrcList(self.nElecs, self.aSpacing, in2D=True)
+
+    def get_poles(self):
+        # Pole sources along the line and a few dipoles, fewer potential
+        # electrodes than current electrodes
+        x = np.linspace(-10., 10., 3)
+        M = np.c_[x - self.aSpacing/2., np.zeros(3)]
+        N = np.c_[x + self.aSpacing/2., np.zeros(3)]
+        rx = DC.Rx.Dipole(M, N)
+        return [
+            DC.Src.Pole([rx], np.r_[xA, 0.])
+            for xA in np.linspace(-11., 11., 9)
+        ]
+
+    def test_getElectrodes(self):
+        wenner = self.get_wenner()
+        survey = DC.Survey(wenner)
+
+        locs, C = survey.getSrcElectrodes()
+        self.assertEqual(C.shape, (locs.shape[0], len(wenner)))
+        self.assertTrue(locs.shape[0] <= 10)
+        self.assertTrue(np.allclose(C.sum(axis=0), 0.))
+
+        locs, R = survey.getRxElectrodes()
+        self.assertEqual(R.shape, (survey.nD, locs.shape[0]))
+        self.assertTrue(np.allclose(R.sum(axis=1), 0.))
+
+        survey = DC.Survey(self.get_poles())
+        locs, R = survey.getRxElectrodes()
+        self.assertEqual(locs.shape[0], 6)
+
+    def test_superposition(self):
+        for getSrcList in [self.get_wenner, self.get_poles]:
+            for Problem in [DC.Problem3D_CC, DC.Problem3D_N]:
+                # new receivers, they keep the projection of a problem
+                survey = DC.Survey(getSrcList())
+                prob = Problem(self.mesh, rhoMap=Maps.IdentityMap(self.mesh))
+                prob.pair(survey)
+                d = survey.dpred(self.m)
+
+                prob.solveElectrodes = True
+                # reciprocity for the poles, superposition for Wenner
+                self.assertTrue(np.allclose(survey.dpred(self.m), d))
+                # the fields of the sources, superposed from the electrodes
+                f = prob.fields(self.m)
+                self.assertTrue(np.allclose(survey.dpred(self.m, f=f), d))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -80,6 +80,21 @@ class IPProblemTestsCC(unittest.TestCase):
         print('Adjoint Test', np.abs(wtJv - vtJtw), passed)
         self.assertTrue(passed)
 
+    def test_storeJ(self):
+        v = np.random.rand(self.mesh.nC)
+        w = np.random.rand(self.survey.nD)
+        Jv = self.p.Jvec(self.m0, v)
+        Jtw = self.p.Jtvec(self.m0, w)
+
+        self.p.storeJ = True
+        J = self.p.getJ(self.m0)
+        self.assertEqual(J.shape, (self.survey.nD, self.mesh.nC))
+        self.assertTrue(np.allclose(self.p.Jvec(self.m0, v), Jv))
+        self.assertTrue(np.allclose(self.p.Jtvec(self.m0, w), Jtw))
+        self.assertTrue(
+            np.allclose(self.p.getJtJdiag(self.m0), np.sum(J**2, axis=0))
+        )
+
     def test_dataObj(self):
         passed = Tests.checkDerivative(
             lambda m: [self.dmis(m), self.dmis.deriv(m)],
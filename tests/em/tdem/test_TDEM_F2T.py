@@ -0,0 +1,138 @@
+from __future__ import division, print_function
+import unittest
+import numpy as np
+from scipy.constants import mu_0
+
+from SimPEG import Mesh, Maps, EM, Tests
+
+
+def get_prob(rxList, fdemProblem=EM.FDEM.Problem3D_b, rxList2=None):
+    cs, ncx, ncz, npad = 5., 30, 10, 15
+    hx = [(cs, ncx), (cs, npad, 1.3)]
+    hz = [(cs, npad, -1.3), (cs, ncz), (cs, npad, 1.3)]
+    mesh = Mesh.CylMesh([hx, 1, hz], '00C')
+
+    active = mesh.vectorCCz < 0.
+    actMap = Maps.InjectActiveCells(mesh, active, np.log(1e-8), nC=mesh.nCz)
+    mapping = Maps.ExpMap(mesh) * Maps.SurjectVertical1D(mesh) * actMap
+
+    src = EM.TDEM.Src.MagDipole(
+        rxList, waveform=EM.TDEM.Src.StepOffWaveform(),
+        loc=np.array([0., 0., 0.])
+    )
+    srcList = [src]
+    if rxList2 is not None:
+        srcList.append(EM.TDEM.Src.MagDipole(
+            rxList2, waveform=EM.TDEM.Src.StepOffWaveform(),
+            loc=np.array([0., 0., 0.]), moment=2.
+        ))
+    survey = EM.TDEM.Survey_F2T(srcList)
+
+    prob = EM.TDEM.Problem3D_F2T(
+        mesh, fdemProblem=fdemProblem, sigmaMap=mapping
+    )
+    prob.pair(survey)
+
+    m = np.log(1e-2)*np.ones(active.sum())
+    return prob, survey, m
+
+
+class TDEM_Transform(unittest.TestCase):
+
+    def test_halfspace(self):
+        # filter of the frequency domain halfspace response
+        r, sigma = 50., 1e-2
+        times = np.logspace(-5, -3, 21)
+        freqs = EM.Utils.stepOffFrequencies(times)
+        hz = EM.Analytics.hzAnalyticDipoleF(r, freqs, sigma).flatten()
+        hz_ana = EM.Analytics.hzAnalyticDipoleT(r, times, sigma)
+
+        T = EM.Utils.stepOffTransform(freqs, times, 'cos')
+        err = np.linalg.norm(T.dot(hz.imag) - hz_ana)/np.linalg.norm(hz_ana)
+        print('transform: {:e}'.format(err))
+        self.assertTrue(err < 1e-2)
+
+
+class TDEM_F2T(unittest.TestCase):
+
+    def test_analytic_CYL_50_MagDipole(self):
+        rx = EM.TDEM.Rx.Point_b(
+            np.array([[50., 0., 0.]]), np.logspace(-5, -4, 21), 'z'
+        )
+        prob, survey, m = get_prob([rx])
+
+        bz_calc = survey.dpred(m)
+        bz_ana = mu_0*EM.Analytics.hzAnalyticDipoleT(
+            rx.locs[0][0]+1e-3, rx.times, 1e-2
+        )
+        log10diff = (
+            np.linalg.norm(np.log10(np.abs(bz_calc)) -
+                           np.log10(np.abs(bz_ana))) /
+            np.linalg.norm(np.log10(np.abs(bz_ana)))
+        )
+        print('Difference: {}'.format(log10diff))
+        self.assertTrue(log10diff < 0.02)
+
+    def test_Jvec_adjoint(self):
+        rxList = [
+            EM.TDEM.Rx.Point_b(
+                np.array([[50., 0., 0.]]), np.logspace(-5, -3, 5), 'z'
+            ),
+            EM.TDEM.Rx.Point_dbdt(
+                np.array([[50., 0., 0.], [80., 0., 0.]]),
+                np.logspace(-5, -3, 5), 'z'
+            )
+        ]
+        prob, survey, m = get_prob(rxList)
+        f = prob.fields(m)
+
+        v = np.random.rand(len(m))
+        w = np.random.rand(survey.nD)
+        self.assertTrue(np.allclose(
+            w.dot(prob.Jvec(m, v, f=f)), v.dot(prob.Jtvec(m, w, f=f))
+        ))
+
+    def test_Jvec_adjoint_twoSources(self):
+        # the data of each source are filtered from its own FDEM data
+        rxList = [
+            EM.TDEM.Rx.Point_b(
+                np.array([[50., 0., 0.]]), np.logspace(-5, -3, 5), 'z'
+            )
+        ]
+        rxList2 = [
+            EM.TDEM.Rx.Point_dbdt(
+                np.array([[30., 0., 0.], [80., 0., 0.]]),
+                np.logspace(-5, -3, 4), 'z'
+            )
+        ]
+        prob, survey, m = get_prob(rxList, rxList2=rxList2)
+        f = prob.fields(m)
+
+        v = np.random.rand(len(m))
+        w = np.random.rand(survey.nD)
+        self.assertTrue(np.allclose(
+            w.dot(prob.Jvec(m, v, f=f)), v.dot(prob.Jtvec(m, w, f=f))
+        ))
+
+        def derChk(m):
+            return [survey.dpred(m), lambda mx: prob.Jvec(m, mx)]
+        print('test_Jvec F2T, two sources')
+        passed = Tests.checkDerivative(
+            derChk, m, plotIt=False, num=3, eps=1e-20
+        )
+        self.assertTrue(passed)
+
+    def test_Jvec(self):
+        rx = EM.TDEM.Rx.Point_dbdt(
+            np.array([[50., 0., 0.]]), np.logspace(-5, -3, 5), 'z'
+        )
+        prob, survey, m = get_prob([rx])
+
+        def derChk(m):
+            return [survey.dpred(m), lambda mx: prob.Jvec(m, mx)]
+        print('test_Jvec F2T')
+        Tests.checkDerivative(derChk, m, plotIt=False, num=3, eps=1e-20)
+
+
+if __name__ == '__main__':
+    unittest.main()
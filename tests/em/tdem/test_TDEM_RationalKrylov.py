@@ -0,0 +1,70 @@
+from __future__ import division, print_function
+import unittest
+import time
+import numpy as np
+
+from SimPEG import Mesh, Maps, EM
+
+TOL = 5e-2
+
+
+def get_prob(timeStepping, waveform=None):
+    if waveform is None:
+        waveform = EM.TDEM.Src.StepOffWaveform()
+
+    cs, ncx, ncz, npad = 5., 30, 10, 15
+    hx = [(cs, ncx), (cs, npad, 1.3)]
+    hz = [(cs, npad, -1.3), (cs, ncz), (cs, npad, 1.3)]
+    mesh = Mesh.CylMesh([hx, 1, hz], '00C')
+
+    active = mesh.vectorCCz < 0.
+    actMap = Maps.InjectActiveCells(mesh, active, np.log(1e-8), nC=mesh.nCz)
+    mapping = Maps.ExpMap(mesh) * Maps.SurjectVertical1D(mesh) * actMap
+
+    rx = EM.TDEM.Rx.Point_b(
+        np.array([[50., 0., 0.]]), np.logspace(-5, -3, 11), 'z'
+    )
+    src = EM.TDEM.Src.MagDipole(
+        [rx], waveform=waveform, loc=np.array([0., 0., 0.])
+    )
+    survey = EM.TDEM.Survey([src])
+
+    prob = EM.TDEM.Problem3D_b(mesh, sigmaMap=mapping)
+    prob.timeSteps = [(1e-06, 40), (5e-06, 40), (1e-05, 40), (5e-05, 40)]
+    prob.timeStepping = timeStepping
+    prob.pair(survey)
+
+    m = np.log(1e-2)*np.ones(active.sum())
+    return prob, survey, m
+
+
+class TDEM_RationalKrylov(unittest.TestCase):
+
+    def test_backward_euler(self):
+        data = {}
+        for timeStepping in ['BackwardEuler', 'RationalKrylov']:
+            prob, survey, m = get_prob(timeStepping)
+            t = time.time()
+            data[timeStepping] = survey.dpred(m)
+            print(
+                '{}: {:1.2f} s, {:d} factorizations'.format(
+                    timeStepping, time.time() - t, len(prob._AdiagInv)
+                )
+            )
+
+        err = (
+            np.linalg.norm(data['RationalKrylov'] - data['BackwardEuler']) /
+            np.linalg.norm(data['BackwardEuler'])
+        )
+        print('relative difference: {:e}'.format(err))
+        self.assertTrue(err < TOL)
+
+    def test_waveform(self):
+        prob, survey, m = get_prob(
+            'RationalKrylov', EM.TDEM.Src.RampOffWaveform(offTime=1e-5)
+        )
+        self.assertRaises(NotImplementedError, prob.fields, m)
+
+
+if __name__ == '__main__':
+    unittest.main()
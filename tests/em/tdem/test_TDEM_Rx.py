@@ -0,0 +1,56 @@
+from __future__ import division, print_function
+import unittest
+import numpy as np
+
+from SimPEG import Mesh, Maps, Utils, EM
+
+
+class TDEM_RxInterpolation(unittest.TestCase):
+
+    def setUp(self):
+        cs, nc, npad = 10., 4, 2
+        h = [(cs, npad, -1.5), (cs, nc), (cs, npad, 1.5)]
+        mesh = Mesh.TensorMesh([h, h, h], 'CCC')
+
+        times = np.r_[3e-5, 1.2e-4, 4e-4]
+        locs = np.array([[20., 0., 0.], [0., 20., 0.]])
+        self.rxList = [
+            EM.TDEM.Rx.Point_b(locs, times, 'z'),
+            EM.TDEM.Rx.Point_e(locs, times, 'y'),
+            EM.TDEM.Rx.Point_dbdt(locs, times, 'z')
+        ]
+        src = EM.TDEM.Src.MagDipole(self.rxList, loc=np.array([0., 0., 0.]))
+        self.survey = EM.TDEM.Survey([src])
+
+        self.prob = EM.TDEM.Problem3D_b(mesh, sigmaMap=Maps.ExpMap(mesh))
+        self.prob.timeSteps = [(1e-05, 10), (5e-05, 10)]
+        self.prob.pair(self.survey)
+
+        self.f = self.prob.fields(np.log(1e-1)*np.ones(mesh.nC))
+
+    def test_eval(self):
+        src = self.survey.srcList[0]
+        prob = self.prob
+        for rx in self.rxList:
+            P = rx.getP(prob.mesh, prob.timeMesh, self.f)
+            d = P * Utils.mkvc(self.f[src, rx.projField, :])
+            self.assertTrue(
+                np.allclose(d, rx.eval(src, prob.mesh, prob.timeMesh, self.f))
+            )
+
+            v = np.random.rand(P.shape[1])
+            w = np.random.rand(P.shape[0])
+            self.assertTrue(np.allclose(
+                P * v,
+                rx.evalDeriv(src, prob.mesh, prob.timeMesh, self.f, v)
+            ))
+            self.assertTrue(np.allclose(
+                P.T * w,
+                rx.evalDeriv(
+                    src, prob.mesh, prob.timeMesh, self.f, w, adjoint=True
+                )
+            ))
+
+
+if __name__ == '__main__':
+    unittest.main()
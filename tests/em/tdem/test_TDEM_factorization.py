@@ -0,0 +1,79 @@
+from __future__ import division, print_function
+import unittest
+import numpy as np
+
+from SimPEG import Mesh, Maps, EM
+
+
+class Problem3D_b_unsymmetric(EM.TDEM.Problem3D_b):
+    # A without the symmetric scaling
+    _makeASymmetric = False
+
+
+class TDEM_Factorization(unittest.TestCase):
+
+    def setUp(self):
+        cs, nc, npad = 10., 4, 2
+        h = [(cs, npad, -1.5), (cs, nc), (cs, npad, 1.5)]
+        mesh = Mesh.TensorMesh([h, h, h], 'CCC')
+
+        rx = EM.TDEM.Rx.Point_b(
+            np.array([[20., 0., 0.]]), np.logspace(-4, -3, 5), 'z'
+        )
+        src = EM.TDEM.Src.MagDipole([rx], loc=np.array([0., 0., 0.]))
+        self.survey = EM.TDEM.Survey([src])
+
+        self.mesh = mesh
+        self.prob = self.get_prob(EM.TDEM.Problem3D_b)
+
+        self.m = np.log(1e-1)*np.ones(mesh.nC)
+
+    def get_prob(self, Problem):
+        prob = Problem(self.mesh, sigmaMap=Maps.ExpMap(self.mesh))
+        prob.timeSteps = [(1e-05, 5), (5e-05, 5), (2.5e-4, 5)]
+        if self.survey.ispaired:
+            self.survey.unpair()
+        prob.pair(self.survey)
+        return prob
+
+    def test_shared_factors(self):
+        prob = self.prob
+        f = prob.fields(self.m)
+
+        # one factorization per distinct time step
+        self.assertEqual(len(prob._AdiagInv), 3)
+
+        v = np.random.rand(prob.mesh.nC)
+        w = np.random.rand(self.survey.nD)
+        Jv = prob.Jvec(self.m, v, f=f)
+        Jtw = prob.Jtvec(self.m, w, f=f)
+
+        # A is symmetric, so Jvec and Jtvec both reuse them
+        self.assertTrue(prob._AisSymmetric)
+        self.assertEqual(len(prob._AdiagInv), 3)
+
+        # adjoint test on the shared factors
+        self.assertTrue(np.allclose(w.dot(Jv), v.dot(Jtw)))
+
+        # a new model releases them
+        prob.model = self.m + 1.
+        self.assertFalse(hasattr(prob, '_AdiagInv'))
+        prob.fields(self.m + 1.)
+        self.assertEqual(len(prob._AdiagInv), 3)
+
+    def test_adjoint_factors(self):
+        # without the symmetric scaling, Jtvec factors A^T for every dt
+        prob = self.get_prob(Problem3D_b_unsymmetric)
+        self.assertFalse(prob._AisSymmetric)
+        f = prob.fields(self.m)
+
+        v = np.random.rand(prob.mesh.nC)
+        w = np.random.rand(self.survey.nD)
+        Jv = prob.Jvec(self.m, v, f=f)
+        Jtw = prob.Jtvec(self.m, w, f=f)
+        self.assertEqual(len(prob._AdiagInv), 6)
+        self.assertTrue(np.allclose(w.dot(Jv), v.dot(Jtw)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from SimPEG import Mesh, Utils, PF, Maps
 import numpy as np
+import scipy.sparse as sp
 
 
 class GravFwdProblemTests(unittest.TestCase):
@@ -82,6 +83,117 @@ class GravFwdProblemTests(unittest.TestCase):
 
         self.assertTrue(err_xyz < 0.005 and err_tmi < 0.005)
 
+    def test_parallel_forward(self):
+
+        # Rows of G computed in one process or spread over a pool
+        self.survey.pair(self.prob_z)
+        self.prob_z.forwardOnly = False
+        G_serial = self.prob_z.Intrgl_Fwr_Op('z')
+
+        self.prob_z.parallelized = True
+        self.prob_z.n_cpu = 2
+        G_parallel = self.prob_z.Intrgl_Fwr_Op('z')
+
+        self.assertTrue(np.allclose(G_serial, G_parallel, rtol=0., atol=0.))
+
+        # Same with the forward only operator
+        self.prob_z.forwardOnly = True
+        d = self.prob_z.fields(self.model)
+        self.assertTrue(np.allclose(d, G_serial.dot(self.model)))
+
+    def test_compressed_forward(self):
+
+        # Dense and compressed G
+        self.survey.pair(self.prob_xyz)
+        self.prob_xyz.forwardOnly = False
+        G = self.prob_xyz.Intrgl_Fwr_Op('xyz')
+
+        self.prob_xyz.compression = 1e-2
+        Gc = self.prob_xyz.Intrgl_Fwr_Op('xyz')
+
+        self.assertTrue(sp.issparse(Gc))
+        self.assertTrue(Gc.nnz < G.size)
+
+        # Each row is accurate to the tolerance
+        err = (np.linalg.norm(G - Gc.toarray(), axis=1) /
+               np.linalg.norm(G, axis=1))
+        self.assertTrue(np.all(err <= 1e-2))
+
+        # Same compressed G in parallel
+        self.prob_xyz.parallelized = True
+        self.prob_xyz.n_cpu = 2
+        Gp = self.prob_xyz.Intrgl_Fwr_Op('xyz')
+        self.assertTrue(abs(Gc - Gp).max() == 0.)
+
+    def test_matrix_free_forward(self):
+
+        # Products with the stored G
+        self.survey.pair(self.prob_xyz)
+        self.prob_xyz.forwardOnly = False
+        G = self.prob_xyz.Intrgl_Fwr_Op('xyz')
+
+        v = np.random.randn(G.shape[0])
+
+        # Same products with G recomputed over blocks and threads
+        self.prob_xyz.forwardOnly = True
+        self.prob_xyz.maxRAM = 1e-4
+        self.prob_xyz.n_cpu = 2
+
+        self.assertTrue(np.allclose(
+            self.prob_xyz.Jvec(self.model, self.model), G.dot(self.model)
+        ))
+        self.assertTrue(np.allclose(
+            self.prob_xyz.Jtvec(self.model, v), G.T.dot(v)
+        ))
+        self.assertTrue(np.allclose(
+            self.prob_xyz.getGtGdiag(), np.sum(G**2., axis=0)
+        ))
+        self.assertTrue(getattr(self.prob_xyz, '_G', None) is None)
+
+    def test_tree_forward(self):
+
+        # Same cells on a tensor mesh and on a uniformly refined tree mesh
+        h = [(0.25, 16)]
+        meshTensor = Mesh.TensorMesh([h, h, h], 'CCC')
+        meshTree = Mesh.TreeMesh([h, h, h], meshTensor.x0)
+        meshTree.refine(lambda cell: 4)
+
+        # Same total response from a uniform model, whatever the ordering
+        d = []
+        for mesh in [meshTensor, meshTree]:
+            prob = PF.Gravity.GravityIntegral(
+                mesh, rhoMap=Maps.IdentityMap(nP=mesh.nC)
+            )
+            self.survey.pair(prob)
+            d.append(prob.fields(np.ones(mesh.nC)*self.rho))
+            self.survey.unpair()
+
+        self.assertTrue(np.allclose(d[0], d[1]))
+
+    def test_weighting(self):
+
+        mesh = self.prob_z.mesh
+        actv = self.prob_z.actInd
+
+        # Distance weighting one receiver at a time or in blocks
+        wr_single = PF.Magnetics.get_dist_wgt(
+            mesh, self.locXyz, actv, 2., 2., maxRAM=1e-6
+        )
+        wr_block = PF.Magnetics.get_dist_wgt(
+            mesh, self.locXyz, actv, 2., 2., n_cpu=2
+        )
+        self.assertTrue(np.allclose(wr_single, wr_block))
+
+        # Sensitivity weighting from the column norms of G
+        self.survey.pair(self.prob_z)
+        self.prob_z.forwardOnly = False
+        G = self.prob_z.G
+
+        wr = np.linalg.norm(G, axis=0) / mesh.vol[actv]
+        wr = np.sqrt(wr / wr.max())
+
+        self.assertTrue(np.allclose(PF.Magnetics.get_sens_wgt(self.prob_z), wr))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+import shutil
+import tempfile
 from SimPEG import Mesh, Utils, PF, Maps, Problem, Survey, mkvc
 import numpy as np
 import matplotlib.pyplot as plt
@@ -88,6 +90,87 @@ class MagFwdProblemTests(unittest.TestCase):
         err_tmi = np.linalg.norm(dtmi-btmi)/np.linalg.norm(btmi)
         self.assertTrue(err_xyz < 0.005 and err_tmi < 0.005)
 
+    def test_block_forward(self):
+
+        # Rows of G computed one receiver at a time or in blocks
+        self.survey.pair(self.prob_tmi)
+        self.prob_tmi.forwardOnly = False
+        self.prob_tmi.maxRAM = 1e-6
+        G_single = self.prob_tmi.Intrgl_Fwr_Op()
+
+        self.prob_tmi.maxRAM = 1.
+        G_block = self.prob_tmi.Intrgl_Fwr_Op()
+
+        self.assertTrue(np.allclose(G_single, G_block, rtol=1e-10, atol=0.))
+
+        # The forward only operator must agree with the stored G
+        self.prob_tmi.forwardOnly = True
+        d = self.prob_tmi.fields(self.model)
+        self.assertTrue(np.allclose(d, G_block.dot(self.model)))
+
+    def test_stored_G(self):
+
+        Gpath = tempfile.mkdtemp()
+
+        try:
+            self.survey.pair(self.prob_tmi)
+            self.prob_tmi.forwardOnly = False
+            G = self.prob_tmi.Intrgl_Fwr_Op()
+
+            # G written on disk, with products streamed over blocks of rows
+            self.prob_tmi.Gpath = Gpath
+            self.prob_tmi.maxRAM = 1e-5
+            self.assertTrue(isinstance(self.prob_tmi.G, np.memmap))
+            self.assertTrue(np.allclose(self.prob_tmi.G, G))
+
+            v = np.random.randn(G.shape[1])
+            w = np.random.randn(G.shape[0])
+            self.assertTrue(np.allclose(self.prob_tmi.Gvec(v), G.dot(v)))
+            self.assertTrue(np.allclose(self.prob_tmi.Gtvec(w), G.T.dot(w)))
+            self.assertTrue(np.allclose(
+                self.prob_tmi.getGtGdiag(), np.sum(G**2., axis=0)
+            ))
+
+            # The same problem reuses the stored G
+            fileName = self.prob_tmi.G.filename
+            self.survey.unpair()
+            prob = PF.Magnetics.MagneticIntegral(
+                self.prob_tmi.mesh, chiMap=self.prob_tmi.chiMap,
+                actInd=self.prob_tmi.actInd, Gpath=Gpath
+            )
+            self.survey.pair(prob)
+            self.assertTrue(prob.G.filename == fileName)
+            self.assertTrue(np.allclose(prob.G, G))
+
+        finally:
+            shutil.rmtree(Gpath)
+
+    def test_amplitude_deriv(self):
+
+        prob = PF.Magnetics.MagneticAmplitude(
+            self.prob_xyz.mesh, chiMap=self.prob_xyz.chiMap,
+            actInd=self.prob_xyz.actInd
+        )
+        self.survey.pair(prob)
+
+        m0 = self.model
+        m1 = self.model * 2.
+        v = np.random.rand(m0.size)
+        w = np.random.rand(self.locXyz.shape[0])
+
+        # Derivatives follow the model, without a call to fields
+        d0 = prob.fields(m0)
+        Jv = prob.Jvec(m1, v)
+        self.assertTrue(np.allclose(prob.fields(m1), 2.*d0))
+
+        dx = 1e-4 * v
+        Jv_fd = (prob.fields(m1 + dx) - prob.fields(m1 - dx)) / 2e-4
+        self.assertTrue(np.allclose(Jv, Jv_fd, rtol=1e-4))
+
+        # Adjoint test
+        Jtw = prob.Jtvec(m1, w)
+        self.assertTrue(np.allclose(w.dot(Jv), v.dot(Jtw)))
+
 
 if __name__ == '__main__':
     unittest.main()